@@ -8,4 +8,24 @@ class AiConfig(AppConfig):
     def ready(self):
         # Django 앱이 시작될 때 app_clients 모듈을 로드하여
         # 공유 클라이언트 객체들을 초기화합니다.
-        from . import app_clients
\ No newline at end of file
+        from . import app_clients
+
+        # 공유 aiohttp 세션은 ASGI lifespan 이벤트에 맞춰 생성/정리합니다.
+        from config.lifespan import on_startup, on_shutdown
+        from .http_client import open_sessions, close_sessions
+        on_startup(open_sessions)
+        on_shutdown(close_sessions)
+
+        # 블로그 본문 추출 프로세스 풀은 처음 사용할 때 시작되고, 종료 시 정리합니다.
+        from .extraction import extraction_pool
+        on_shutdown(extraction_pool.close)
+
+        # 형용사 조합별 쿼리 임베딩은 서버 시작 시(관리 명령에서는 처음 조회할 때) 읽어옵니다. (파일이 없으면 실시간 임베딩 사용)
+        from django.conf import settings
+        from .query_embeddings import query_embeddings
+        query_embeddings.path = settings.QUERY_EMBEDDINGS_PATH
+        query_embeddings.compose = settings.QUERY_EMBEDDINGS_COMPOSE
+        on_startup(query_embeddings.preload)
+
+        from .search_cache import blog_search_store
+        blog_search_store.background_refresh = settings.KAKAO_SEARCH_BACKGROUND_REFRESH
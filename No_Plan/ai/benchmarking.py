@@ -0,0 +1,12 @@
+# ai/benchmarking.py
+
+import statistics
+
+
+def summarize(samples: list[float]) -> str:
+    """
+    벤치마크 명령 공용: 초 단위 측정값 목록을 p50/p95(ms) 요약 문자열로 만듭니다.
+    """
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return f"p50 {statistics.median(samples) * 1000:.3f} ms / p95 {p95 * 1000:.3f} ms (n={len(samples)})"
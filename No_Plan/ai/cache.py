@@ -0,0 +1,104 @@
+# ai/cache.py
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    TTL(만료 시간)과 LRU(최근 사용 순) 제거를 지원하는 프로세스 내 캐시
+    """
+    def __init__(self, maxsize: int = 1024, ttl: float = 600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (만료 시각, 값)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 비동기 작업을 하나로 합칩니다.
+    먼저 들어온 호출이 작업을 시작하고, 뒤따라온 호출은 진행 중인 같은 작업의 결과를 함께 기다립니다.
+    """
+    def __init__(self):
+        self._calls = {}  # (이벤트 루프, 키) -> Task
+        self.started = 0
+        self.shared = 0
+
+    async def do(self, key, factory):
+        """
+        factory()는 실제 작업 코루틴을 만드는 함수입니다. 진행 중인 같은 키의 작업이 없을 때만 호출됩니다.
+        """
+        loop = asyncio.get_running_loop()
+        call_key = (loop, key)
+        task = self._calls.get(call_key)
+        if task is None:
+            task = loop.create_task(factory())
+            self._calls[call_key] = task
+            task.add_done_callback(lambda t: self._forget(call_key, t))
+            self.started += 1
+        else:
+            self.shared += 1
+        # 한 호출자가 취소되어도 공유 작업 자체는 취소되지 않도록 shield로 감쌉니다.
+        return await asyncio.shield(task)
+
+    def _forget(self, call_key, task):
+        if self._calls.get(call_key) is task:
+            del self._calls[call_key]
+        if not task.cancelled():
+            task.exception()  # 모든 호출자가 떠난 뒤 실패해도 경고가 남지 않도록 예외를 회수합니다.
+
+    def __len__(self):
+        return len(self._calls)
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._calls), "started": self.started, "shared": self.shared}
@@ -0,0 +1,72 @@
+# ai/crawl_cache.py
+
+from datetime import timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+from .models import CrawledText
+
+
+# ===================================================================
+# 장소별 블로그 크롤링 결과 캐시
+# ===================================================================
+# 블로그 글은 거의 바뀌지 않으므로 장소(contentid)별 최종 텍스트를 오래 보관합니다.
+#  - fresh   : FRESH_TTL 이내 -> 그대로 사용
+#  - stale   : MAX_AGE 이내 -> 그대로 사용하고, 백그라운드에서 ETag/Last-Modified로 재검증
+#  - negative: 사용할 블로그가 없었던 장소 -> NEGATIVE_TTL 동안 다시 크롤링하지 않음
+#              (검색/블로그 요청의 예외, 타임아웃, 5xx, 서킷 열림 같은 일시적 실패는 저장하지 않습니다)
+#  - expired : 그 외 -> 요청 안에서 다시 크롤링
+FRESH_TTL = timedelta(days=7)
+MAX_AGE = timedelta(days=90)
+NEGATIVE_TTL = timedelta(hours=6)
+
+
+class CrawledTextStore:
+    def __init__(self, fresh_ttl: timedelta = FRESH_TTL, max_age: timedelta = MAX_AGE,
+                 negative_ttl: timedelta = NEGATIVE_TTL):
+        self.fresh_ttl = fresh_ttl
+        self.max_age = max_age
+        self.negative_ttl = negative_ttl
+
+    def state(self, entry: CrawledText | None) -> str:
+        if entry is None:
+            return 'expired'
+        age = timezone.now() - entry.checked_at
+        if entry.text is None or not entry.urls:
+            return 'negative' if age < self.negative_ttl else 'expired'
+        if age < self.fresh_ttl:
+            return 'fresh'
+        return 'stale' if age < self.max_age else 'expired'
+
+    def get_many(self, content_ids: list[str]) -> dict[str, CrawledText]:
+        """
+        (동기 함수) contentid -> 캐시 행
+        """
+        return {entry.content_id: entry for entry in CrawledText.objects.filter(content_id__in=set(content_ids))}
+
+    def save_many(self, results: list[tuple[str, str, str | None, list[str], list[dict]]]):
+        """
+        (동기 함수) [(contentid, 장소명, 텍스트 또는 None, URL 목록, 출처 정보)] 를 저장합니다.
+        """
+        if not results:
+            return
+        now = timezone.now()
+        CrawledText.objects.bulk_create(
+            [CrawledText(content_id=cid, name=name[:255], text=text, urls=urls, sources=sources, checked_at=now,
+                         updated_at=now)
+             for cid, name, text, urls, sources in results],
+            update_conflicts=True,
+            # MySQL은 충돌 대상 컬럼을 지정하지 않습니다. (unique 인덱스로 판단)
+            unique_fields=['content_id'] if connection.features.supports_update_conflicts_with_target else None,
+            update_fields=['name', 'text', 'urls', 'sources', 'checked_at', 'updated_at'],
+        )
+
+    def touch(self, content_id: str):
+        """
+        (동기 함수) 재검증 결과 바뀐 것이 없으면 확인 시각만 갱신합니다.
+        """
+        CrawledText.objects.filter(content_id=content_id).update(checked_at=timezone.now())
+
+
+crawled_text_store = CrawledTextStore()
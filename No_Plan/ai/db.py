@@ -0,0 +1,22 @@
+# ai/db.py
+
+import functools
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+
+def db_sync_to_async(func):
+    """
+    동기 ORM 함수를 thread_sensitive=False 스레드 풀에서 실행하는 비동기 함수로 바꿉니다.
+    요청들이 하나의 스레드에 줄 서지 않게 하고, 풀 스레드의 DB 연결도 요청 처리와 같은 규칙(CONN_MAX_AGE)으로 열고 닫습니다.
+    """
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(run, thread_sensitive=False)
@@ -0,0 +1,59 @@
+# ai/deadline.py
+
+import time
+
+
+# ===================================================================
+# 요청 시간 예산 (?budget_ms=)
+# ===================================================================
+# AI 추천 파이프라인의 각 단계는 전체 예산 중 자기 몫이 끝나는 시각까지만 기다리고,
+# 그때까지 끝난 결과로 다음 단계를 진행합니다. (예산이 없으면 모든 대기 시간이 None = 무제한)
+CRAWL_SHARE = 0.5        # 블로그 크롤링/혼잡도 조회는 예산의 50% 시점까지
+EMBEDDING_SHARE = 0.7    # 임베딩은 70% 시점까지 (넘으면 BM25 순위로 대체)
+ANNOTATION_SHARE = 0.95  # 추천 이유 생성은 95% 시점까지 (나머지는 pending), 남은 5%는 응답 직렬화용
+MIN_BUDGET_MS = 200
+MAX_BUDGET_MS = 60000
+
+
+class Deadline:
+    def __init__(self, budget: float | None):
+        """
+        budget: 초 단위 전체 예산 (None이면 제한 없음)
+        """
+        self.budget = budget
+        self.start = time.monotonic()
+
+    @classmethod
+    def from_ms(cls, budget_ms) -> 'Deadline':
+        """
+        ?budget_ms= 값으로 만듭니다. 값이 없으면 제한 없음, 숫자가 아니면 ValueError.
+        """
+        if budget_ms in (None, ''):
+            return cls(None)
+        return cls(min(max(int(budget_ms), MIN_BUDGET_MS), MAX_BUDGET_MS) / 1000)
+
+    def at(self, share: float = 1.0) -> float | None:
+        """
+        예산의 share 시점 (time.monotonic 기준 절대 시각)
+        """
+        return None if self.budget is None else self.start + self.budget * share
+
+    def remaining(self, share: float = 1.0, cap: float = None) -> float | None:
+        """
+        share 시점까지 남은 시간 (초, 0 이상). 예산이 없으면 None.
+        cap: 예산과 별개인 단계 자체의 상한 (예: settings.AI_EMBEDDING_TIMEOUT)
+        """
+        if self.budget is None:
+            return cap
+        remaining = max(0.0, self.at(share) - time.monotonic())
+        return remaining if cap is None else min(remaining, cap)
+
+    @property
+    def is_limited(self) -> bool:
+        return self.budget is not None
+
+    def elapsed_ms(self) -> int:
+        return int((time.monotonic() - self.start) * 1000)
+
+    def __repr__(self):
+        return f"Deadline(budget={self.budget})"
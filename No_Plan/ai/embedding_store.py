@@ -0,0 +1,87 @@
+# ai/embedding_store.py
+
+import hashlib
+from datetime import timedelta
+
+import numpy as np
+from django.db.models import F
+from django.utils import timezone
+
+from .models import EmbeddingCache
+
+
+# ===================================================================
+# 영구 임베딩 저장소
+# ===================================================================
+# 같은 장소의 같은 블로그 텍스트를 요청마다 다시 임베딩하지 않도록
+# (모델, 텍스트 sha256) -> 벡터를 DB에 저장합니다.
+STORAGE_DTYPE = np.float16          # 1536차원 기준 약 3KB/행
+MAX_ROWS = 200_000                  # 이 개수를 넘으면 오래 사용되지 않은 항목부터 삭제
+EVICTION_CHECK_EVERY = 1000         # 이 개수만큼 새로 저장할 때마다 용량을 확인
+TOUCH_INTERVAL = timedelta(days=1)  # 최근 사용 시각은 하루에 한 번만 갱신 (쓰기 부하 감소)
+EVICTION_CHUNK = 5000               # 한 번에 지우는 행 수 (긴 잠금과 큰 트랜잭션 방지)
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def encode_vector(vector) -> bytes:
+    return np.asarray(vector, dtype=STORAGE_DTYPE).tobytes()
+
+
+def decode_vector(blob: bytes) -> np.ndarray:
+    return np.frombuffer(bytes(blob), dtype=STORAGE_DTYPE).astype(np.float32)
+
+
+class EmbeddingStore:
+    def __init__(self, max_rows: int = MAX_ROWS):
+        self.max_rows = max_rows
+        self._inserted_since_check = 0
+
+    def get_many(self, model: str, hashes: list[str]) -> dict[str, np.ndarray]:
+        """
+        저장된 벡터를 한 번에 읽어옵니다. (동기 함수)
+        """
+        if not hashes:
+            return {}
+        rows = list(EmbeddingCache.objects.filter(model=model, text_hash__in=set(hashes))
+                    .values_list('id', 'text_hash', 'vector', 'last_used_at'))
+        stale_ids = [row_id for row_id, _, _, used in rows if used < timezone.now() - TOUCH_INTERVAL]
+        if stale_ids:
+            EmbeddingCache.objects.filter(id__in=stale_ids).update(last_used_at=timezone.now())
+        return {h: decode_vector(blob) for _, h, blob, _ in rows}
+
+    def put_many(self, model: str, vectors: dict[str, list[float]]):
+        """
+        새 벡터를 한 번에 저장합니다. 이미 있는 항목은 무시합니다. (동기 함수)
+        """
+        if not vectors:
+            return
+        EmbeddingCache.objects.bulk_create(
+            [EmbeddingCache(model=model, text_hash=h, dim=len(v), vector=encode_vector(v)) for h, v in vectors.items()],
+            ignore_conflicts=True,
+        )
+        self._inserted_since_check += len(vectors)
+        if self._inserted_since_check >= EVICTION_CHECK_EVERY:
+            self._inserted_since_check = 0
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        최대 개수를 넘는 만큼 가장 오래 사용되지 않은 항목을 삭제합니다.
+        최근 사용 시각은 배치 단위로 같은 값이 찍히므로, 시각 기준이 아니라 (시각, id) 순서로 정확히 넘는 개수만 지웁니다.
+        """
+        excess = EmbeddingCache.objects.count() - self.max_rows
+        deleted = 0
+        while deleted < excess:
+            ids = list(EmbeddingCache.objects.order_by('last_used_at', 'id')
+                       .values_list('id', flat=True)[:min(EVICTION_CHUNK, excess - deleted)])
+            if not ids:
+                break
+            deleted += EmbeddingCache.objects.filter(id__in=ids).delete()[0]
+        if deleted:
+            print(f"[임베딩 캐시] {deleted}개 항목 삭제 (최대 {self.max_rows}개)")
+        return deleted
+
+embedding_store = EmbeddingStore()
@@ -0,0 +1,181 @@
+# ai/extraction.py
+
+import asyncio
+import multiprocessing
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import tiktoken
+from bs4 import BeautifulSoup
+
+
+# ===================================================================
+# 블로그 본문 추출 (BeautifulSoup 파싱 / 정리 / tiktoken 자르기)
+# ===================================================================
+# 블로그 페이지 파싱과 토큰 자르기는 CPU 작업이라 이벤트 루프에서 돌리면 그동안 다른 요청이 모두 멈춥니다.
+# 전용 프로세스 풀에서 실행하고, 워커에는 응답 바이트를 넘기고 결과 텍스트만 돌려받습니다.
+# 이 모듈은 워커 프로세스에서도 import 되므로 모듈 수준에서 Django 설정에 접근하지 않습니다.
+# 워커 수/대기열 크기는 settings.AI_EXTRACT_WORKERS / AI_EXTRACT_MAX_QUEUE 로 정합니다.
+
+_CONTROL = re.compile(r'[\u200b-\u200f\u202a-\u202e]')
+_EMOJI = re.compile("["
+                    u"\U0001F600-\U0001F64F" u"\U0001F300-\U0001F5FF" u"\U0001F680-\U0001F6FF"
+                    u"\U0001F1E0-\U0001F1FF" u"\U0001F900-\U0001F9FF" u"\U0001FA70-\U0001FAFF"
+                    u"\u2300-\u23FF" u"\u2600-\u26FF" u"\u2700-\u27BF" u"\u2B00-\u2BFF" u"\uFE0F"
+                    "]+", flags=re.UNICODE)
+_encodings = {}  # 프로세스별 tiktoken 인코딩 캐시
+
+
+def clean_text(text: str) -> str:
+    text = _CONTROL.sub("", text)
+    return _EMOJI.sub("", text)
+
+
+def truncate_text(text: str, model: str, max_tokens: int) -> str:
+    encoding = _encodings.get(model)
+    if encoding is None:
+        encoding = _encodings[model] = tiktoken.encoding_for_model(model)
+    toks = encoding.encode(text)
+    if len(toks) > max_tokens:
+        return encoding.decode(toks[:max_tokens])
+    return text
+
+
+def extract_blog_page(html: bytes, charset: str | None, follow_iframe: bool, model: str,
+                      max_tokens: int) -> tuple[str, str | None, float]:
+    """
+    (워커 프로세스에서 실행) 네이버 블로그 페이지에서 본문을 추출합니다.
+    반환값: (종류, 값, 처리 시간)
+     - ('iframe', 본문 iframe의 src, ...): follow_iframe이고 본문이 iframe 안에 있는 경우
+     - ('text', 정리/자르기가 끝난 본문, ...)
+     - ('empty', None, ...): 본문을 찾지 못한 경우
+    """
+    start = time.perf_counter()
+    soup = BeautifulSoup(html, "lxml", from_encoding=charset)
+    iframe = soup.find("iframe", id="mainFrame") if follow_iframe else None
+    if iframe and iframe.get("src"):
+        kind, value = 'iframe', iframe["src"]
+    else:
+        cont = soup.find("div", class_="se-main-container")
+        if cont:
+            kind, value = 'text', truncate_text(clean_text(cont.get_text(strip=True)), model, max_tokens)
+        else:
+            kind, value = 'empty', None
+    return kind, value, time.perf_counter() - start
+
+
+class StageTimer:
+    __slots__ = ('count', 'total', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 2) if self.count else None,
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+
+class ExtractionPool:
+    """
+    추출 작업을 제한된 크기의 프로세스 풀에서 실행합니다.
+    워커 수가 0이면 기본 스레드 풀을 사용합니다. (개발 환경/단일 코어용)
+    """
+    def __init__(self, workers: int = None, max_queue: int = None):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._slots = {}  # 이벤트 루프 -> 대기열 제한용 Semaphore
+        self.waiting = 0
+        self.running = 0
+        self.timers = {'queue_wait': StageTimer(), 'roundtrip': StageTimer(), 'parse': StageTimer()}
+
+    def _configure(self):
+        from django.conf import settings
+        if self.workers is None:
+            self.workers = settings.AI_EXTRACT_WORKERS
+        if self.max_queue is None:
+            self.max_queue = settings.AI_EXTRACT_MAX_QUEUE
+
+    def _get_executor(self):
+        if self._executor is None and self.workers is None:
+            self._configure()
+        if self._executor is None and self.workers > 0:
+            # fork는 스레드/이벤트 루프 상태까지 복제하므로 spawn으로 깨끗한 워커를 띄웁니다.
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        slots = self._slots.get(loop)
+        if slots is None:
+            for dead in [l for l in self._slots if l.is_closed()]:
+                del self._slots[dead]
+            if self.max_queue is None:
+                self._configure()
+            slots = self._slots[loop] = asyncio.Semaphore(self.max_queue)
+        return slots
+
+    async def extract(self, html: bytes, charset: str | None, follow_iframe: bool, model: str,
+                      max_tokens: int) -> tuple[str, str | None]:
+        """
+        extract_blog_page를 풀에서 실행합니다. 풀에 맡긴 작업이 max_queue개를 넘으면 자리가 날 때까지 기다립니다.
+        """
+        slots = self._get_slots()
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await slots.acquire()
+        finally:
+            self.waiting -= 1
+        started_at = time.perf_counter()
+        self.timers['queue_wait'].record(started_at - queued_at)
+        self.running += 1
+        try:
+            kind, value, parse_seconds = await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), extract_blog_page, html, charset, follow_iframe, model, max_tokens)
+        except BrokenProcessPool:
+            # 워커가 비정상 종료되면 다음 작업부터 새 풀을 사용합니다.
+            self._executor = None
+            raise
+        finally:
+            self.running -= 1
+            slots.release()
+        self.timers['roundtrip'].record(time.perf_counter() - started_at)
+        self.timers['parse'].record(parse_seconds)
+        return kind, value
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def close(self):
+        """
+        ASGI lifespan shutdown 훅: 워커 프로세스를 정리합니다.
+        """
+        self.shutdown()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "waiting": self.waiting,
+            "running": self.running,
+            **{stage: timer.snapshot() for stage, timer in self.timers.items()},
+        }
+
+
+extraction_pool = ExtractionPool()
@@ -0,0 +1,66 @@
+# ai/http_client.py
+
+import asyncio
+import aiohttp
+
+
+# ===================================================================
+# 공유 aiohttp 세션 레지스트리
+# ===================================================================
+# 요청마다 ClientSession을 새로 만들면 apis.data.go.kr, dapi.kakao.com,
+# blog.naver.com 에 매번 TCP/TLS 핸드셰이크를 다시 하게 됩니다.
+# 세션은 이벤트 루프에 묶여 있으므로, 루프별로 하나씩 만들어 앱 수명 동안 재사용합니다.
+CONNECTION_LIMIT = 100          # 전체 동시 연결 수
+CONNECTION_LIMIT_PER_HOST = 20  # 호스트별 동시 연결 수
+KEEPALIVE_TIMEOUT = 30          # 유휴 연결 유지 시간 (초)
+DNS_CACHE_TTL = 300             # DNS 조회 결과 캐시 시간 (초)
+
+_sessions: dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+
+def _discard_dead_sessions():
+    """
+    이미 닫힌 이벤트 루프에 묶인 세션을 레지스트리에서 제거합니다.
+    (runserver/WSGI 환경에서는 async_to_sync가 요청마다 새 루프를 만들기 때문입니다.)
+    """
+    for loop in [loop for loop in _sessions if loop.is_closed()]:
+        # 루프가 이미 닫혀 있어 await close()를 할 수 없으므로 커넥터만 분리합니다.
+        _sessions.pop(loop).detach()
+
+
+def get_session() -> aiohttp.ClientSession:
+    """
+    현재 이벤트 루프의 공유 ClientSession을 반환합니다. 없으면 새로 만듭니다.
+    """
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        _discard_dead_sessions()
+        connector = aiohttp.TCPConnector(
+            limit=CONNECTION_LIMIT,
+            limit_per_host=CONNECTION_LIMIT_PER_HOST,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=DNS_CACHE_TTL,
+        )
+        # 여러 사용자가 세션을 공유하므로 쿠키는 저장하지 않습니다.
+        session = aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar())
+        _sessions[loop] = session
+    return session
+
+
+async def open_sessions():
+    """
+    ASGI lifespan startup 훅: 서버 루프의 공유 세션을 미리 만들어 둡니다.
+    """
+    get_session()
+
+
+async def close_sessions():
+    """
+    ASGI lifespan shutdown 훅: 현재 루프의 공유 세션을 닫습니다.
+    """
+    loop = asyncio.get_running_loop()
+    session = _sessions.pop(loop, None)
+    if session is not None and not session.closed:
+        await session.close()
+    _discard_dead_sessions()
@@ -0,0 +1,112 @@
+# ai/lexical.py
+
+import math
+import re
+from collections import Counter
+
+import numpy as np
+
+from .query_embeddings import ADJECTIVE_MEANINGS
+from .ranking import CrawledPlace, top_k_indices
+
+
+# ===================================================================
+# 어휘 기반 사전 필터 (BM25)
+# ===================================================================
+# 임베딩/LLM 비용을 쓰기 전에 블로그 텍스트와 형용사(+ 사전적 의미)의 단어 겹침으로 후보를 줄이고,
+# OpenAI가 느리거나 장애일 때는 임베딩 없이 순위를 매기는 대체 경로로 사용합니다.
+# 한국어는 어절에 조사/어미가 붙어 어절 단위로는 잘 겹치지 않으므로 기본 토크나이저는 어절 안의 글자 2-gram을 씁니다.
+# settings.AI_LEXICAL_TOKENIZER 에 '모듈.함수' 경로를 지정하면 형태소 분석기 등으로 바꿀 수 있습니다. (함수(text) -> list[str])
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD = re.compile(r'[0-9A-Za-z가-힣]+')
+_tokenizer = None
+
+
+def word_tokenizer(text: str) -> list[str]:
+    return _WORD.findall(text.lower())
+
+
+def char_bigram_tokenizer(text: str) -> list[str]:
+    tokens = []
+    for word in _WORD.findall(text.lower()):
+        if len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def get_tokenizer():
+    global _tokenizer
+    if _tokenizer is None:
+        from django.conf import settings
+        from django.utils.module_loading import import_string
+        _tokenizer = import_string(settings.AI_LEXICAL_TOKENIZER)
+    return _tokenizer
+
+
+def lexical_query(adjectives: list[str]) -> str:
+    """
+    형용사 자체와 사전적 의미를 함께 사용합니다. (블로그에는 '고즈넉한' 같은 표현이 그대로 나오는 경우가 많음)
+    """
+    return " ".join(adjectives + [ADJECTIVE_MEANINGS[adj] for adj in adjectives if adj in ADJECTIVE_MEANINGS])
+
+
+class BM25Index:
+    """
+    요청 하나의 블로그 텍스트들로 만드는 작은 역색인
+    """
+    def __init__(self, documents: list[list[str]], k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.n = len(documents)
+        lengths = np.array([len(doc) for doc in documents], dtype=np.float64)
+        avgdl = lengths.mean() if self.n and lengths.mean() > 0 else 1.0
+        # 문서 길이 정규화 항은 질의와 무관하므로 미리 계산합니다.
+        self._norm = k1 * (1 - b + b * lengths / avgdl)
+        postings = {}
+        for i, doc in enumerate(documents):
+            for term, tf in Counter(doc).items():
+                postings.setdefault(term, ([], []))
+                postings[term][0].append(i)
+                postings[term][1].append(tf)
+        self.postings = {term: (np.array(docs, dtype=np.intp), np.array(tfs, dtype=np.float64))
+                         for term, (docs, tfs) in postings.items()}
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings[term][0])
+        return math.log(1 + (self.n - df + 0.5) / (df + 0.5))
+
+    def scores(self, query: list[str]) -> np.ndarray:
+        scores = np.zeros(self.n, dtype=np.float64)
+        for term, qtf in Counter(query).items():
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            docs, tf = posting
+            scores[docs] += qtf * self.idf(term) * tf * (self.k1 + 1) / (tf + self._norm[docs])
+        return scores
+
+
+def lexical_scores(texts: list[str], query: str, tokenizer=None) -> np.ndarray:
+    tokenizer = tokenizer or get_tokenizer()
+    return BM25Index([tokenizer(text) for text in texts]).scores(tokenizer(query))
+
+
+def prefilter(records: list[CrawledPlace], scores: np.ndarray, keep: int) -> list[CrawledPlace]:
+    """
+    BM25 점수 상위 keep개만 원래 순서대로 남깁니다. (keep이 0 이하이거나 장소가 적으면 그대로)
+    """
+    if keep <= 0 or len(records) <= keep:
+        return records
+    return [records[i] for i in sorted(top_k_indices(scores, keep).tolist())]
+
+
+def score_places_lexical(records: list[CrawledPlace], scores: np.ndarray) -> None:
+    """
+    임베딩 없이 BM25 점수를 최댓값 기준 0~1로 맞춰 similarity에 기록합니다. (대체 순위)
+    """
+    top = scores.max() if len(scores) else 0.0
+    for record, score in zip(records, (scores / top if top > 0 else scores).tolist()):
+        record.similarity = score
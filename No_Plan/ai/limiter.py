@@ -0,0 +1,222 @@
+# ai/limiter.py
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+
+# ===================================================================
+# OpenAI 동시 호출 수 적응형 제한 (AIMD + 우선순위 레인)
+# ===================================================================
+# 요청마다 고정 크기 Semaphore를 만들면 동시 사용자 수에 비례해 OpenAI 호출이 늘어 429를 받고,
+# 한가할 때는 여유 용량을 쓰지 못합니다. 프로세스 전체에서 엔드포인트(임베딩/채팅)마다 하나의 제한기를 두고
+#  - 성공 응답의 지연이 평소보다 크게 늘지 않으면 제한을 조금씩 올리고 (가산 증가, 대기 수요가 있을 때만)
+#  - 429, 잔여 요청/토큰 헤더가 바닥나거나 지연이 평소의 LATENCY_TOLERANCE배를 넘으면 크게 줄입니다 (곱셈 감소)
+# 대기열은 우선순위 레인(interactive > default > bulk)으로 나누고, bulk는 제한의 BULK_SHARE까지만 사용하므로
+# 오프라인 일괄 작업(enrich_places)이 여행 요약 같은 대화형 호출을 밀어내지 않습니다.
+LANES = ('interactive', 'default', 'bulk')  # 우선순위 순
+DECREASE_FACTOR = 0.5       # 429를 받았을 때
+SOFT_DECREASE_FACTOR = 0.9  # 지연 증가/잔여 한도 부족일 때
+DECREASE_COOLDOWN = 1.0     # 한 번 줄인 뒤 다시 줄이기까지의 최소 간격 (초), 429가 몰려도 한 번만 반영
+LATENCY_TOLERANCE = 2.0
+LATENCY_ALPHA = 0.2         # 최근 지연 EWMA
+BASELINE_ALPHA = 0.02       # 평소 지연 EWMA (천천히 따라감)
+LOW_REMAINING_RATIO = 0.05  # x-ratelimit-remaining이 한도의 이 비율 아래면 감소
+
+
+class AdaptiveLimiter:
+    def __init__(self, name: str, initial: float = None, min_limit: float = None, max_limit: float = None,
+                 bulk_share: float = None):
+        self.name = name
+        self.limit = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.bulk_share = bulk_share
+        self.in_flight = 0
+        self.lane_in_flight = dict.fromkeys(LANES, 0)
+        self._waiters = {lane: deque() for lane in LANES}
+        self._lock = threading.Lock()  # 여러 이벤트 루프(스레드)에서 같이 사용될 수 있습니다.
+        self._decreased_at = 0.0
+        self.baseline_latency = None
+        self.recent_latency = None
+        self.counters = {'acquired': dict.fromkeys(LANES, 0), 'increases': 0, 'decreases': 0,
+                         'rate_limited': 0, 'low_remaining': 0, 'slow': 0}
+
+    def _configure(self):
+        from django.conf import settings
+        if self.limit is None:
+            self.limit = float(settings.OPENAI_CONCURRENCY_INITIAL)
+        if self.min_limit is None:
+            self.min_limit = float(settings.OPENAI_CONCURRENCY_MIN)
+        if self.max_limit is None:
+            self.max_limit = float(settings.OPENAI_CONCURRENCY_MAX)
+        if self.bulk_share is None:
+            self.bulk_share = settings.OPENAI_BULK_SHARE
+
+    # ---------------------------------------------------------------
+    # 슬롯 획득 / 반환
+    # ---------------------------------------------------------------
+    def _can_start(self, lane: str) -> bool:
+        if self.in_flight >= int(self.limit):
+            return False
+        return lane != 'bulk' or self.lane_in_flight['bulk'] < max(1, int(self.limit * self.bulk_share))
+
+    def _start(self, lane: str):
+        self.in_flight += 1
+        self.lane_in_flight[lane] += 1
+        self.counters['acquired'][lane] += 1
+
+    def _grant(self):
+        """
+        (lock 안에서) 자리가 나는 만큼 우선순위가 높은 레인의 대기자부터 깨웁니다.
+        """
+        for lane in LANES:
+            waiters = self._waiters[lane]
+            while waiters and self._can_start(lane):
+                waiter = waiters.popleft()
+                if waiter.future.done():
+                    continue  # 이미 취소된 대기자
+                self._start(lane)
+                waiter.granted = True
+                waiter.future.get_loop().call_soon_threadsafe(_wake, waiter.future)
+
+    async def acquire(self, lane: str = 'default'):
+        if self.limit is None:
+            self._configure()
+        with self._lock:
+            ahead = any(self._waiters[l] for l in LANES[:LANES.index(lane) + 1])
+            if not ahead and self._can_start(lane):
+                self._start(lane)
+                return
+            waiter = _Waiter(asyncio.get_running_loop().create_future())
+            self._waiters[lane].append(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.granted:
+                    self._release(lane)  # 자리를 받은 직후 취소되면 돌려줍니다.
+                elif waiter in self._waiters[lane]:
+                    self._waiters[lane].remove(waiter)
+            raise
+
+    def _release(self, lane: str):
+        self.in_flight -= 1
+        self.lane_in_flight[lane] -= 1
+        self._grant()
+
+    def release(self, lane: str = 'default'):
+        with self._lock:
+            self._release(lane)
+
+    @asynccontextmanager
+    async def slot(self, lane: str = 'default'):
+        await self.acquire(lane)
+        try:
+            yield
+        finally:
+            self.release(lane)
+
+    # ---------------------------------------------------------------
+    # 제한 조정 (AIMD)
+    # ---------------------------------------------------------------
+    def _decrease(self, factor: float, reason: str):
+        now = time.monotonic()
+        if now - self._decreased_at < DECREASE_COOLDOWN:
+            return
+        self._decreased_at = now
+        previous = self.limit
+        self.limit = max(self.min_limit, self.limit * factor)
+        self.counters['decreases'] += 1
+        self.counters[reason] += 1
+        if int(previous) != int(self.limit):
+            print(f"[OpenAI 동시성] {self.name} 제한 {previous:.1f} -> {self.limit:.1f} ({reason})")
+
+    def record_success(self, latency: float):
+        if self.limit is None:
+            self._configure()
+        with self._lock:
+            self.recent_latency = latency if self.recent_latency is None else \
+                self.recent_latency + LATENCY_ALPHA * (latency - self.recent_latency)
+            self.baseline_latency = latency if self.baseline_latency is None else \
+                self.baseline_latency + BASELINE_ALPHA * (latency - self.baseline_latency)
+            if self.recent_latency > LATENCY_TOLERANCE * self.baseline_latency:
+                self._decrease(SOFT_DECREASE_FACTOR, 'slow')
+            elif self.in_flight + sum(map(len, self._waiters.values())) >= int(self.limit):
+                # 제한까지 쓰고 있을 때만 늘립니다. (제한 1만큼 성공하면 +1)
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                self.counters['increases'] += 1
+                self._grant()
+
+    def record_response(self, status: int, headers):
+        """
+        OpenAI HTTP 응답(SDK 내부 재시도 포함)마다 호출됩니다. 429와 잔여 한도 헤더를 반영합니다.
+        """
+        if self.limit is None:
+            self._configure()
+        with self._lock:
+            if status == 429:
+                self._decrease(DECREASE_FACTOR, 'rate_limited')
+                return
+            for kind in ('requests', 'tokens'):
+                try:
+                    remaining = int(headers.get(f'x-ratelimit-remaining-{kind}'))
+                    limit = int(headers.get(f'x-ratelimit-limit-{kind}'))
+                except (TypeError, ValueError):
+                    continue
+                if limit > 0 and remaining < limit * LOW_REMAINING_RATIO:
+                    self._decrease(SOFT_DECREASE_FACTOR, 'low_remaining')
+                    return
+
+    def stats(self) -> dict:
+        return {
+            "limit": None if self.limit is None else round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "in_flight_by_lane": dict(self.lane_in_flight),
+            "queued": {lane: len(waiters) for lane, waiters in self._waiters.items()},
+            "baseline_latency_ms": None if self.baseline_latency is None else round(self.baseline_latency * 1000, 1),
+            "recent_latency_ms": None if self.recent_latency is None else round(self.recent_latency * 1000, 1),
+            **self.counters,
+        }
+
+
+class _Waiter:
+    __slots__ = ('future', 'granted')
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.granted = False
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+openai_limiters = {
+    'embeddings': AdaptiveLimiter('embeddings'),
+    'chat': AdaptiveLimiter('chat'),
+}
+
+
+def limiter_for_path(path: str) -> AdaptiveLimiter | None:
+    if path.endswith('/embeddings'):
+        return openai_limiters['embeddings']
+    if path.endswith('/chat/completions'):
+        return openai_limiters['chat']
+    return None
+
+
+async def observe_openai_response(response):
+    """
+    OpenAI SDK의 httpx 클라이언트 response 이벤트 훅
+    """
+    limiter = limiter_for_path(response.request.url.path)
+    if limiter is not None:
+        limiter.record_response(response.status_code, response.headers)
+
+
+def openai_limiter_stats() -> dict:
+    return {name: limiter.stats() for name, limiter in openai_limiters.items()}
@@ -0,0 +1,93 @@
+# ai/management/commands/benchmark_lexical.py
+
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from ai.benchmarking import summarize
+from ai.embedding_store import embedding_store, text_hash
+from ai.lexical import lexical_query, lexical_scores
+from ai.models import CrawledText
+from ai.query_embeddings import all_combinations, query_embeddings
+from ai.ranking import cosine_scores, normalize_rows, top_k_indices
+
+
+def ranks(scores: np.ndarray) -> np.ndarray:
+    order = np.argsort(-scores, kind='stable')
+    result = np.empty(len(scores), dtype=np.float64)
+    result[order] = np.arange(len(scores))
+    return result
+
+
+def spearman(a: np.ndarray, b: np.ndarray) -> float:
+    ra, rb = ranks(a), ranks(b)
+    if ra.std() == 0 or rb.std() == 0:
+        return 0.0
+    return float(np.corrcoef(ra, rb)[0, 1])
+
+
+class Command(BaseCommand):
+    help = ("BM25 사전 필터를 크롤링 캐시/임베딩 캐시의 실제 블로그 텍스트로 평가합니다. "
+            "코사인 유사도 경로와 지연 시간, 순위 일치도(상위 K 보존율, Spearman)를 비교합니다.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--places', type=int, default=60, help="요청당 장소 수 (표본 크기)")
+        parser.add_argument('--keep', type=int, default=40, help="사전 필터가 남기는 장소 수")
+        parser.add_argument('--top-k', type=int, default=30, help="추천 이유를 만드는 상위 장소 수")
+        parser.add_argument('--trials', type=int, default=50, help="형용사 조합마다 뽑을 장소 표본 수")
+        parser.add_argument('--max-size', type=int, default=2, help="평가할 형용사 조합의 최대 크기")
+        parser.add_argument('--model', default='text-embedding-3-small')
+        parser.add_argument('--tokenizer', action='append', dest='tokenizers',
+                            help="비교할 토크나이저 함수 경로 (여러 번 지정 가능, 기본: 설정값)")
+
+    def handle(self, *args, **options):
+        rows = list(CrawledText.objects.exclude(text__isnull=True).exclude(text='').values_list('text', flat=True))
+        hashes = [text_hash(text) for text in rows]
+        vectors = {}
+        for i in range(0, len(hashes), 1000):
+            vectors.update(embedding_store.get_many(options['model'], hashes[i:i + 1000]))
+        texts = [text for text in rows if text_hash(text) in vectors]
+        if len(texts) < options['places']:
+            raise CommandError(f"임베딩 캐시에 있는 블로그 텍스트가 {len(texts)}개뿐입니다. (--places {options['places']} 필요)")
+        matrix = np.array([vectors[text_hash(text)] for text in texts], dtype=np.float32)
+        combos = [combo for combo in all_combinations(options['max_size'])
+                  if query_embeddings.lookup(combo, options['model']) is not None]
+        if not combos:
+            raise CommandError("쿼리 임베딩 파일이 없거나 모델이 다릅니다. (precompute_query_embeddings 먼저 실행)")
+
+        tokenizers = options['tokenizers'] or [None]
+        self.stdout.write(f"블로그 텍스트 {len(texts)}개, 형용사 조합 {len(combos)}개, 조합마다 표본 {options['trials']}개")
+        rng = np.random.default_rng(0)
+        samples = [rng.choice(len(texts), options['places'], replace=False) for _ in range(options['trials'])]
+        n, keep, k = options['places'], options['keep'], options['top_k']
+
+        cosine_times = []
+        for path in tokenizers:
+            tokenizer = import_string(path) if path else None
+            bm25_times, kept_recall, top_overlap, rhos = [], [], [], []
+            for combo in combos:
+                query_vec = query_embeddings.lookup(combo, options['model'])
+                query_text = lexical_query(list(combo))
+                for sample in samples:
+                    sample_texts = [texts[i] for i in sample]
+                    t = time.perf_counter()
+                    lex = lexical_scores(sample_texts, query_text, tokenizer)
+                    bm25_times.append(time.perf_counter() - t)
+                    t = time.perf_counter()
+                    cos = cosine_scores(normalize_rows(matrix[sample]), query_vec)
+                    cosine_times.append(time.perf_counter() - t)
+
+                    cos_top = set(top_k_indices(cos, k).tolist())
+                    kept = set(top_k_indices(lex, keep).tolist()) if keep < n else set(range(n))
+                    kept_recall.append(len(cos_top & kept) / len(cos_top))
+                    top_overlap.append(len(cos_top & set(top_k_indices(lex, k).tolist())) / len(cos_top))
+                    rhos.append(spearman(lex, cos))
+
+            self.stdout.write(f"\n[{path or '기본 토크나이저'}]")
+            self.stdout.write(f"BM25 (색인+점수): {summarize(bm25_times)}")
+            self.stdout.write(f"코사인 상위 {k}개 중 사전 필터(상위 {keep}개)에 남은 비율: 평균 {np.mean(kept_recall):.3f} / 최소 {np.min(kept_recall):.3f}")
+            self.stdout.write(f"대체 순위 상위 {k}개와 코사인 상위 {k}개 겹침: 평균 {np.mean(top_overlap):.3f}")
+            self.stdout.write(f"Spearman 순위 상관: 평균 {np.mean(rhos):.3f}")
+        self.stdout.write(f"\n코사인 (정규화+행렬곱, 임베딩 호출 제외): {summarize(cosine_times)}")
@@ -0,0 +1,70 @@
+# ai/management/commands/benchmark_ranking.py
+
+import statistics
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from ai.benchmarking import summarize
+from ai.ranking import CrawledPlace, score_places, top_places
+
+
+def rank_with_pandas(rows: list[dict], embeddings: list[list[float]], query_emb: list[float], k: int) -> list[str]:
+    """
+    이전 구현(DataFrame + sklearn)과 같은 순서의 연산: 임베딩 컬럼 대입 -> dropna -> cosine_similarity -> 정렬 -> iterrows
+    """
+    import pandas as pd
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    df = pd.DataFrame(rows)
+    df['embedding'] = None
+    df.loc[df.index, 'embedding'] = pd.Series(embeddings, index=df.index)
+    df_embed = df.dropna(subset=['embedding'])
+    sims = cosine_similarity([query_emb], df_embed['embedding'].tolist())[0]
+    df.loc[df_embed.index, 'similarity'] = sims
+    # 장소 dict에 유사도를 옮겨 적던 단계
+    _ = {row['contentid']: row['similarity'] for _, row in df.replace({np.nan: None}).iterrows()}
+    top = df.sort_values(by='similarity', ascending=False).head(k)
+    return [row['contentid'] for _, row in top.iterrows()]
+
+
+def rank_with_numpy(rows: list[dict], embeddings: np.ndarray, query_emb: np.ndarray, k: int) -> list[str]:
+    records = [CrawledPlace(row['contentid'], row['관광지명'], row['텍스트'], []) for row in rows]
+    score_places(records, embeddings, query_emb)
+    return [record.contentid for record in top_places(records, k)]
+
+
+class Command(BaseCommand):
+    help = "추천 유사도 순위 계산의 이전 구현(pandas/sklearn)과 NumPy 구현의 지연 시간을 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--places', type=int, default=30, help="요청당 장소 수")
+        parser.add_argument('--dim', type=int, default=1536, help="임베딩 차원 (text-embedding-3-small: 1536)")
+        parser.add_argument('--top-k', type=int, default=30)
+        parser.add_argument('--repeat', type=int, default=500)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(0)
+        n, k = options['places'], options['top_k']
+        rows = [{'contentid': str(i), '관광지명': f'장소{i}', '텍스트': '블로그', 'urls': []} for i in range(n)]
+        matrix = rng.standard_normal((n, options['dim'])).astype(np.float32)
+        query = rng.standard_normal(options['dim']).astype(np.float32)
+        # 이전 구현은 OpenAI 응답의 파이썬 리스트를 그대로 사용했습니다.
+        embedding_lists, query_list = matrix.astype(float).tolist(), query.astype(float).tolist()
+
+        pandas_top = rank_with_pandas(rows, embedding_lists, query_list, k)
+        numpy_top = rank_with_numpy(rows, matrix, query, k)
+        self.stdout.write(f"상위 {k}개 순서 일치: {pandas_top == numpy_top}")
+
+        results = {}
+        for name, run in (('pandas/sklearn', lambda: rank_with_pandas(rows, embedding_lists, query_list, k)),
+                          ('numpy', lambda: rank_with_numpy(rows, matrix, query, k))):
+            samples = []
+            for _ in range(options['repeat']):
+                t = time.perf_counter()
+                run()
+                samples.append(time.perf_counter() - t)
+            results[name] = statistics.median(samples)
+            self.stdout.write(f"{name:<15}: {summarize(samples)}")
+        self.stdout.write(f"속도 향상: {results['pandas/sklearn'] / results['numpy']:.1f}배 (p50 기준)")
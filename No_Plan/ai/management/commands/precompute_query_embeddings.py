@@ -0,0 +1,44 @@
+# ai/management/commands/precompute_query_embeddings.py
+
+import asyncio
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ai.query_embeddings import ADJECTIVE_MEANINGS, QueryEmbeddingTable, all_combinations, combination_key
+from ai.services import RecommendationEngine
+
+# 임베딩 API 한 번에 보낼 입력 수
+BATCH_SIZE = 256
+
+
+class Command(BaseCommand):
+    help = "형용사 조합별 쿼리 임베딩을 미리 계산해 파일로 저장합니다. (최대 511개 조합)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=settings.QUERY_EMBEDDINGS_PATH)
+        parser.add_argument('--max-size', type=int, default=None,
+                            help="조합에 포함할 최대 형용사 수 (그보다 큰 조합은 요청 시 단일 벡터 합으로 구성)")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        combos = all_combinations(options['max_size'])
+        self.stdout.write(f"{len(combos)}개 조합 임베딩 시작 ({len(ADJECTIVE_MEANINGS)}개 형용사)")
+        start = time.time()
+        model, vectors = asyncio.run(self.embed_all(combos, options['batch_size']))
+        QueryEmbeddingTable.save(options['output'], model, vectors)
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(vectors)}개 조합 저장: {options['output']} ({time.time() - start:.1f} 초)"))
+
+    async def embed_all(self, combos, batch_size):
+        async with RecommendationEngine() as engine:
+            vectors = {}
+            for i in range(0, len(combos), batch_size):
+                batch = combos[i:i + batch_size]
+                texts = [engine.adjectives_to_query(combo) for combo in batch]
+                res = await engine.client.embeddings.create(input=texts, model=engine.embedding_model)
+                for combo, r in zip(batch, res.data):
+                    vectors[combination_key(combo)] = r.embedding
+                self.stdout.write(f"  {min(i + batch_size, len(combos))}/{len(combos)}")
+            return engine.embedding_model, vectors
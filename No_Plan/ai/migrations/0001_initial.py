@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-17 12:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmbeddingCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=64, verbose_name='임베딩 모델')),
+                ('text_hash', models.CharField(max_length=64, verbose_name='텍스트 해시')),
+                ('dim', models.PositiveIntegerField(verbose_name='차원 수')),
+                ('vector', models.BinaryField(verbose_name='임베딩 벡터')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성 시각')),
+                ('last_used_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='최근 사용 시각')),
+            ],
+            options={
+                'verbose_name': '임베딩 캐시',
+                'verbose_name_plural': '임베딩 캐시 목록',
+                'db_table': 'ai_embedding_cache',
+                'unique_together': {('model', 'text_hash')},
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-17 12:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CrawledText',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_id', models.CharField(max_length=20, unique=True, verbose_name='콘텐츠 ID')),
+                ('name', models.CharField(max_length=255, verbose_name='장소명')),
+                ('text', models.TextField(blank=True, null=True, verbose_name='블로그 텍스트')),
+                ('urls', models.JSONField(default=list, verbose_name='블로그 URL 목록')),
+                ('sources', models.JSONField(default=list, verbose_name='출처 검증 정보')),
+                ('checked_at', models.DateTimeField(db_index=True, verbose_name='확인 시각')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='수정 시각')),
+            ],
+            options={
+                'verbose_name': '블로그 크롤링 캐시',
+                'verbose_name_plural': '블로그 크롤링 캐시 목록',
+                'db_table': 'ai_crawled_text',
+            },
+        ),
+    ]
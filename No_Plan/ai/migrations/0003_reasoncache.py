@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-17 13:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0002_crawledtext'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReasonCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key_hash', models.CharField(max_length=64, unique=True, verbose_name='캐시 키')),
+                ('content_id', models.CharField(max_length=20, verbose_name='콘텐츠 ID')),
+                ('adjectives', models.CharField(max_length=255, verbose_name='형용사 (정렬)')),
+                ('place_type', models.CharField(max_length=50, verbose_name='장소유형')),
+                ('text_hash', models.CharField(max_length=64, verbose_name='블로그 텍스트 해시')),
+                ('chat_model', models.CharField(max_length=64, verbose_name='채팅 모델')),
+                ('recommend_reason', models.TextField(verbose_name='추천 이유')),
+                ('hashtags', models.CharField(max_length=500, verbose_name='해시태그')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='생성 시각')),
+                ('last_used_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='최근 사용 시각')),
+            ],
+            options={
+                'verbose_name': '추천 이유 캐시',
+                'verbose_name_plural': '추천 이유 캐시 목록',
+                'db_table': 'ai_reason_cache',
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-17 13:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0003_reasoncache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogSearchCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(max_length=255, unique=True, verbose_name='검색어')),
+                ('urls', models.JSONField(default=list, verbose_name='블로그 URL 목록')),
+                ('fetched_at', models.DateTimeField(db_index=True, verbose_name='검색 시각')),
+            ],
+            options={
+                'verbose_name': '블로그 검색 캐시',
+                'verbose_name_plural': '블로그 검색 캐시 목록',
+                'db_table': 'ai_blog_search_cache',
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-17 13:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0004_blogsearchcache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlaceProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_id', models.CharField(max_length=20, unique=True, verbose_name='콘텐츠 ID')),
+                ('text_hash', models.CharField(max_length=64, verbose_name='블로그 텍스트 해시')),
+                ('base_hashtags', models.CharField(blank=True, default='', max_length=500, verbose_name='기본 해시태그')),
+                ('enriched_at', models.DateTimeField(db_index=True, verbose_name='처리 시각')),
+            ],
+            options={
+                'verbose_name': '장소 프로필',
+                'verbose_name_plural': '장소 프로필 목록',
+                'db_table': 'ai_place_profile',
+            },
+        ),
+    ]
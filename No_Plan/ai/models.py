@@ -1,3 +1,129 @@
+# ai/models.py
+
 from django.db import models
 
-# Create your models here.
+
+class EmbeddingCache(models.Model):
+    """
+    텍스트 임베딩 캐시. (임베딩 모델, 텍스트 sha256) 으로 찾고, 벡터는 float16 바이트로 압축해 저장합니다.
+    """
+    model = models.CharField(max_length=64, verbose_name='임베딩 모델')
+
+    # 텍스트의 sha256 (hex)
+    text_hash = models.CharField(max_length=64, verbose_name='텍스트 해시')
+
+    # 벡터 차원 수
+    dim = models.PositiveIntegerField(verbose_name='차원 수')
+
+    # 벡터 원본 (numpy 배열의 바이트)
+    vector = models.BinaryField(verbose_name='임베딩 벡터')
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성 시각')
+
+    # 용량 초과 시 오래 사용되지 않은 항목부터 삭제합니다.
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='최근 사용 시각')
+
+    def __str__(self):
+        return f"[{self.model}] {self.text_hash[:12]}"
+
+    class Meta:
+        db_table = 'ai_embedding_cache'
+        verbose_name = '임베딩 캐시'
+        verbose_name_plural = '임베딩 캐시 목록'
+        unique_together = ('model', 'text_hash')
+
+
+class CrawledText(models.Model):
+    """
+    장소별 블로그 크롤링 결과 캐시. 정리/자르기가 끝난 본문과 출처 URL을 저장합니다.
+    text가 없는 행은 '사용할 수 있는 블로그가 없었던 장소'(부정 캐시)입니다.
+    """
+    content_id = models.CharField(max_length=20, unique=True, verbose_name='콘텐츠 ID')
+    name = models.CharField(max_length=255, verbose_name='장소명')
+
+    # 임베딩/추천 이유 생성에 사용하는 최종 텍스트 (없으면 부정 캐시)
+    text = models.TextField(null=True, blank=True, verbose_name='블로그 텍스트')
+    urls = models.JSONField(default=list, verbose_name='블로그 URL 목록')
+
+    # 재검증용 출처 정보: [{"url", "content_url", "referer", "etag", "last_modified"}]
+    sources = models.JSONField(default=list, verbose_name='출처 검증 정보')
+
+    # 마지막으로 크롤링하거나 재검증한 시각 (TTL 기준)
+    checked_at = models.DateTimeField(db_index=True, verbose_name='확인 시각')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='수정 시각')
+
+    def __str__(self):
+        return f"[{self.content_id}] {self.name}"
+
+    class Meta:
+        db_table = 'ai_crawled_text'
+        verbose_name = '블로그 크롤링 캐시'
+        verbose_name_plural = '블로그 크롤링 캐시 목록'
+
+
+class ReasonCache(models.Model):
+    """
+    추천 이유/해시태그 생성 결과 캐시.
+    (장소, 형용사 조합, 장소유형, 블로그 텍스트 해시, 채팅 모델)이 같으면 같은 결과를 재사용합니다.
+    """
+    # 위 입력 전체의 sha256 (hex)
+    key_hash = models.CharField(max_length=64, unique=True, verbose_name='캐시 키')
+
+    content_id = models.CharField(max_length=20, verbose_name='콘텐츠 ID')
+    adjectives = models.CharField(max_length=255, verbose_name='형용사 (정렬)')
+    place_type = models.CharField(max_length=50, verbose_name='장소유형')
+    text_hash = models.CharField(max_length=64, verbose_name='블로그 텍스트 해시')
+    chat_model = models.CharField(max_length=64, verbose_name='채팅 모델')
+
+    recommend_reason = models.TextField(verbose_name='추천 이유')
+    hashtags = models.CharField(max_length=500, verbose_name='해시태그')
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='생성 시각')
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='최근 사용 시각')
+
+    def __str__(self):
+        return f"[{self.content_id}] {self.adjectives} ({self.place_type})"
+
+    class Meta:
+        db_table = 'ai_reason_cache'
+        verbose_name = '추천 이유 캐시'
+        verbose_name_plural = '추천 이유 캐시 목록'
+
+
+class BlogSearchCache(models.Model):
+    """
+    카카오(다음) 블로그 검색 결과 캐시. 검색어(장소명 + 시/구) -> 네이버 블로그 URL 목록
+    """
+    query = models.CharField(max_length=255, unique=True, verbose_name='검색어')
+    urls = models.JSONField(default=list, verbose_name='블로그 URL 목록')
+    fetched_at = models.DateTimeField(db_index=True, verbose_name='검색 시각')
+
+    def __str__(self):
+        return self.query
+
+    class Meta:
+        db_table = 'ai_blog_search_cache'
+        verbose_name = '블로그 검색 캐시'
+        verbose_name_plural = '블로그 검색 캐시 목록'
+
+
+class PlaceProfile(models.Model):
+    """
+    오프라인 일괄 처리(enrich_places)로 미리 만든 장소 프로필.
+    블로그 텍스트/임베딩은 크롤링 캐시와 임베딩 캐시에 저장되고, 여기에는 형용사와 무관한 기본 해시태그를 저장합니다.
+    """
+    content_id = models.CharField(max_length=20, unique=True, verbose_name='콘텐츠 ID')
+
+    # 프로필을 만들 때 사용한 블로그 텍스트의 sha256 (텍스트가 바뀌면 기본 해시태그를 쓰지 않음)
+    text_hash = models.CharField(max_length=64, verbose_name='블로그 텍스트 해시')
+    base_hashtags = models.CharField(max_length=500, blank=True, default='', verbose_name='기본 해시태그')
+
+    enriched_at = models.DateTimeField(db_index=True, verbose_name='처리 시각')
+
+    def __str__(self):
+        return f"[{self.content_id}] {self.base_hashtags}"
+
+    class Meta:
+        db_table = 'ai_place_profile'
+        verbose_name = '장소 프로필'
+        verbose_name_plural = '장소 프로필 목록'
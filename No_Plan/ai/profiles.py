@@ -0,0 +1,57 @@
+# ai/profiles.py
+
+from datetime import timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+from .embedding_store import text_hash
+from .models import PlaceProfile
+
+
+# ===================================================================
+# 미리 계산한 장소 프로필 (enrich_places 명령으로 생성)
+# ===================================================================
+# 요청 경로에서는 블로그 텍스트가 프로필을 만들 때와 같은 장소의 기본 해시태그만 사용합니다.
+PROFILE_MAX_AGE = timedelta(days=30)   # 이보다 오래된 프로필은 enrich_places가 다시 처리합니다.
+
+
+class PlaceProfileStore:
+    def base_hashtags(self, texts: dict[str, str]) -> dict[str, str]:
+        """
+        (동기 함수) {contentid: 현재 블로그 텍스트} -> 텍스트가 바뀌지 않은 장소의 {contentid: 기본 해시태그}
+        """
+        if not texts:
+            return {}
+        rows = PlaceProfile.objects.filter(content_id__in=list(texts)).values_list('content_id', 'text_hash', 'base_hashtags')
+        return {cid: tags for cid, hashed, tags in rows if tags and hashed == text_hash(texts[cid])}
+
+    def enriched_ids(self, content_ids: list[str], max_age: timedelta = PROFILE_MAX_AGE) -> set[str]:
+        """
+        (동기 함수) max_age 안에 이미 처리한 장소 (이어서 실행할 때 건너뜀)
+        """
+        since = timezone.now() - max_age
+        found = set()
+        for i in range(0, len(content_ids), 1000):
+            found.update(PlaceProfile.objects.filter(content_id__in=content_ids[i:i + 1000], enriched_at__gte=since)
+                         .values_list('content_id', flat=True))
+        return found
+
+    def save_many(self, profiles: list[tuple[str, str, str]]):
+        """
+        (동기 함수) [(contentid, 블로그 텍스트, 기본 해시태그)] 를 저장합니다.
+        """
+        if not profiles:
+            return
+        now = timezone.now()
+        PlaceProfile.objects.bulk_create(
+            [PlaceProfile(content_id=cid, text_hash=text_hash(text or ''), base_hashtags=tags[:500], enriched_at=now)
+             for cid, text, tags in profiles],
+            update_conflicts=True,
+            # MySQL은 충돌 대상 컬럼을 지정하지 않습니다. (unique 인덱스로 판단)
+            unique_fields=['content_id'] if connection.features.supports_update_conflicts_with_target else None,
+            update_fields=['text_hash', 'base_hashtags', 'enriched_at'],
+        )
+
+
+place_profile_store = PlaceProfileStore()
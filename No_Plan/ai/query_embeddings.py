@@ -0,0 +1,126 @@
+# ai/query_embeddings.py
+
+import asyncio
+import os
+import threading
+from itertools import combinations
+
+import numpy as np
+
+
+# ===================================================================
+# 형용사 조합별 쿼리 임베딩 (미리 계산)
+# ===================================================================
+# 추천 쿼리는 아래 9개 형용사의 사전적 의미를 이어 붙인 문장이므로 가능한 조합이 최대 2^9 - 1 = 511개입니다.
+# 조합마다 임베딩을 미리 계산해 파일로 저장해 두고 서버 시작 시(또는 처음 조회할 때) 읽어오면, 추천 요청마다
+# 쿼리 임베딩을 위해 OpenAI를 호출할 필요가 없습니다.
+ADJECTIVE_MEANINGS = {'고즈넉한':'고요하고 아늑하고 잠잠하다',
+                      '낭만적인':'현실적이지 않고 신비적이며 공상적인 것. 또는 감동적이며 달콤한 분위기가 있다.',
+                      '모던한':'세련되고 현대적이다.',
+                      '힙한':'고유한 개성과 감각을 가지고 있으면서도 최신 유행에 밝고 신선하다',
+                      '고급스러운':'물건이나 시설 따위의 품질이 뛰어나고 값이 비싼 듯하다.',
+                      '전통적인':'예로부터 이어져 내려오는 듯하다.',
+                      '활동적인':'몸을 움직여 행동하다.',
+                      '산뜻한':'기분이나 느낌이 깨끗하고 시원하다',
+                      '정겨운':'정이 넘칠 정도로 매우 다정하다.' }
+
+
+def combination_key(adjectives) -> str | None:
+    """
+    형용사 조합을 순서와 무관한 키로 바꿉니다. (ADJECTIVE_MEANINGS 순서로 정렬)
+    목록에 없는 형용사가 있으면 None을 반환합니다.
+    """
+    selected = set(adjectives)
+    if not selected or not selected <= ADJECTIVE_MEANINGS.keys():
+        return None
+    return ",".join(adj for adj in ADJECTIVE_MEANINGS if adj in selected)
+
+
+def all_combinations(max_size: int = None) -> list[tuple[str, ...]]:
+    adjectives = list(ADJECTIVE_MEANINGS)
+    max_size = len(adjectives) if max_size is None else max_size
+    return [combo for size in range(1, max_size + 1) for combo in combinations(adjectives, size)]
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class QueryEmbeddingTable:
+    def __init__(self, path=None, compose: bool = True):
+        self.path = path
+        self.compose = compose
+        self.model = None
+        self._vectors = {}  # 조합 키 -> 벡터 (float32)
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self.hits = 0
+        self.composed = 0
+        self.misses = 0
+
+    def load(self, path) -> bool:
+        """
+        precompute_query_embeddings 명령이 만든 .npz 파일을 읽어옵니다. 파일이 없으면 False.
+        """
+        if not path or not os.path.exists(path):
+            print(f"[쿼리 임베딩] 파일이 없어 실시간 임베딩을 사용합니다: {path}")
+            return False
+        with np.load(path, allow_pickle=False) as data:
+            self.model = str(data['model'])
+            vectors = data['vectors'].astype(np.float32)
+            self._vectors = dict(zip(data['keys'].tolist(), vectors))
+        print(f"[쿼리 임베딩] {len(self._vectors)}개 조합 로드 ({self.model})")
+        return True
+
+    def ensure_loaded(self):
+        """
+        path의 파일을 프로세스에서 한 번만 읽어옵니다. (관리 명령은 처음 조회할 때 읽음)
+        """
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                self.load(self.path)
+                self._loaded = True
+
+    async def preload(self):
+        """
+        서버 시작 시(lifespan) 첫 요청이 파일을 읽지 않도록 미리 읽어옵니다.
+        """
+        await asyncio.to_thread(self.ensure_loaded)
+
+    @staticmethod
+    def save(path, model: str, vectors: dict[str, list[float]]):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        keys = list(vectors)
+        np.savez(path, model=np.array(model), keys=np.array(keys),
+                 vectors=np.array([vectors[k] for k in keys], dtype=np.float32))
+
+    def lookup(self, adjectives, model: str) -> np.ndarray | None:
+        """
+        조합의 쿼리 임베딩을 반환합니다. 모델이 다르거나 만들 수 없는 조합이면 None.
+        compose가 켜져 있으면 파일에 없는 조합을 단일 형용사 벡터의 정규화 합으로 만듭니다.
+        """
+        self.ensure_loaded()
+        key = combination_key(adjectives)
+        if key is None or model != self.model:
+            self.misses += 1
+            return None
+        vector = self._vectors.get(key)
+        if vector is not None:
+            self.hits += 1
+            return vector
+        singles = [self._vectors.get(adj) for adj in key.split(",")]
+        if self.compose and all(v is not None for v in singles):
+            self.composed += 1
+            return _normalize(np.sum([_normalize(v) for v in singles], axis=0))
+        self.misses += 1
+        return None
+
+    def stats(self) -> dict:
+        return {"model": self.model, "combinations": len(self._vectors),
+                "hits": self.hits, "composed": self.composed, "misses": self.misses}
+
+
+query_embeddings = QueryEmbeddingTable()
@@ -0,0 +1,83 @@
+# ai/ranking.py
+
+import numpy as np
+
+
+# ===================================================================
+# 유사도 순위 계산 (NumPy)
+# ===================================================================
+# 요청당 장소가 많아야 수십 개이므로 DataFrame/ sklearn 없이 정규화된 float32 행렬과
+# 행렬-벡터 곱 한 번으로 코사인 유사도를 계산하고, argpartition으로 상위 K개만 정렬합니다.
+
+
+class CrawledPlace:
+    """
+    블로그 크롤링 결과 한 건 (장소 1개)
+    """
+    __slots__ = ('contentid', 'name', 'text', 'urls', 'similarity', 'recommend_reason', 'hashtags')
+
+    def __init__(self, contentid: str, name: str, text: str, urls: list[str]):
+        self.contentid = contentid
+        self.name = name
+        self.text = text
+        self.urls = urls
+        self.similarity = None
+        self.recommend_reason = None
+        self.hashtags = None
+
+    def to_dict(self) -> dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __repr__(self):
+        return f"CrawledPlace({self.contentid!r}, {self.name!r}, similarity={self.similarity})"
+
+
+def normalize_rows(vectors) -> np.ndarray:
+    """
+    벡터 목록을 행마다 L2 정규화된 float32 행렬로 만듭니다. (영벡터는 그대로 0)
+    """
+    matrix = np.array(vectors, dtype=np.float32, ndmin=2)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def cosine_scores(matrix: np.ndarray, query) -> np.ndarray:
+    """
+    정규화된 행렬의 각 행과 쿼리 벡터의 코사인 유사도
+    """
+    return matrix @ normalize_rows(query)[0]
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    점수 상위 k개의 인덱스를 내림차순으로 반환합니다. (동점이면 원래 순서 유지)
+    """
+    n = scores.shape[0]
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        candidates.sort()
+    else:
+        candidates = np.arange(n)
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+
+def score_places(records: list[CrawledPlace], embeddings: np.ndarray, query) -> None:
+    """
+    records[i]의 임베딩이 embeddings[i]일 때, 쿼리와의 유사도를 similarity에 기록합니다.
+    """
+    if not records:
+        return
+    for record, score in zip(records, cosine_scores(normalize_rows(embeddings), query).tolist()):
+        record.similarity = score
+
+
+def top_places(records: list[CrawledPlace], k: int) -> list[CrawledPlace]:
+    """
+    유사도 상위 k개 장소를 반환합니다. 유사도가 없는 장소는 가장 뒤로 보냅니다.
+    """
+    scores = np.fromiter((-np.inf if r.similarity is None else r.similarity for r in records),
+                         dtype=np.float64, count=len(records))
+    return [records[i] for i in top_k_indices(scores, k)]
@@ -0,0 +1,98 @@
+# ai/reason_cache.py
+
+import hashlib
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .embedding_store import EVICTION_CHUNK, text_hash
+from .models import ReasonCache
+
+
+# ===================================================================
+# 추천 이유/해시태그 캐시
+# ===================================================================
+# 같은 장소를 같은 형용사/장소유형으로 요청하면 LLM 입력이 완전히 같으므로 결과를 재사용합니다.
+# 블로그 텍스트가 바뀌면(크롤링 캐시 갱신) 텍스트 해시가 달라져 자연스럽게 새로 생성됩니다.
+CACHE_TTL = timedelta(days=30)
+MAX_ROWS = 100_000                  # 이 개수를 넘으면 오래 사용되지 않은 항목부터 삭제
+EVICTION_CHECK_EVERY = 500          # 이 개수만큼 새로 저장할 때마다 용량/만료를 확인
+TOUCH_INTERVAL = timedelta(days=1)  # 최근 사용 시각은 하루에 한 번만 갱신 (쓰기 부하 감소)
+
+
+def reason_key(content_id: str, adjectives: list[str], place_type: str, blog_text: str, chat_model: str) -> dict:
+    fields = {
+        'content_id': str(content_id),
+        'adjectives': ",".join(sorted(set(adjectives))),
+        'place_type': place_type,
+        'text_hash': text_hash(blog_text),
+        'chat_model': chat_model,
+    }
+    fields['key_hash'] = hashlib.sha256("|".join(fields.values()).encode('utf-8')).hexdigest()
+    return fields
+
+
+class ReasonStore:
+    def __init__(self, ttl: timedelta = CACHE_TTL, max_rows: int = MAX_ROWS):
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._inserted_since_check = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, keys: list[dict]) -> dict[str, tuple[str, str]]:
+        """
+        (동기 함수) key_hash -> (추천이유, 해시태그). 만료된 항목은 제외합니다.
+        """
+        if not keys:
+            return {}
+        now = timezone.now()
+        rows = list(ReasonCache.objects.filter(key_hash__in={k['key_hash'] for k in keys}, created_at__gte=now - self.ttl)
+                    .values_list('id', 'key_hash', 'recommend_reason', 'hashtags', 'last_used_at'))
+        stale_ids = [row_id for row_id, _, _, _, used in rows if used < now - TOUCH_INTERVAL]
+        if stale_ids:
+            ReasonCache.objects.filter(id__in=stale_ids).update(last_used_at=now)
+        self.hits += len(rows)
+        self.misses += len(keys) - len(rows)
+        return {key_hash: (reason, tags) for _, key_hash, reason, tags, _ in rows}
+
+    def put_many(self, items: list[tuple[dict, str, str]]):
+        """
+        (동기 함수) [(reason_key(...), 추천이유, 해시태그)] 를 저장합니다. 만료된 같은 키는 새 결과로 바꿉니다.
+        """
+        if not items:
+            return
+        ReasonCache.objects.filter(key_hash__in=[key['key_hash'] for key, _, _ in items]).delete()
+        ReasonCache.objects.bulk_create(
+            [ReasonCache(**key, recommend_reason=reason, hashtags=tags[:500]) for key, reason, tags in items],
+            ignore_conflicts=True,
+        )
+        self._inserted_since_check += len(items)
+        if self._inserted_since_check >= EVICTION_CHECK_EVERY:
+            self._inserted_since_check = 0
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        만료된 항목을 지우고, 최대 개수를 넘는 만큼 가장 오래 사용되지 않은 항목을 (시각, id) 순서로 정확히 삭제합니다.
+        """
+        deleted, _ = ReasonCache.objects.filter(created_at__lt=timezone.now() - self.ttl).delete()
+        excess = ReasonCache.objects.count() - self.max_rows
+        evicted = 0
+        while evicted < excess:
+            ids = list(ReasonCache.objects.order_by('last_used_at', 'id')
+                       .values_list('id', flat=True)[:min(EVICTION_CHUNK, excess - evicted)])
+            if not ids:
+                break
+            evicted += ReasonCache.objects.filter(id__in=ids).delete()[0]
+        deleted += evicted
+        if deleted:
+            print(f"[추천 이유 캐시] {deleted}개 항목 삭제 (최대 {self.max_rows}개)")
+        return deleted
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hits / total, 4) if total else None}
+
+
+reason_store = ReasonStore()
@@ -0,0 +1,162 @@
+# ai/search_cache.py
+
+import asyncio
+from datetime import timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+from .cache import SingleFlight, TTLCache
+from .db import db_sync_to_async
+from .models import BlogSearchCache
+
+
+# ===================================================================
+# 카카오 블로그 검색 결과 캐시 (L1: 프로세스 메모리, L2: DB)
+# ===================================================================
+# dapi.kakao.com 은 일일 쿼터가 가장 빠듯한 업스트림이고, 장소별 검색 결과는 거의 바뀌지 않습니다.
+#  - L1: 워커 프로세스 안의 TTLCache (DB 왕복도 생략)
+#  - L2: 모든 워커가 공유하는 DB 캐시
+#  - L2 항목이 REFRESH_AFTER 보다 오래되면 그대로 사용하면서 백그라운드에서 다시 검색합니다.
+L1_MAXSIZE = 4096
+L1_TTL = 60 * 60                    # 1시간
+L2_TTL = timedelta(days=7)
+REFRESH_AFTER = timedelta(days=1)
+
+
+class BlogSearchStore:
+    def __init__(self, l1_maxsize: int = L1_MAXSIZE, l1_ttl: float = L1_TTL, l2_ttl: timedelta = L2_TTL,
+                 refresh_after: timedelta = REFRESH_AFTER, background_refresh: bool = True):
+        self.l1 = TTLCache(maxsize=l1_maxsize, ttl=l1_ttl)
+        self.l2_ttl = l2_ttl
+        self.refresh_after = refresh_after
+        self.background_refresh = background_refresh
+        self.flight = SingleFlight()
+        self._refreshing = set()
+        self._refresh_due = set()  # get_many로 L1에 채웠지만 갱신 시점이 지난 검색어 (다음 get()에서 갱신)
+        self._background_tasks = set()
+        self.l2_hits = 0
+        self.misses = 0         # L1/L2 모두 없던 조회 수 (동시 요청은 한 번만 검색)
+        self.refreshes = 0      # 백그라운드 갱신 횟수
+        self.errors = 0         # 업스트림 검색 실패 (캐시하지 않음)
+
+    def _load(self, query: str) -> BlogSearchCache | None:
+        return BlogSearchCache.objects.filter(query=query).first()
+
+    def _load_many(self, queries: list[str]) -> list[BlogSearchCache]:
+        return list(BlogSearchCache.objects.filter(query__in=queries))
+
+    def _save(self, query: str, urls: list[str]):
+        BlogSearchCache.objects.bulk_create(
+            [BlogSearchCache(query=query, urls=urls, fetched_at=timezone.now())],
+            update_conflicts=True,
+            # MySQL은 충돌 대상 컬럼을 지정하지 않습니다. (unique 인덱스로 판단)
+            unique_fields=['query'] if connection.features.supports_update_conflicts_with_target else None,
+            update_fields=['urls', 'fetched_at'],
+        )
+
+    async def _fetch_and_store(self, query: str, fetch) -> list[str] | None:
+        urls = await fetch()
+        if urls is None:
+            self.errors += 1
+            return None
+        self.l1.set(query, urls)
+        try:
+            await db_sync_to_async(self._save)(query, urls)
+        except Exception as e:
+            print(f"[블로그 검색 캐시] 저장 실패: {e}")
+        return urls
+
+    async def get(self, query: str, fetch) -> list[str] | None:
+        """
+        검색어의 URL 목록을 캐시에서 찾고, 없으면 fetch()로 검색합니다.
+        fetch()는 URL 목록(실패 시 None)을 반환하는 코루틴 함수이며, 실패 결과는 캐시하지 않습니다.
+        """
+        urls = self.l1.get(query)
+        if urls is not None:
+            if query in self._refresh_due:
+                self._refresh_due.discard(query)
+                self._refresh_in_background(query, fetch)
+            return urls
+
+        try:
+            entry = await db_sync_to_async(self._load)(query)
+        except Exception as e:
+            print(f"[블로그 검색 캐시] 조회 실패: {e}")
+            entry = None
+        if entry is not None:
+            age = timezone.now() - entry.fetched_at
+            if age < self.l2_ttl:
+                self.l2_hits += 1
+                self.l1.set(query, entry.urls)
+                if self.background_refresh and age >= self.refresh_after:
+                    self._refresh_in_background(query, fetch)
+                return entry.urls
+
+        self.misses += 1
+        # 같은 검색어가 동시에 들어오면 한 번만 검색합니다.
+        return await self.flight.do(query, lambda: self._fetch_and_store(query, fetch))
+
+    async def get_many(self, queries: list[str]) -> dict[str, list[str]]:
+        """
+        L1에 없는 검색어들을 한 번의 DB 조회로 L2에서 읽어 L1에 채웁니다. 찾은 검색어 -> URL 목록을 반환합니다.
+        장소별 get()이 각자 DB를 조회하지 않도록 여러 장소를 검색하기 전에 호출합니다.
+        """
+        found = {}
+        missing = []
+        for query in dict.fromkeys(queries):
+            urls = self.l1.get(query)
+            if urls is None:
+                missing.append(query)
+            else:
+                found[query] = urls
+        if not missing:
+            return found
+
+        try:
+            entries = await db_sync_to_async(self._load_many)(missing)
+        except Exception as e:
+            print(f"[블로그 검색 캐시] 조회 실패: {e}")
+            return found
+        now = timezone.now()
+        for entry in entries:
+            age = now - entry.fetched_at
+            if age >= self.l2_ttl:
+                continue
+            self.l2_hits += 1
+            self.l1.set(entry.query, entry.urls)
+            if self.background_refresh and age >= self.refresh_after:
+                self._refresh_due.add(entry.query)
+            found[entry.query] = entry.urls
+        return found
+
+    def _refresh_in_background(self, query: str, fetch):
+        if query in self._refreshing:
+            return
+        self._refreshing.add(query)
+        self.refreshes += 1
+
+        async def refresh():
+            try:
+                await self._fetch_and_store(query, fetch)
+            finally:
+                self._refreshing.discard(query)
+
+        task = asyncio.ensure_future(refresh())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def stats(self) -> dict:
+        l1 = self.l1.stats()
+        lookups = l1['hits'] + l1['misses']
+        return {
+            "l1": l1,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            "hit_rate": round((l1['hits'] + self.l2_hits) / lookups, 4) if lookups else None,
+        }
+
+
+blog_search_store = BlogSearchStore()
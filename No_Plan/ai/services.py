@@ -1,15 +1,25 @@
 # ai/services.py
 
 import asyncio
-import aiohttp
-from bs4 import BeautifulSoup
-import pandas as pd
+import json
+import numpy as np
 import re
 import tiktoken
-from openai import AsyncOpenAI
-from sklearn.metrics.pairwise import cosine_similarity
+import time
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from django.conf import settings
 
+from .crawl_cache import crawled_text_store
+from .db import db_sync_to_async
+from .embedding_store import embedding_store, text_hash
+from .extraction import clean_text, extraction_pool, truncate_text
+from .limiter import observe_openai_response, openai_limiters
+from .query_embeddings import ADJECTIVE_MEANINGS, query_embeddings
+from .reason_cache import reason_key, reason_store
+from .search_cache import blog_search_store
+from .ranking import CrawledPlace, score_places, top_places
+from .upstream import get_policy, upstream_request
+
 
 # --- Semaphore를 사용하기 위한 헬퍼 함수 ---
 async def gather_with_concurrency(limit, *tasks):
@@ -25,119 +35,419 @@ async def gather_with_concurrency(limit, *tasks):
     return await asyncio.gather(*(sem_task(task) for task in tasks))
 
 
-class BlogCrawler:
-    _CONTROL = re.compile(r'[\u200b-\u200f\u202a-\u202e]')
-    _EMOJI = re.compile("["
-                        u"\U0001F600-\U0001F64F" u"\U0001F300-\U0001F5FF" u"\U0001F680-\U0001F6FF"
-                        u"\U0001F1E0-\U0001F1FF" u"\U0001F900-\U0001F9FF" u"\U0001FA70-\U0001FAFF"
-                        u"\u2300-\u23FF" u"\u2600-\u26FF" u"\u2700-\u27BF" u"\u2B00-\u2BFF" u"\uFE0F"
-                        "]+", flags=re.UNICODE)
+# --- 여러 비동기 이터레이터를 나오는 순서대로 합치는 헬퍼 함수 ---
+async def merge_async_iterators(*iterators):
+    """
+    여러 비동기 이터레이터를 동시에 소비하면서, 값이 나오는 순서대로 내보냅니다.
+    """
+    queue = asyncio.Queue()
+    finished = object()
+
+    async def drain(iterator):
+        try:
+            async for item in iterator:
+                queue.put_nowait((None, item))
+        except Exception as e:
+            queue.put_nowait((finished, e))
+        else:
+            queue.put_nowait((finished, None))
+
+    tasks = [asyncio.ensure_future(drain(iterator)) for iterator in iterators]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            marker, item = await queue.get()
+            if marker is finished:
+                remaining -= 1
+                if item is not None:
+                    raise item
+                continue
+            yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _read_page_bytes(resp) -> tuple[int, bytes, str | None, dict]:
+    if resp.status >= 500:
+        resp.raise_for_status()  # 서버 오류는 업스트림 실패로 집계합니다.
+    # 디코딩/파싱은 추출 풀에서 하므로 원본 바이트와 문자셋만 넘깁니다.
+    # 크롤링 캐시 재검증을 위해 ETag/Last-Modified도 함께 반환합니다.
+    validators = {key: resp.headers[header] for key, header in (('etag', 'ETag'), ('last_modified', 'Last-Modified'))
+                  if header in resp.headers}
+    return resp.status, await resp.read(), resp.charset, validators
+
+
+async def _read_kakao_response(resp) -> tuple[int, dict | str]:
+    if resp.status >= 500 or resp.status == 429:
+        resp.raise_for_status()
+    if resp.status != 200:
+        return resp.status, await resp.text()
+    return resp.status, await resp.json()
+
+
+# 장소별 블로그 검색/크롤링 전체 처리의 동시 장소 수
+CONCURRENCY_LIMIT_PLACES = 30
+# 오래된 크롤링 캐시를 백그라운드에서 재검증할 때의 동시 장소 수
+REVALIDATE_CONCURRENCY = 5
+_revalidating = set()       # 재검증 중인 contentid
+_background_tasks = set()   # 실행 중인 백그라운드 작업 (GC 방지)
+
+
+# OpenAI 호출은 SDK가 자체 재시도를 하므로 서킷 브레이커/통계만 적용합니다.
+openai_policy = get_policy('api.openai.com')
+# 블로그 페이지는 쿼터가 없는 멱등 GET이므로 느린 응답에는 헤지 요청을 보냅니다.
+get_policy('blog.naver.com', hedge=True)
+
+
+async def call_openai(kind: str, factory, lane: str = 'default'):
+    """
+    OpenAI 호출을 프로세스 전체의 적응형 동시성 제한(kind: 'embeddings' | 'chat', ai/limiter.py)과
+    업스트림 정책(서킷 브레이커)을 거쳐 실행합니다. lane: 'interactive' | 'default' | 'bulk'
+    """
+    limiter = openai_limiters[kind]
+    async with limiter.slot(lane):
+        start = time.monotonic()
+        result = await openai_policy.call(factory)
+        limiter.record_success(time.monotonic() - start)
+    return result
+
 
+class BlogCrawler:
     def __init__(self, model: str = "text-embedding-3-small", max_tokens: int = 2500,
                  placeholder: str = "<NO_CONTENT>"):
-        self.encoding = tiktoken.encoding_for_model(model)
+        self.model = model
         self.max_tokens = max_tokens
         self.placeholder = placeholder
 
-    async def fetch(self, session, url: str, referer: str = None) -> str | None:
+    async def fetch(self, url: str, referer: str = None,
+                    validators: dict = None) -> tuple[int, bytes, str | None, dict] | None:
+        """
+        (상태 코드, 본문 바이트, 문자셋, ETag/Last-Modified)를 반환합니다. validators를 주면 조건부 요청을 보냅니다.
+        """
         headers = {"User-Agent": "Mozilla/5.0"}
         if referer: headers["Referer"] = referer
+        if validators and validators.get('etag'): headers["If-None-Match"] = validators['etag']
+        if validators and validators.get('last_modified'): headers["If-Modified-Since"] = validators['last_modified']
         try:
-            async with session.get(url, headers=headers, timeout=5) as resp:
-                return await resp.text()
+            return await upstream_request('GET', url, _read_page_bytes, headers=headers, timeout=5)
         except Exception:
             return None
 
     def clean(self, text: str) -> str:
-        text = self._CONTROL.sub("", text)
-        return self._EMOJI.sub("", text)
+        return clean_text(text)
 
     def truncate(self, text: str) -> str:
-        toks = self.encoding.encode(text)
-        if len(toks) > self.max_tokens:
-            return self.encoding.decode(toks[:self.max_tokens])
-        return text
-
-    async def get_text(self, session, url: str) -> str:
-        html = await self.fetch(session, url)
-        if not html: return self.placeholder
-        soup = BeautifulSoup(html, "lxml")
-        iframe = soup.find("iframe", id="mainFrame")
-        if iframe and iframe.get("src"):
-            html = await self.fetch(session, "https://blog.naver.com" + iframe["src"], referer=url)
-            if not html: return self.placeholder
-            soup = BeautifulSoup(html, "lxml")
-        cont = soup.find("div", class_="se-main-container")
-        if not cont: return self.placeholder
-        return self.clean(cont.get_text(strip=True))
-
-    async def _search_blogs_aio(self, session: aiohttp.ClientSession, api_key: str, name: str, addr: str) -> list[str]:
+        return truncate_text(text, self.model, self.max_tokens)
+
+    async def get_text(self, url: str) -> str:
+        return (await self.get_text_with_source(url))[0]
+
+    async def get_text_with_source(self, url: str) -> tuple[str, dict | None]:
+        """
+        블로그 본문을 정리하고 max_tokens로 자른 텍스트와, 재검증에 쓸 출처 정보를 반환합니다.
+        파싱/자르기는 추출 풀(extraction_pool)에서 실행되어 이벤트 루프를 막지 않습니다.
+        """
+        page = await self.fetch(url)
+        if not page: return self.placeholder, None
+        source = {"url": url, "content_url": url, "referer": None, **page[3]}
+        try:
+            kind, value = await extraction_pool.extract(*page[1:3], True, self.model, self.max_tokens)
+            if kind == 'iframe':
+                content_url = "https://blog.naver.com" + value
+                page = await self.fetch(content_url, referer=url)
+                if not page: return self.placeholder, None
+                source = {"url": url, "content_url": content_url, "referer": url, **page[3]}
+                kind, value = await extraction_pool.extract(*page[1:3], False, self.model, self.max_tokens)
+        except Exception as e:
+            print(f"[블로그 추출] 실패 {url}: {e}")
+            return self.placeholder, None
+        return (value, source) if kind == 'text' else (self.placeholder, source)
+
+    @staticmethod
+    def blog_query(name: str, addr: str) -> str:
+        addr = ' '.join(addr.split()[:2]) # 주소의 시, 구만 사용
+        return f'{name} {addr}'
+
+    async def _search_blogs_aio(self, api_key: str, name: str, addr: str) -> list[str] | None:
+        """
+        블로그 검색 캐시(blog_search_store)를 거쳐 네이버 블로그 URL을 최대 3개 반환합니다. 검색에 실패하면 None을 반환합니다.
+        """
+        query = self.blog_query(name, addr)
+        return await blog_search_store.get(query, lambda: self._search_blogs_live(api_key, name, query))
+
+    async def _search_blogs_live(self, api_key: str, name: str, query: str) -> list[str] | None:
+        """
+        카카오 블로그 검색을 호출합니다. 실패하면 (캐시하지 않도록) None을 반환합니다.
+        """
         URL = "https://dapi.kakao.com/v2/search/blog"
         headers = {"Authorization": f"KakaoAK {api_key}"}
-        addr = ' '.join(addr.split()[:2]) # 주소의 시, 구만 사용
-        params = {"query": f'{name} {addr}', "size": 10}
+        params = {"query": query, "size": 10}
         try:
-            async with session.get(URL, headers=headers, params=params, timeout=5) as resp:
-                if resp.status != 200:
-                    print(f"Daum API Error for '{name}': Status {resp.status}, Response: {await resp.text()}")
-                    return []
-                data = await resp.json()
-                urls = [doc['url'] for doc in data.get('documents', [])]
-                return [url for url in urls if 'https://blog.naver.com' in url][:3] # 네이버 블로그만을 추출
+            resp_status, data = await upstream_request('GET', URL, _read_kakao_response, headers=headers,
+                                                       params=params, timeout=5, retries=1)
+            if resp_status != 200:
+                print(f"Daum API Error for '{name}': Status {resp_status}, Response: {data}")
+                return None
+            urls = [doc['url'] for doc in data.get('documents', [])]
+            return [url for url in urls if 'https://blog.naver.com' in url][:3] # 네이버 블로그만을 추출
         except Exception as e:
             print(f"Daum API request failed for '{name}': {e}")
-            return []
-
-    async def crawl_all(self, place_infos_with_id: list[tuple[str, str, str]], print_text = False) -> pd.DataFrame:
-        daum_api_key = settings.DAUM_API_KEY
-
-        # 각 장소에 대한 전체 처리 프로세스를 동시 30개로 제한
-        CONCURRENCY_LIMIT_PLACES = 30
-
-        async def process_place(contentid, name, addr, session):
-            urls = await self._search_blogs_aio(session, daum_api_key, name, addr)
-            if not urls:
-                combined_text = self.placeholder
-            else:
-                crawl_tasks = [self.get_text(session, url) for url in urls]
-                # 각 장소 내부의 블로그 크롤링은 동시 5개로 제한
-                crawled_texts = await gather_with_concurrency(5, *crawl_tasks)
-                truncated_texts = [self.truncate(text) for text in crawled_texts]
-                incorrect_texts = [text if (text == self.placeholder)
-                                           or (re.sub(r'\([^)]*\)', '', name.split()[0]) in text.replace(" ", "")) # 이름에서 지졈명과 괄호 안 내용 삭제, 공백을 삭제한 블로그 텍스트와 비교
-                    else '<INCORRECT_CONTENT>'
-                    for text in truncated_texts]
-                
-                # 블로그 결과 디버깅용 print_text
-                if print_text:
-                    combined_text = " ".join(incorrect_texts)
-                    return {"contentid": contentid, "관광지명": name, "텍스트": combined_text, 'urls': urls}
-                
-                # placeholder 제거 
-                clean_text = [t for t in incorrect_texts if t not in ("<INCORRECT_CONTENT>", self.placeholder)]
-                combined_text = " ".join(clean_text)
-                # 결과가 없거나 불일치한 블로그만 있는 경우 None반환
-                if not combined_text.strip():
-                    return None
-                    
-            return {"contentid": contentid, "관광지명": name, "텍스트": combined_text, 'urls': urls}
-
-        async with aiohttp.ClientSession() as session:
-            tasks = [process_place(cid, n, a, session) for cid, n, a in place_infos_with_id]
-            raw_results = await gather_with_concurrency(CONCURRENCY_LIMIT_PLACES, *tasks)
-            final_results = [r for r in raw_results if r is not None] # 크롤링 결과가 없는 장소 제거
-
-        return pd.DataFrame(final_results)
+            return None
+
+    async def crawl_place(self, contentid: str, name: str, addr: str,
+                          print_text: bool = False) -> tuple[CrawledPlace | None, list[dict]]:
+        """
+        장소 하나의 블로그를 검색/크롤링합니다. (결과, 재검증용 출처 정보 목록)을 반환합니다.
+        검색이나 블로그 요청이 실패해 결과가 없으면 출처 정보 목록 대신 None을 반환합니다. (일시적 실패이므로 캐시하지 않음)
+        """
+        urls = await self._search_blogs_aio(settings.DAUM_API_KEY, name, addr)
+        if urls is None:
+            return CrawledPlace(contentid, name, self.placeholder, []), None
+        if not urls:
+            return CrawledPlace(contentid, name, self.placeholder, urls), []
+
+        crawl_tasks = [self.get_text_with_source(url) for url in urls]
+        # 각 장소 내부의 블로그 크롤링은 동시 5개로 제한
+        # get_text_with_source가 이미 max_tokens로 잘라서 반환합니다.
+        crawled = await gather_with_concurrency(5, *crawl_tasks)
+        sources = [source for _, source in crawled if source is not None]
+        incorrect_texts = [text if (text == self.placeholder)
+                                   or (re.sub(r'\([^)]*\)', '', name.split()[0]) in text.replace(" ", "")) # 이름에서 지졈명과 괄호 안 내용 삭제, 공백을 삭제한 블로그 텍스트와 비교
+            else '<INCORRECT_CONTENT>'
+            for text, _ in crawled]
+
+        # 블로그 결과 디버깅용 print_text
+        if print_text:
+            combined_text = " ".join(incorrect_texts)
+            return CrawledPlace(contentid, name, combined_text, urls), sources
+
+        # placeholder 제거
+        valid_texts = [t for t in incorrect_texts if t not in ("<INCORRECT_CONTENT>", self.placeholder)]
+        combined_text = " ".join(valid_texts)
+        # 결과가 없거나 불일치한 블로그만 있는 경우 None반환
+        if not combined_text.strip():
+            # 가져오지 못한 블로그가 있으면 실제로 내용이 없는지 알 수 없습니다.
+            return None, (sources if len(sources) == len(crawled) else None)
+
+        return CrawledPlace(contentid, name, combined_text, urls), sources
+
+    async def crawl_all(self, place_infos_with_id: list[tuple[str, str, str]], print_text = False) -> list[CrawledPlace]:
+        """
+        크롤링 캐시(crawled_text_store)에 있는 장소는 캐시를 사용하고, 없거나 만료된 장소만 크롤링합니다.
+        오래된 캐시는 그대로 사용하면서 백그라운드에서 재검증합니다. print_text(디버깅)는 캐시를 사용하지 않습니다.
+        """
+        if print_text:
+            tasks = [self.crawl_place(cid, n, a, print_text=True) for cid, n, a in place_infos_with_id]
+            return [r for r, _ in await gather_with_concurrency(CONCURRENCY_LIMIT_PLACES, *tasks) if r is not None]
+        records, _ = await self.crawl_all_until(place_infos_with_id)
+        return records
+
+    async def crawl_all_until(self, place_infos_with_id: list[tuple[str, str, str]],
+                              deadline: float = None) -> tuple[list[CrawledPlace], set[str]]:
+        """
+        crawl_all과 같지만 deadline(time.monotonic 기준 시각)까지 끝나지 않은 장소는 기다리지 않고
+        (크롤링 결과, 미완료 contentid 집합)을 반환합니다.
+        미완료 장소의 크롤링은 백그라운드에서 계속되어 크롤링 캐시에 저장되므로 다음 요청에서 사용됩니다.
+        """
+        try:
+            cached = await db_sync_to_async(crawled_text_store.get_many)([cid for cid, _, _ in place_infos_with_id])
+        except Exception as e:
+            print(f"[크롤링 캐시] 조회 실패: {e}")
+            cached = {}
+
+        results, to_crawl, to_revalidate = {}, [], []
+        for cid, name, addr in place_infos_with_id:
+            entry = cached.get(cid)
+            state = crawled_text_store.state(entry)
+            if state == 'expired':
+                to_crawl.append((cid, name, addr))
+                continue
+            results[cid] = CrawledPlace(cid, name, entry.text, entry.urls) if entry.text is not None else None
+            if state == 'stale':
+                to_revalidate.append((cid, name, addr, entry.sources))
+
+        # 크롤링할 장소들의 블로그 검색 캐시(L2)를 한 번에 읽어 둡니다. (장소별 DB 조회 방지)
+        if to_crawl:
+            await blog_search_store.get_many([self.blog_query(name, addr) for _, name, addr in to_crawl])
+
+        # 요청은 upstream_request를 통해 앱 수명 동안 재사용되는 공유 세션으로 나갑니다.
+        semaphore = asyncio.Semaphore(CONCURRENCY_LIMIT_PLACES)
+
+        async def crawl(cid, name, addr):
+            async with semaphore:
+                return await self.crawl_place(cid, name, addr)
+
+        tasks = [asyncio.ensure_future(crawl(*info)) for info in to_crawl]
+        pending = set()
+        try:
+            if tasks:
+                _, pending = await asyncio.wait(tasks, timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+        finished = [(info, task.result()) for info, task in zip(to_crawl, tasks) if task not in pending]
+        for (cid, _, _), (record, _) in finished:
+            results[cid] = record
+        await self._save_crawled(finished)
+        if pending:
+            self._save_in_background([(info, task) for info, task in zip(to_crawl, tasks) if task in pending])
+
+        if to_revalidate:
+            self.revalidate_in_background(to_revalidate)
+        print(f"  [크롤링 캐시] {len(place_infos_with_id)}개 중 {len(place_infos_with_id) - len(to_crawl)}개 캐시 사용"
+              f" (재검증 {len(to_revalidate)}개" + (f", 시간 초과로 미완료 {len(pending)}개)" if pending else ")"))
+        if to_crawl:
+            print(f"  [블로그 검색 캐시] {blog_search_store.stats()}")
+        # 크롤링 결과가 없는 장소 제거
+        records = [results[cid] for cid, _, _ in place_infos_with_id if results.get(cid) is not None]
+        return records, {cid for (cid, _, _), task in zip(to_crawl, tasks) if task in pending}
+
+    @staticmethod
+    async def _save_crawled(finished: list[tuple[tuple[str, str, str], tuple[CrawledPlace | None, list[dict] | None]]]):
+        # 일시적인 실패(출처 정보 None)는 다음 요청에서 다시 크롤링하도록 저장하지 않습니다.
+        finished = [item for item in finished if item[1][1] is not None]
+        if not finished:
+            return
+        try:
+            await db_sync_to_async(crawled_text_store.save_many)([
+                (cid, name, record.text if record else None, record.urls if record else [], sources)
+                for (cid, name, _), (record, sources) in finished])
+        except Exception as e:
+            print(f"[크롤링 캐시] 저장 실패: {e}")
+
+    def _save_in_background(self, late: list[tuple[tuple[str, str, str], asyncio.Task]]):
+        async def wait_and_save():
+            await asyncio.wait([task for _, task in late])
+            await self._save_crawled([(info, task.result()) for info, task in late
+                                      if not task.cancelled() and task.exception() is None])
+
+        task = asyncio.ensure_future(wait_and_save())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    def revalidate_in_background(self, stale: list[tuple[str, str, str, list[dict]]]):
+        stale = [item for item in stale if item[0] not in _revalidating]
+        if not stale:
+            return
+        _revalidating.update(item[0] for item in stale)
+        task = asyncio.ensure_future(self._revalidate_all(stale))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    async def _revalidate_all(self, stale: list[tuple[str, str, str, list[dict]]]):
+        try:
+            await gather_with_concurrency(REVALIDATE_CONCURRENCY, *(self.revalidate(*item) for item in stale))
+        finally:
+            _revalidating.difference_update(item[0] for item in stale)
+
+    async def revalidate(self, contentid: str, name: str, addr: str, sources: list[dict]):
+        """
+        출처 페이지에 조건부 요청을 보내 모두 304이면 확인 시각만 갱신하고,
+        하나라도 바뀌었거나 검증 정보가 없으면 장소를 다시 크롤링해 저장합니다.
+        """
+        try:
+            unchanged = bool(sources) and all(s.get('etag') or s.get('last_modified') for s in sources)
+            for source in sources if unchanged else []:
+                page = await self.fetch(source['content_url'], referer=source.get('referer'), validators=source)
+                if page is None or page[0] != 304:
+                    unchanged = False
+                    break
+            if unchanged:
+                await db_sync_to_async(crawled_text_store.touch)(contentid)
+                return
+            record, new_sources = await self.crawl_place(contentid, name, addr)
+            if new_sources is None:
+                return  # 일시적인 실패: 기존 캐시를 그대로 둡니다.
+            await db_sync_to_async(crawled_text_store.save_many)([
+                (contentid, name, record.text if record else None, record.urls if record else [], new_sources)])
+        except Exception as e:
+            print(f"[크롤링 캐시] {name} 재검증 실패: {e}")
+
+
+# 추천 이유/해시태그 생성 지시사항 (장소별 호출과 배치 호출이 함께 사용)
+REASON_GUIDE = """당신의 역할은 "관광지명"과 해당 관광지의 블로그 후기인 "블로그" 텍스트를 활용하여 사용자에게 장소를 추천해주는 것입니다.
+아래 "형용사"는 사용자가 장소에 대해 원하는 분위기이고, "형용사 의미"는 "형용사의 사전적 의미에 대한 정보입니다.
+(1) '블로그' 텍스트에서 '장소유형'에 맞는 장소의 특징, 서비스 등의 직접적으로 관련된 내용을 추출하여 요약하세요. 이때, 주변 이야기나 "관광지명"과 관련 없는 정보는 절대 포함하지 마세요.
+(2) (1)에서 요약한 정보로 사용자가 제시한 "형용사"가 잘 어울리는 이유를 작성하세요. 이때, 제시된 형용사를 직접적으로 언급하는 건 지양하고, '관광지명'으로 시작하세요. 
+지시사항을 기반으로 해요체를 사용하여 해당 장소의 추천이유를 1~2 문장으로 작성하세요.
+또한, 형용사를 배제하고 (1)에서 요약한 내용을 기반으로, 해당 장소를 잘 나타내는 명사와 형용사로 3~5개의 해시태그를 만드세요.
+(3) 해시태그는 흔히 쓰이는 일반적이고 추상적인 표현(예: #전통적, #청결한, #건강한, #아늑한, #세련된 등)을 배제하세요. 
+대신 블로그 텍스트에서 드러나는 **특정 메뉴, 공간 구조, 인테리어, 뷰, 독창적인 서비스, 전통·지역적 요소**와 같이 
+그 장소만의 차별적이고 구체적인 특징을 반영한 키워드를 사용하세요. 
+명사(메뉴, 공간, 경험 요소)를 중심으로 필요시 형용사를 조합하여 3~5개의 해시태그를 작성하세요.
+추천이유 예시: "다동 황소 막창은 쫄깃하고 고소한 막창과 깔끔한 반찬이 어우러져 맛과 품질 모두 뛰어난 곳이에요."
+"""
+
+# 프롬프트가 요구하는 해시태그 개수. 벗어난 응답은 검증에서 걸러 장소별 요청으로 다시 생성합니다.
+MIN_HASHTAGS, MAX_HASHTAGS = 3, 5
+HASHTAGS_SCHEMA = {"type": "array", "items": {"type": "string"}, "minItems": MIN_HASHTAGS, "maxItems": MAX_HASHTAGS}
+
+# 배치 응답 JSON 스키마 (장소마다 id, 추천 이유, 해시태그 목록)
+REASON_BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "places": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "string"},
+                    "reason": {"type": "string"},
+                    "hashtags": HASHTAGS_SCHEMA,
+                },
+                "required": ["id", "reason", "hashtags"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["places"],
+    "additionalProperties": False,
+}
+# 기본 해시태그(형용사 무관) 배치 응답 JSON 스키마
+BASE_HASHTAG_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "places": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"id": {"type": "string"}, "hashtags": HASHTAGS_SCHEMA},
+                "required": ["id", "hashtags"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["places"],
+    "additionalProperties": False,
+}
+# 배치 호출의 장소당 출력 토큰 수 (장소별 호출의 max_tokens와 동일)
+REASON_OUTPUT_TOKENS = 200
+# 생성 실패 시 반환하는 문구 (캐시하지 않음)
+FAILED_REASONS = {"추천 이유를 생성하지 못했습니다.", "추천 이유 생성 실패"}
+FAILED_HASHTAGS = {"#해시태그_없음", "해시태그 생성 실패"}
 
 
 class RecommendationEngine:
     def __init__(self, embedding_model: str = "text-embedding-3-small", chat_model: str = "gpt-4.1-nano",
-                 top_k: int = 5):
+                 top_k: int = 5, reason_batch_size: int = None, reason_batch_token_budget: int = None,
+                 lane: str = 'default'):
         api_key = settings.OPENAI_API_KEY
-        self.client = AsyncOpenAI(api_key=api_key)
+        # 429/잔여 한도 헤더를 동시성 제한기에 전달하기 위해 응답 훅을 붙입니다.
+        self.client = AsyncOpenAI(api_key=api_key, http_client=DefaultAsyncHttpxClient(
+            event_hooks={'response': [observe_openai_response]}))
+        # OpenAI 동시성 제한의 우선순위 레인 (여행 요약은 항상 interactive)
+        self.lane = lane
         self.embedding_model = embedding_model
         self.chat_model = chat_model
         self.top_k = top_k
+        self.reason_batch_size = reason_batch_size or settings.AI_REASON_BATCH_SIZE
+        self.reason_batch_token_budget = reason_batch_token_budget or settings.AI_REASON_BATCH_TOKEN_BUDGET
+        try:
+            self.encoding = tiktoken.encoding_for_model(chat_model)
+        except KeyError:
+            self.encoding = tiktoken.get_encoding("o200k_base")
 
     async def __aenter__(self):
         return self
@@ -146,53 +456,59 @@ class RecommendationEngine:
         if hasattr(self.client, 'close'):
             await self.client.close()
 
-    async def get_embedding(self, text: list[str]) -> list[list[float]]:
-        res = await self.client.embeddings.create(input=text, model=self.embedding_model)
-        return [list(r.embedding) for r in res.data]
+    async def get_embedding(self, text: list[str]) -> np.ndarray:
+        """
+        임베딩 캐시(DB)에 있는 텍스트는 재사용하고, 없는 텍스트만 한 번의 요청으로 임베딩합니다.
+        캐시 조회/저장에 실패해도 임베딩 결과는 그대로 반환합니다. 결과는 (텍스트 수, 차원) float32 행렬입니다.
+        """
+        hashes = [text_hash(t) for t in text]
+        try:
+            vectors = await db_sync_to_async(embedding_store.get_many)(self.embedding_model, hashes)
+        except Exception as e:
+            print(f"[임베딩 캐시] 조회 실패: {e}")
+            vectors = {}
+
+        # 같은 텍스트가 여러 번 있어도 한 번만 요청합니다.
+        misses = {h: t for h, t in zip(hashes, text) if h not in vectors}
+        if misses:
+            res = await call_openai('embeddings', lambda: self.client.embeddings.create(input=list(misses.values()), model=self.embedding_model), lane=self.lane)
+            fresh = {h: r.embedding for h, r in zip(misses, res.data)}
+            vectors.update(fresh)
+            try:
+                await db_sync_to_async(embedding_store.put_many)(self.embedding_model, fresh)
+            except Exception as e:
+                print(f"[임베딩 캐시] 저장 실패: {e}")
+        print(f"[임베딩 캐시] {len(text)}개 중 {sum(h not in misses for h in hashes)}개 재사용")
+
+        return np.array([vectors[h] for h in hashes], dtype=np.float32)
 
     async def get_query_embedding(self, text: str) -> list[float]:
-        response = await self.client.embeddings.create(input=[text], model=self.embedding_model)
+        response = await call_openai('embeddings', lambda: self.client.embeddings.create(input=[text], model=self.embedding_model), lane=self.lane)
         return response.data[0].embedding
 
     @staticmethod
     def adjectives_to_query(adjectives: list[str]) -> str:
-        adj_mean_mapping_dict = {'고즈넉한':'고요하고 아늑하고 잠잠하다', 
-                                 '낭만적인':'현실적이지 않고 신비적이며 공상적인 것. 또는 감동적이며 달콤한 분위기가 있다.', 
-                                 '모던한':'세련되고 현대적이다.', 
-                                 '힙한':'고유한 개성과 감각을 가지고 있으면서도 최신 유행에 밝고 신선하다', 
-                                 '고급스러운':'물건이나 시설 따위의 품질이 뛰어나고 값이 비싼 듯하다.', 
-                                 '전통적인':'예로부터 이어져 내려오는 듯하다.', 
-                                 '활동적인':'몸을 움직여 행동하다.', 
-                                 '산뜻한':'기분이나 느낌이 깨끗하고 시원하다',
-                                 '정겨운':'정이 넘칠 정도로 매우 다정하다.' }
-        return " ".join(adj_mean_mapping_dict[adj] for adj in adjectives)
-
-    def recommend_spots(self, df: pd.DataFrame, query_emb: list[float]) -> pd.DataFrame:
-        df_embed = df.dropna(subset=['embedding'])
-        if df_embed.empty: return pd.DataFrame()
-        matrix = df_embed["embedding"].tolist()
-        sims = cosine_similarity([query_emb], matrix)[0]
-        df_copy = df_embed.copy()
-        df_copy["similarity"] = sims
-        return df_copy.sort_values(by="similarity", ascending=False).head(self.top_k)
+        return " ".join(ADJECTIVE_MEANINGS[adj] for adj in adjectives)
+
+    async def get_adjectives_embedding(self, adjectives: list[str]) -> np.ndarray:
+        """
+        미리 계산해 둔 형용사 조합 임베딩을 사용하고, 없을 때만 OpenAI에 요청합니다.
+        """
+        vector = query_embeddings.lookup(adjectives, self.embedding_model)
+        if vector is not None:
+            return vector
+        return np.array(await self.get_query_embedding(self.adjectives_to_query(adjectives)), dtype=np.float32)
+
+    def recommend_spots(self, places: list[CrawledPlace], embeddings: np.ndarray, query_emb) -> list[CrawledPlace]:
+        score_places(places, embeddings, query_emb)
+        return top_places(places, self.top_k)
     
     # ===================================================================
     # 여행 요약 생성 (09.08 수정 내용 : 해시태그 장소 특색 더 살린 키워드로 수정 )
     # ===================================================================
     async def generate_reason_and_hashtags(self, spot_name: str, adjectives: list[str], adjectives_query: str, blog_text: str, place_type: str) -> tuple[str, str]:
         prompt = f"""
-당신의 역할은 "관광지명"과 해당 관광지의 블로그 후기인 "블로그" 텍스트를 활용하여 사용자에게 장소를 추천해주는 것입니다.
-아래 "형용사"는 사용자가 장소에 대해 원하는 분위기이고, "형용사 의미"는 "형용사의 사전적 의미에 대한 정보입니다.
-(1) '블로그' 텍스트에서 '장소유형'에 맞는 장소의 특징, 서비스 등의 직접적으로 관련된 내용을 추출하여 요약하세요. 이때, 주변 이야기나 "관광지명"과 관련 없는 정보는 절대 포함하지 마세요.
-(2) (1)에서 요약한 정보로 사용자가 제시한 "형용사"가 잘 어울리는 이유를 작성하세요. 이때, 제시된 형용사를 직접적으로 언급하는 건 지양하고, '관광지명'으로 시작하세요. 
-지시사항을 기반으로 해요체를 사용하여 해당 장소의 추천이유를 1~2 문장으로 작성하세요.
-또한, 형용사를 배제하고 (1)에서 요약한 내용을 기반으로, 해당 장소를 잘 나타내는 명사와 형용사로 3~5개의 해시태그를 만드세요.
-(3) 해시태그는 흔히 쓰이는 일반적이고 추상적인 표현(예: #전통적, #청결한, #건강한, #아늑한, #세련된 등)을 배제하세요. 
-대신 블로그 텍스트에서 드러나는 **특정 메뉴, 공간 구조, 인테리어, 뷰, 독창적인 서비스, 전통·지역적 요소**와 같이 
-그 장소만의 차별적이고 구체적인 특징을 반영한 키워드를 사용하세요. 
-명사(메뉴, 공간, 경험 요소)를 중심으로 필요시 형용사를 조합하여 3~5개의 해시태그를 작성하세요.
-추천이유 예시: "다동 황소 막창은 쫄깃하고 고소한 막창과 깔끔한 반찬이 어우러져 맛과 품질 모두 뛰어난 곳이에요."
-- 형용사: {adjectives}
+{REASON_GUIDE}- 형용사: {adjectives}
 - 형용사 의미: {adjectives_query}
 - 관광지명: {spot_name}
 - 장소유형: {place_type}
@@ -202,9 +518,9 @@ class RecommendationEngine:
 2. 해시태그: #(특색 키워드) #(특색 키워드) #(특색 키워드) #(특색 키워드)
 """
         try:
-            resp = await self.client.chat.completions.create(model=self.chat_model,
-                                                             messages=[{"role": "user", "content": prompt}],
-                                                             temperature=0.7, max_tokens=200)
+            resp = await call_openai('chat', lambda: self.client.chat.completions.create(model=self.chat_model,
+                                                                                        messages=[{"role": "user", "content": prompt}],
+                                                                                        temperature=0.7, max_tokens=200), lane=self.lane)
             text = resp.choices[0].message.content.strip()
             reason = re.search(r"추천 이유[:：]\s*(.+)", text)
             tags = re.search(r"해시태그[:：]\s*(.+)", text)
@@ -214,19 +530,201 @@ class RecommendationEngine:
             print(f"[오류] {spot_name} 추천 이유 생성 실패: {e}")
             return ("추천 이유 생성 실패", "해시태그 생성 실패")
 
-    async def add_reasons_and_hashtags(self, df: pd.DataFrame, adjectives: list[str], place_type: str) -> pd.DataFrame:
-        df_copy = df.copy()
+    def make_reason_batches(self, places: list[CrawledPlace]) -> list[list[CrawledPlace]]:
+        """
+        장소를 배치 크기와 블로그 텍스트 토큰 예산에 맞춰 순서대로 묶습니다. (배치마다 최소 1개)
+        """
+        batches, batch, batch_tokens = [], [], 0
+        for place in places:
+            tokens = len(self.encoding.encode(place.text))
+            if batch and (len(batch) >= self.reason_batch_size or batch_tokens + tokens > self.reason_batch_token_budget):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(place)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    @staticmethod
+    def parse_reason_batch(text: str, places: list[CrawledPlace]) -> dict[str, tuple[str, str]]:
+        """
+        배치 응답(JSON)에서 검증을 통과한 장소만 {contentid: (추천이유, 해시태그)}로 반환합니다.
+        """
+        try:
+            entries = json.loads(text)["places"]
+        except (ValueError, KeyError, TypeError):
+            return {}
+        expected = {place.contentid for place in places}
+        results = {}
+        for entry in entries if isinstance(entries, list) else []:
+            if not isinstance(entry, dict):
+                continue
+            contentid, reason, tags = str(entry.get("id")), entry.get("reason"), entry.get("hashtags")
+            if contentid not in expected or contentid in results:
+                continue
+            if not isinstance(reason, str) or not reason.strip():
+                continue
+            hashtags = RecommendationEngine.format_hashtags(tags)
+            if hashtags is None:
+                continue
+            results[contentid] = (reason.strip(), hashtags)
+        return results
+
+    @staticmethod
+    def format_hashtags(tags) -> str | None:
+        """
+        구조화된 응답의 해시태그 목록(3~5개)을 "#a #b #c" 형태로 바꿉니다. 형식이나 개수가 맞지 않으면 None.
+        """
+        if (not isinstance(tags, list) or not MIN_HASHTAGS <= len(tags) <= MAX_HASHTAGS
+                or not all(isinstance(t, str) and t.strip() for t in tags)):
+            return None
+        return " ".join("#" + t.strip().lstrip("#").replace(" ", "") for t in tags)
+
+    async def generate_reasons_batch(self, places: list[CrawledPlace], adjectives: list[str], adjectives_query: str,
+                                     place_type: str) -> dict[str, tuple[str, str]]:
+        """
+        여러 장소의 추천 이유/해시태그를 구조화된 JSON 응답 한 번으로 생성합니다.
+        검증을 통과한 장소만 반환하며, 호출 자체가 실패하면 빈 dict를 반환합니다.
+        """
+        place_list = json.dumps([{"id": place.contentid, "관광지명": place.name, "블로그": place.text} for place in places],
+                                ensure_ascii=False)
+        prompt = f"""
+{REASON_GUIDE}- 형용사: {adjectives}
+- 형용사 의미: {adjectives_query}
+- 장소유형: {place_type}
+아래 "장소 목록"의 각 장소마다 위 지시사항을 따로 적용하세요. 각 장소의 "블로그"는 해당 장소에 대해서만 사용하고, 다른 장소의 내용과 섞지 마세요.
+[장소 목록]
+{place_list}
+[출력 형식]
+장소 목록의 모든 장소에 대해 id를 그대로 쓰고, reason에 추천 이유(1~2 문장), hashtags에 '#'을 포함한 해시태그 3~5개를 작성하세요.
+"""
+        try:
+            resp = await call_openai('chat', lambda: self.client.chat.completions.create(
+                model=self.chat_model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.7,
+                max_tokens=REASON_OUTPUT_TOKENS * len(places),
+                response_format={"type": "json_schema",
+                                 "json_schema": {"name": "place_recommendations", "strict": True,
+                                                 "schema": REASON_BATCH_SCHEMA}}), lane=self.lane)
+            return self.parse_reason_batch(resp.choices[0].message.content, places)
+        except Exception as e:
+            print(f"[오류] 추천 이유 배치 생성 실패 ({len(places)}개 장소): {e}")
+            return {}
+
+    async def generate_base_hashtags(self, places: list[CrawledPlace], place_type: str) -> dict[str, str]:
+        """
+        형용사와 무관한 장소별 기본 해시태그를 배치로 생성합니다. (오프라인 enrich_places용)
+        검증을 통과한 장소만 {contentid: 해시태그}로 반환합니다.
+        """
+        place_list = json.dumps([{"id": place.contentid, "관광지명": place.name, "블로그": place.text} for place in places],
+                                ensure_ascii=False)
+        prompt = f"""
+당신의 역할은 "관광지명"과 해당 관광지의 블로그 후기인 "블로그" 텍스트를 활용하여 장소를 잘 나타내는 해시태그를 만드는 것입니다.
+'블로그' 텍스트에서 '장소유형'에 맞는 장소의 특징, 서비스 등의 직접적으로 관련된 내용만 사용하고, 주변 이야기나 "관광지명"과 관련 없는 정보는 절대 포함하지 마세요.
+해시태그는 흔히 쓰이는 일반적이고 추상적인 표현(예: #전통적, #청결한, #건강한, #아늑한, #세련된 등)을 배제하고,
+**특정 메뉴, 공간 구조, 인테리어, 뷰, 독창적인 서비스, 전통·지역적 요소**와 같이 그 장소만의 구체적인 특징을 반영한 키워드 3~5개로 작성하세요.
+- 장소유형: {place_type}
+아래 "장소 목록"의 각 장소마다 따로 작성하고, 다른 장소의 내용과 섞지 마세요.
+[장소 목록]
+{place_list}
+[출력 형식]
+장소 목록의 모든 장소에 대해 id를 그대로 쓰고, hashtags에 '#'을 포함한 해시태그 3~5개를 작성하세요.
+"""
+        try:
+            resp = await call_openai('chat', lambda: self.client.chat.completions.create(
+                model=self.chat_model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.3,
+                max_tokens=60 * len(places) + 50,
+                response_format={"type": "json_schema",
+                                 "json_schema": {"name": "place_hashtags", "strict": True, "schema": BASE_HASHTAG_SCHEMA}}), lane=self.lane)
+            entries = json.loads(resp.choices[0].message.content)["places"]
+        except Exception as e:
+            print(f"[오류] 기본 해시태그 생성 실패 ({len(places)}개 장소): {e}")
+            return {}
+        expected = {place.contentid for place in places}
+        results = {}
+        for entry in entries if isinstance(entries, list) else []:
+            if not isinstance(entry, dict) or str(entry.get("id")) not in expected:
+                continue
+            hashtags = self.format_hashtags(entry.get("hashtags"))
+            if hashtags is not None:
+                results.setdefault(str(entry["id"]), hashtags)
+        return results
+
+    async def iter_reasons_and_hashtags(self, places: list[CrawledPlace], adjectives: list[str], place_type: str):
+        """
+        장소별 추천 이유/해시태그를 생성되는 순서대로 (contentid, 추천이유, 해시태그)로 내보냅니다.
+        추천 이유 캐시(reason_store)에 있는 장소는 바로 내보내고, 나머지만 LLM으로 생성합니다.
+        reason_batch_size가 2 이상이면 여러 장소를 한 번에 요청하고, 검증에 실패한 장소만 장소별로 다시 요청합니다.
+        """
+        keys = {place.contentid: reason_key(place.contentid, adjectives, place_type, place.text, self.chat_model)
+                for place in places}
+        try:
+            cached = await db_sync_to_async(reason_store.get_many)(list(keys.values()))
+        except Exception as e:
+            print(f"[추천 이유 캐시] 조회 실패: {e}")
+            cached = {}
+        hits = [(place.contentid, *cached[keys[place.contentid]['key_hash']]) for place in places
+                if keys[place.contentid]['key_hash'] in cached]
+        places = [place for place in places if keys[place.contentid]['key_hash'] not in cached]
+        if hits:
+            print(f"  [추천 이유 캐시] {len(hits) + len(places)}개 중 {len(hits)}개 재사용")
+
         adj_query = self.adjectives_to_query(adjectives)
-        tasks = []
-        for _, row in df_copy.iterrows():
-            tasks.append(self.generate_reason_and_hashtags(row["관광지명"], adjectives, adj_query, row['텍스트'], place_type))
+        # 동시 호출 수는 요청별 고정 Semaphore 대신 프로세스 전체의 적응형 제한(call_openai)으로 조절합니다.
+        async def generate(place):
+            reason, tags = await self.generate_reason_and_hashtags(place.name, adjectives, adj_query, place.text, place_type)
+            return place.contentid, reason, tags
+
+        async def generate_batch(batch):
+            results = await self.generate_reasons_batch(batch, adjectives, adj_query, place_type)
+            missing = [place for place in batch if place.contentid not in results]
+            if missing:
+                print(f"  [추천 이유] 배치 응답 검증 실패 {len(missing)}/{len(batch)}개 장소는 장소별로 다시 요청합니다.")
+            fallback = await asyncio.gather(*(generate(place) for place in missing))
+            return [(cid, *results[cid]) for cid in (place.contentid for place in batch) if cid in results] + list(fallback)
+
+        async def generate_single(place):
+            return [await generate(place)]
+
+        if self.reason_batch_size > 1:
+            tasks = [asyncio.ensure_future(generate_batch(batch)) for batch in self.make_reason_batches(places)]
+        else:
+            tasks = [asyncio.ensure_future(generate_single(place)) for place in places]
+        try:
+            for result in hits:
+                yield result
+            for next_done in asyncio.as_completed(tasks):
+                results = await next_done
+                await self._save_reasons(keys, results)
+                for result in results:
+                    yield result
+        finally:
+            # 소비자가 중간에 멈추면(스트리밍 연결 종료 등) 남은 호출을 취소합니다.
+            for task in tasks:
+                task.cancel()
 
-        # OpenAI API는 Rate Limit이 엄격하므로, 동시 요청을 10개로 제한합니다.
-        CONCURRENCY_LIMIT = 10
-        results = await gather_with_concurrency(CONCURRENCY_LIMIT, *tasks)
+    @staticmethod
+    async def _save_reasons(keys: dict[str, dict], results: list[tuple[str, str, str]]):
+        """
+        생성에 성공한 결과만 추천 이유 캐시에 저장합니다.
+        """
+        items = [(keys[cid], reason, tags) for cid, reason, tags in results
+                 if reason not in FAILED_REASONS and tags not in FAILED_HASHTAGS]
+        try:
+            await db_sync_to_async(reason_store.put_many)(items)
+        except Exception as e:
+            print(f"[추천 이유 캐시] 저장 실패: {e}")
 
-        df_copy["추천이유"], df_copy["해시태그"] = zip(*results)
-        return df_copy
+    async def add_reasons_and_hashtags(self, places: list[CrawledPlace], adjectives: list[str], place_type: str) -> list[CrawledPlace]:
+        by_id = {place.contentid: place for place in places}
+        async for contentid, reason, tags in self.iter_reasons_and_hashtags(places, adjectives, place_type):
+            by_id[contentid].recommend_reason = reason
+            by_id[contentid].hashtags = tags
+        return places
 
 
     # ===================================================================
@@ -266,12 +764,12 @@ class RecommendationEngine:
             """
 
         try:
-            resp = await self.client.chat.completions.create(
+            resp = await call_openai('chat', lambda: self.client.chat.completions.create(
                 model=self.chat_model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=1.0,
                 max_tokens=500
-            )
+            ), lane='interactive')
             summary = resp.choices[0].message.content.strip()
             return summary
         except Exception as e:
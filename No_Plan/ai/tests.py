@@ -1,3 +1,766 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import tempfile
+import time
+import types
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import aiohttp
+import numpy as np
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from .cache import SingleFlight, TTLCache
+from .crawl_cache import CrawledTextStore
+from .deadline import ANNOTATION_SHARE, MAX_BUDGET_MS, MIN_BUDGET_MS, Deadline
+from .embedding_store import EmbeddingStore, text_hash
+from .extraction import ExtractionPool, extract_blog_page
+from .http_client import _sessions, close_sessions, get_session
+from .lexical import char_bigram_tokenizer, lexical_query, lexical_scores, prefilter, score_places_lexical
+from .limiter import AdaptiveLimiter
+from .models import BlogSearchCache, CrawledText, EmbeddingCache, PlaceProfile, ReasonCache
+from .profiles import PlaceProfileStore
+from .query_embeddings import QueryEmbeddingTable
+from .ranking import CrawledPlace, normalize_rows, score_places, top_k_indices, top_places
+from .reason_cache import ReasonStore, reason_key
+from .search_cache import BlogSearchStore
+from .services import BlogCrawler, RecommendationEngine
+from .upstream import CircuitBreaker, RetryBudget, UpstreamPolicy, UpstreamUnavailable
+
+
+class TTLCacheTests(SimpleTestCase):
+    def test_expired_entry_is_a_miss(self):
+        cache = TTLCache(maxsize=4, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2, ttl=-1)  # 이미 만료
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('b', 'default'), 'default')
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 2)
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')  # a를 최근 사용으로
+        cache.set('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual((cache.get('a'), cache.get('c')), (1, 3))
+
+    def test_pop_and_clear(self):
+        cache = TTLCache(maxsize=4, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.pop('a'), 1)
+        self.assertIsNone(cache.pop('a'))
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+
+class SingleFlightTests(SimpleTestCase):
+    async def test_concurrent_calls_share_one_task(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 'result'
+
+        results = await asyncio.gather(*(flight.do('key', work) for _ in range(5)))
+        self.assertEqual(results, ['result'] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.stats(), {'in_flight': 0, 'started': 1, 'shared': 4})
+
+    async def test_cancelled_caller_does_not_cancel_shared_task(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return 'result'
+
+        first = asyncio.ensure_future(flight.do('key', work))
+        second = asyncio.ensure_future(flight.do('key', work))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        self.assertEqual(await second, 'result')
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+
+    async def test_failure_is_shared_and_forgotten(self):
+        flight = SingleFlight()
+        attempts = []
+
+        async def work():
+            attempts.append(1)
+            await asyncio.sleep(0)
+            raise ValueError('upstream')
+
+        results = await asyncio.gather(flight.do('key', work), flight.do('key', work), return_exceptions=True)
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+        # 끝난 작업은 잊으므로 다음 호출은 새로 시작합니다.
+        with self.assertRaises(ValueError):
+            await flight.do('key', work)
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(len(flight), 0)
+
+
+class RankingTests(SimpleTestCase):
+    def test_normalize_rows_keeps_zero_vectors(self):
+        matrix = normalize_rows([[3, 4], [0, 0]])
+        self.assertEqual(matrix.dtype, np.float32)
+        np.testing.assert_allclose(matrix, [[0.6, 0.8], [0, 0]])
+
+    def test_top_k_indices_is_stable_for_ties(self):
+        scores = np.array([0.5, 0.9, 0.5, 0.1, 0.9])
+        self.assertEqual(top_k_indices(scores, 2).tolist(), [1, 4])
+        self.assertEqual(top_k_indices(scores, 10).tolist(), [1, 4, 0, 2, 3])
+        self.assertEqual(top_k_indices(scores, 0).tolist(), [])
+
+    def test_score_and_top_places(self):
+        records = [CrawledPlace(str(i), f'장소 {i}', '', []) for i in range(4)]
+        score_places(records[:3], np.array([[1, 0], [0, 2], [1, 1]]), [0, 1])
+        self.assertAlmostEqual(records[1].similarity, 1.0, places=6)
+        self.assertAlmostEqual(records[2].similarity, 2 ** -0.5, places=6)
+        # 유사도가 없는 장소는 가장 뒤로 갑니다.
+        self.assertEqual([r.contentid for r in top_places(records, 4)], ['1', '2', '0', '3'])
+
+
+class _FakeEncoding:
+    def encode(self, text):
+        return text.split()
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+class ReasonBatchTests(SimpleTestCase):
+    places = [CrawledPlace(str(i), f'장소 {i}', f'장소 {i} 블로그 후기', []) for i in range(1, 4)]
+
+    def test_parse_reason_batch_keeps_only_valid_entries(self):
+        text = json.dumps({"places": [
+            {"id": "1", "reason": " 장소 1은 조용해요. ", "hashtags": ["#정원", "한옥 카페", "#연못"]},
+            {"id": "1", "reason": "중복", "hashtags": ["#a", "#b", "#c"]},  # 같은 id는 첫 항목만
+            {"id": "2", "reason": "", "hashtags": ["#a", "#b", "#c"]},      # 빈 추천 이유
+            {"id": "3", "reason": "태그 없음", "hashtags": []},              # 해시태그 개수 오류
+            {"id": "99", "reason": "목록에 없는 장소", "hashtags": ["#a", "#b", "#c"]},
+            "형식 오류",
+        ]}, ensure_ascii=False)
+        self.assertEqual(RecommendationEngine.parse_reason_batch(text, self.places),
+                         {"1": ("장소 1은 조용해요.", "#정원 #한옥카페 #연못")})
+
+    def test_hashtag_count_must_match_prompt(self):
+        self.assertIsNone(RecommendationEngine.format_hashtags(["#a", "#b"]))
+        self.assertIsNone(RecommendationEngine.format_hashtags([f"#{i}" for i in range(6)]))
+        self.assertIsNone(RecommendationEngine.format_hashtags(["#a", " ", "#c"]))
+        self.assertEqual(RecommendationEngine.format_hashtags(["a", "#b", "c d", "#e", "f"]), "#a #b #cd #e #f")
+
+    def test_parse_reason_batch_rejects_malformed_json(self):
+        for text in ('', 'not json', '{"items": []}', '{"places": {"id": "1"}}'):
+            self.assertEqual(RecommendationEngine.parse_reason_batch(text, self.places), {})
+
+    @override_settings(OPENAI_API_KEY='sk-test')
+    async def test_places_failing_batch_validation_fall_back_to_single_requests(self):
+        with mock.patch('ai.services.tiktoken.encoding_for_model', return_value=_FakeEncoding()):
+            engine = RecommendationEngine(reason_batch_size=3)
+        single_calls = []
+
+        async def create(model, messages, **kwargs):
+            if 'response_format' in kwargs:
+                # 배치 응답에서 장소 2는 해시태그가 2개뿐이라 검증에 실패
+                content = json.dumps({"places": [
+                    {"id": "1", "reason": "배치 이유 1", "hashtags": ["#a", "#b", "#c"]},
+                    {"id": "2", "reason": "배치 이유 2", "hashtags": ["#a", "#b"]},
+                    {"id": "3", "reason": "배치 이유 3", "hashtags": ["#c", "#d", "#e"]},
+                ]}, ensure_ascii=False)
+            else:
+                single_calls.append(messages[0]['content'])
+                content = "1. 추천 이유: 장소별 이유\n2. 해시태그: #b"
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=types.SimpleNamespace(content=content))])
+
+        engine.client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=types.SimpleNamespace(create=create)))
+        with mock.patch('ai.services.reason_store.get_many', return_value={}), \
+                mock.patch('ai.services.reason_store.put_many') as put_many:
+            results = [r async for r in engine.iter_reasons_and_hashtags(self.places, ['고즈넉한'], '관광지')]
+
+        self.assertEqual(sorted(results), [("1", "배치 이유 1", "#a #b #c"), ("2", "장소별 이유", "#b"),
+                                           ("3", "배치 이유 3", "#c #d #e")])
+        self.assertEqual(len(single_calls), 1)
+        self.assertIn('장소 2', single_calls[0])
+        self.assertEqual(len(put_many.call_args.args[0]), 3)
+
+
+class LexicalTests(SimpleTestCase):
+    texts = ['고즈넉한 한옥 마당이 있는 찻집', '시끄러운 펍과 클럽', '조용하고 고즈넉한 분위기의 정원 카페']
+
+    def test_char_bigram_tokenizer(self):
+        self.assertEqual(char_bigram_tokenizer('한옥 A카페 집'), ['한옥', 'a카', '카페', '집'])
+
+    def test_lexical_query_includes_meanings(self):
+        query = lexical_query(['고즈넉한', '없는형용사'])
+        self.assertTrue(query.startswith('고즈넉한 없는형용사 '))
+        self.assertIn('고요하고', query)
+
+    def test_scores_rank_matching_texts_first(self):
+        scores = lexical_scores(self.texts, lexical_query(['고즈넉한']), tokenizer=char_bigram_tokenizer)
+        self.assertEqual(scores[1], 0)
+        self.assertGreater(min(scores[0], scores[2]), 0)
+
+    def test_prefilter_keeps_original_order(self):
+        records = [CrawledPlace(str(i), f'장소 {i}', text, []) for i, text in enumerate(self.texts)]
+        scores = np.array([0.5, 0.1, 0.9])
+        self.assertEqual([r.contentid for r in prefilter(records, scores, 2)], ['0', '2'])
+        self.assertIs(prefilter(records, scores, 0), records)
+        self.assertIs(prefilter(records, scores, 5), records)
+
+    def test_score_places_lexical_scales_to_max(self):
+        records = [CrawledPlace(str(i), f'장소 {i}', text, []) for i, text in enumerate(self.texts)]
+        score_places_lexical(records, np.array([2.0, 0.0, 4.0]))
+        self.assertEqual([r.similarity for r in records], [0.5, 0.0, 1.0])
+
+
+class AdaptiveLimiterTests(SimpleTestCase):
+    def make_limiter(self, limit: float = 2, bulk_share: float = 0.5) -> AdaptiveLimiter:
+        return AdaptiveLimiter('test', initial=limit, min_limit=1, max_limit=8, bulk_share=bulk_share)
+
+    async def test_release_grants_waiters_by_lane_priority(self):
+        limiter = self.make_limiter(limit=1)
+        await limiter.acquire('default')
+        bulk = asyncio.ensure_future(limiter.acquire('bulk'))
+        interactive = asyncio.ensure_future(limiter.acquire('interactive'))
+        await asyncio.sleep(0)
+        self.assertEqual(limiter.stats()['queued'], {'interactive': 1, 'default': 0, 'bulk': 1})
+
+        limiter.release('default')
+        await interactive
+        self.assertFalse(bulk.done())
+        self.assertEqual(limiter.in_flight, 1)
+        limiter.release('interactive')
+        await bulk
+        limiter.release('bulk')
+        self.assertEqual((limiter.in_flight, limiter.lane_in_flight['bulk']), (0, 0))
+
+    async def test_bulk_lane_is_capped_by_share(self):
+        limiter = self.make_limiter(limit=4, bulk_share=0.5)
+        await limiter.acquire('bulk')
+        await limiter.acquire('bulk')
+        third = asyncio.ensure_future(limiter.acquire('bulk'))
+        await asyncio.sleep(0)
+        self.assertFalse(third.done())
+        await limiter.acquire('default')  # 다른 레인은 남은 자리를 씁니다.
+        self.assertEqual(limiter.in_flight, 3)
+        limiter.release('bulk')
+        await third
+        self.assertEqual(limiter.lane_in_flight['bulk'], 2)
+
+    async def test_cancelled_waiter_leaves_queue(self):
+        limiter = self.make_limiter(limit=1)
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+        self.assertEqual(limiter.stats()['queued']['default'], 0)
+        limiter.release()
+        self.assertEqual(limiter.in_flight, 0)
+
+    async def test_waiter_cancelled_after_grant_returns_slot(self):
+        limiter = self.make_limiter(limit=1)
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        limiter.release()   # 대기자에게 자리를 넘김 (아직 깨어나지 않음)
+        waiter.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+        self.assertEqual(limiter.in_flight, 0)
+        async with limiter.slot():
+            self.assertEqual(limiter.in_flight, 1)
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_rate_limit_halves_limit_once_per_cooldown(self):
+        limiter = self.make_limiter(limit=8)
+        limiter.record_response(429, {})
+        limiter.record_response(429, {})
+        self.assertEqual(limiter.limit, 4)
+        self.assertEqual(limiter.counters['rate_limited'], 1)
+
+    def test_low_remaining_header_decreases_limit(self):
+        limiter = self.make_limiter(limit=8)
+        limiter.record_response(200, {'x-ratelimit-remaining-requests': '1', 'x-ratelimit-limit-requests': '100'})
+        self.assertAlmostEqual(limiter.limit, 7.2)
+        self.assertEqual(limiter.counters['low_remaining'], 1)
+
+
+class DeadlineTests(SimpleTestCase):
+    def test_from_ms_without_value_is_unlimited(self):
+        for value in (None, ''):
+            deadline = Deadline.from_ms(value)
+            self.assertFalse(deadline.is_limited)
+            self.assertIsNone(deadline.at(ANNOTATION_SHARE))
+            self.assertIsNone(deadline.remaining())
+            self.assertEqual(deadline.remaining(cap=3.0), 3.0)
+
+    def test_from_ms_clamps_budget(self):
+        self.assertEqual(Deadline.from_ms('1500').budget, 1.5)
+        self.assertEqual(Deadline.from_ms('1').budget, MIN_BUDGET_MS / 1000)
+        self.assertEqual(Deadline.from_ms('-5').budget, MIN_BUDGET_MS / 1000)
+        self.assertEqual(Deadline.from_ms(str(MAX_BUDGET_MS * 10)).budget, MAX_BUDGET_MS / 1000)
+
+    def test_from_ms_rejects_non_integers(self):
+        for value in ('abc', '1.5'):
+            with self.assertRaises(ValueError):
+                Deadline.from_ms(value)
+
+    def test_remaining_is_bounded_by_share_and_cap(self):
+        deadline = Deadline(10.0)
+        self.assertAlmostEqual(deadline.at(0.5) - deadline.start, 5.0)
+        self.assertLessEqual(deadline.remaining(0.5), 5.0)
+        self.assertEqual(deadline.remaining(0.5, cap=1.0), 1.0)
+        deadline.start -= 20  # 예산이 이미 지남
+        self.assertEqual(deadline.remaining(), 0.0)
+
+
+class EmbeddingStoreTests(TestCase):
+    def setUp(self):
+        self.store = EmbeddingStore(max_rows=3)
+
+    def put(self, *texts: str):
+        self.store.put_many('test-model', {text_hash(t): [0.5, -0.25] for t in texts})
+
+    def test_round_trip_and_stale_touch(self):
+        self.put('a')
+        EmbeddingCache.objects.update(last_used_at=timezone.now() - timedelta(days=2))
+        vectors = self.store.get_many('test-model', [text_hash('a'), text_hash('b')])
+
+        self.assertEqual(list(vectors), [text_hash('a')])
+        np.testing.assert_array_equal(vectors[text_hash('a')], np.array([0.5, -0.25], dtype=np.float32))
+        self.assertGreater(EmbeddingCache.objects.get().last_used_at, timezone.now() - timedelta(hours=1))
+        self.assertEqual(self.store.get_many('other-model', [text_hash('a')]), {})
+
+    def test_evict_deletes_only_excess_rows_when_timestamps_tie(self):
+        self.put('old', 'b1', 'b2', 'b3', 'b4')
+        now = timezone.now()
+        # get_many는 한 배치의 오래된 항목을 같은 시각으로 갱신하므로 동률이 흔합니다.
+        EmbeddingCache.objects.update(last_used_at=now)
+        EmbeddingCache.objects.filter(text_hash=text_hash('old')).update(last_used_at=now - timedelta(days=3))
+        ids = list(EmbeddingCache.objects.exclude(text_hash=text_hash('old')).order_by('id').values_list('id', flat=True))
+
+        self.assertEqual(self.store.evict(), 2)
+        self.assertEqual(sorted(EmbeddingCache.objects.values_list('id', flat=True)), ids[1:])
+        self.assertEqual(self.store.evict(), 0)
+
+
+class QueryEmbeddingTableTests(SimpleTestCase):
+    def setUp(self):
+        self.path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), 'query_embeddings.npz')
+        QueryEmbeddingTable.save(self.path, 'test-model', {'고즈넉한': [1.0, 0.0], '모던한': [0.0, 2.0],
+                                                          '고즈넉한,모던한': [0.6, 0.8]})
+
+    def test_file_is_read_on_first_lookup_only(self):
+        table = QueryEmbeddingTable(self.path)
+        self.assertIsNone(table.model)
+        with mock.patch.object(QueryEmbeddingTable, 'load', wraps=table.load) as load:
+            np.testing.assert_allclose(table.lookup(['모던한', '고즈넉한'], 'test-model'), [0.6, 0.8])
+            table.lookup(['모던한'], 'test-model')
+        load.assert_called_once_with(self.path)
+
+    def test_compose_missing_combination_and_model_mismatch(self):
+        table = QueryEmbeddingTable(self.path)
+        table.ensure_loaded()
+        del table._vectors['고즈넉한,모던한']
+
+        np.testing.assert_allclose(table.lookup(['고즈넉한', '모던한'], 'test-model'), [2 ** -0.5, 2 ** -0.5], rtol=1e-6)
+        self.assertIsNone(table.lookup(['고즈넉한'], 'other-model'))
+        self.assertIsNone(table.lookup(['없는형용사'], 'test-model'))
+        table.compose = False
+        self.assertIsNone(table.lookup(['고즈넉한', '모던한'], 'test-model'))
+        self.assertEqual((table.composed, table.misses, table.hits), (1, 3, 0))
+
+    def test_missing_file_falls_back_to_live_embedding(self):
+        table = QueryEmbeddingTable(self.path + '.missing')
+        self.assertIsNone(table.lookup(['고즈넉한'], 'test-model'))
+        self.assertTrue(table._loaded)
+
+
+class ReasonStoreTests(TestCase):
+    def setUp(self):
+        self.store = ReasonStore(ttl=timedelta(days=30), max_rows=2)
+
+    def key(self, content_id: str, text: str = '블로그') -> dict:
+        return reason_key(content_id, ['모던한', '고즈넉한'], '관광지', text, 'test-model')
+
+    def test_key_ignores_adjective_order_and_tracks_text(self):
+        same = reason_key('1', ['고즈넉한', '모던한'], '관광지', '블로그', 'test-model')
+        self.assertEqual(self.key('1')['key_hash'], same['key_hash'])
+        self.assertNotEqual(self.key('1')['key_hash'], self.key('1', '새 블로그')['key_hash'])
+
+    def test_put_many_round_trip_and_replace(self):
+        self.store.put_many([(self.key('1'), '이유 1', '#a #b #c'), (self.key('2'), '이유 2', '#d #e #f')])
+        self.store.put_many([(self.key('1'), '새 이유 1', '#x #y #z')])
+
+        found = self.store.get_many([self.key('1'), self.key('2'), self.key('3')])
+        self.assertEqual(found, {self.key('1')['key_hash']: ('새 이유 1', '#x #y #z'),
+                                 self.key('2')['key_hash']: ('이유 2', '#d #e #f')})
+        self.assertEqual(ReasonCache.objects.count(), 2)
+        self.assertEqual((self.store.hits, self.store.misses), (2, 1))
+
+    def test_expired_entries_are_misses_and_evicted(self):
+        self.store.put_many([(self.key('1'), '이유 1', '#a #b #c')])
+        ReasonCache.objects.update(created_at=timezone.now() - timedelta(days=31))
+
+        self.assertEqual(self.store.get_many([self.key('1')]), {})
+        self.assertEqual(self.store.evict(), 1)
+        self.assertFalse(ReasonCache.objects.exists())
+
+    def test_evict_deletes_only_excess_rows_when_timestamps_tie(self):
+        self.store.max_rows = 10
+        self.store.put_many([(self.key(str(i)), f'이유 {i}', '#a #b #c') for i in range(4)])
+        ReasonCache.objects.update(last_used_at=timezone.now())
+        ids = list(ReasonCache.objects.order_by('id').values_list('id', flat=True))
+
+        self.store.max_rows = 2
+        self.assertEqual(self.store.evict(), 2)
+        self.assertEqual(sorted(ReasonCache.objects.values_list('id', flat=True)), ids[2:])
+
+
+def _http_error(status: int) -> aiohttp.ClientResponseError:
+    return aiohttp.ClientResponseError(None, (), status=status)
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def test_opens_after_threshold_and_allows_one_probe(self):
+        breaker = CircuitBreaker(failure_threshold=3, open_seconds=30)
+        for _ in range(3):
+            self.assertTrue(breaker.allow())
+            breaker.record_failure()
+        self.assertEqual(breaker.state, 'open')
+        self.assertFalse(breaker.allow())
+
+        with mock.patch('ai.upstream.time.monotonic', return_value=breaker.opened_at + 30):
+            self.assertTrue(breaker.allow())
+            self.assertEqual(breaker.state, 'half_open')
+            self.assertFalse(breaker.allow())
+            breaker.record_success()
+        self.assertEqual((breaker.state, breaker.consecutive_failures), ('closed', 0))
+        self.assertTrue(breaker.allow())
+
+    def test_failed_or_released_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, open_seconds=30)
+        breaker.record_failure()
+        with mock.patch('ai.upstream.time.monotonic', return_value=breaker.opened_at + 30):
+            self.assertTrue(breaker.allow())
+            breaker.release_probe()
+            self.assertTrue(breaker.allow())
+            breaker.record_failure()
+        self.assertEqual(breaker.state, 'open')
+        self.assertFalse(breaker.allow())
+
+
+class UpstreamPolicyTests(SimpleTestCase):
+    def setUp(self):
+        self.policy = UpstreamPolicy('upstream.test')
+        self.calls = 0
+
+    def failing(self, status: int):
+        async def factory():
+            self.calls += 1
+            raise _http_error(status)
+        return factory
+
+    async def test_client_errors_do_not_count_as_failures(self):
+        for _ in range(self.policy.breaker.failure_threshold):
+            with self.assertRaises(aiohttp.ClientResponseError):
+                await self.policy.call(self.failing(404), retries=2)
+        self.assertEqual(self.calls, self.policy.breaker.failure_threshold)  # 4xx는 재시도하지 않음
+        self.assertEqual((self.policy.breaker.state, self.policy.stats.failures), ('closed', 0))
+
+    async def test_server_errors_open_circuit(self):
+        for _ in range(self.policy.breaker.failure_threshold):
+            with self.assertRaises(aiohttp.ClientResponseError):
+                await self.policy.call(self.failing(503))
+        with self.assertRaises(UpstreamUnavailable):
+            await self.policy.call(self.failing(503))
+        self.assertEqual(self.calls, self.policy.breaker.failure_threshold)
+        self.assertEqual(self.policy.stats.rejected, 1)
+
+    @mock.patch('ai.upstream.BACKOFF_BASE', 0)
+    async def test_retry_budget_limits_retries(self):
+        self.policy.breaker.failure_threshold = 100
+        self.policy.budget = RetryBudget(ratio=0, max_tokens=2)
+        with self.assertRaises(aiohttp.ClientResponseError):
+            await self.policy.call(self.failing(503), retries=5)
+        self.assertEqual(self.calls, 3)  # 첫 호출 + 토큰 2개만큼 재시도
+        self.assertEqual(self.policy.stats.retries, 2)
+
+        self.calls = 0
+        with self.assertRaises(aiohttp.ClientResponseError):
+            await self.policy.call(self.failing(503), retries=5)
+        self.assertEqual(self.calls, 1)
+
+    async def test_losing_hedge_request_is_cancelled(self):
+        self.policy.stats.latencies.extend([0.01] * 20)  # p95 = 10ms -> 최소 헤지 지연(50ms) 사용
+        cancelled = asyncio.Event()
+        calls = []
+
+        async def factory():
+            calls.append(len(calls))
+            if len(calls) == 1:
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+            return f'응답 {len(calls)}'
+
+        self.assertEqual(await self.policy.call(factory, hedge=True, timeout=5), '응답 2')
+        await asyncio.wait_for(cancelled.wait(), 1)
+        self.assertEqual((self.policy.stats.hedges, self.policy.stats.hedge_wins), (1, 1))
+        self.assertEqual(self.policy.breaker.state, 'closed')
+
+
+class CrawlCacheTests(TransactionTestCase):
+    # 캐시 조회/저장은 스레드 풀의 별도 연결(db_sync_to_async)에서 실행되므로 커밋된 데이터가 필요합니다.
+    search_results = {'맛집': ['https://blog.naver.com/ok'], '없는곳': [], '장애': None,
+                      '불안정': ['https://blog.naver.com/flaky']}
+
+    def setUp(self):
+        self.crawler = BlogCrawler()
+        self.searched = []
+        self.revalidated = []
+        self.enterContext(mock.patch('ai.services.blog_search_store', BlogSearchStore()))
+        self.enterContext(mock.patch.object(BlogCrawler, '_search_blogs_aio', self.search))
+        self.enterContext(mock.patch.object(BlogCrawler, 'get_text_with_source', self.get_text_with_source))
+        self.enterContext(mock.patch.object(BlogCrawler, 'revalidate_in_background',
+                                            lambda crawler, stale: self.revalidated.extend(stale)))
+
+    async def search(self, api_key, name, addr):
+        self.searched.append(name)
+        return self.search_results[name]
+
+    async def get_text_with_source(self, url):
+        if url.endswith('flaky'):
+            return self.crawler.placeholder, None  # 블로그 요청 실패
+        return '맛집 후기 본문', {'url': url, 'content_url': url, 'referer': None, 'etag': '"v1"'}
+
+    def crawl(self, *names):
+        infos = [(str(i), name, '서울 중구') for i, name in enumerate(names, 1)]
+        records, pending = asyncio.run(self.crawler.crawl_all_until(infos))
+        self.assertEqual(pending, set())
+        return records
+
+    def test_state_by_age(self):
+        store = CrawledTextStore(fresh_ttl=timedelta(days=7), max_age=timedelta(days=90),
+                                 negative_ttl=timedelta(hours=6))
+        now = timezone.now()
+
+        def entry(age, text='본문', urls=('u',)):
+            return CrawledText(text=text, urls=list(urls), checked_at=now - age)
+
+        self.assertEqual(store.state(None), 'expired')
+        self.assertEqual(store.state(entry(timedelta(days=1))), 'fresh')
+        self.assertEqual(store.state(entry(timedelta(days=8))), 'stale')
+        self.assertEqual(store.state(entry(timedelta(days=91))), 'expired')
+        self.assertEqual(store.state(entry(timedelta(hours=1), text=None, urls=())), 'negative')
+        self.assertEqual(store.state(entry(timedelta(hours=7), text=None, urls=())), 'expired')
+
+    def test_only_genuinely_empty_results_are_cached_as_negative(self):
+        placeholder = self.crawler.placeholder
+        expected = [('1', '맛집 후기 본문', ['https://blog.naver.com/ok']), ('2', placeholder, []), ('3', placeholder, [])]
+        records = self.crawl('맛집', '없는곳', '장애', '불안정')
+        self.assertEqual([(r.contentid, r.text, r.urls) for r in records], expected)
+        # 검색 실패(3)와 블로그 요청 실패(4)는 저장하지 않습니다.
+        self.assertEqual(sorted(CrawledText.objects.values_list('content_id', 'text', 'urls')),
+                         [('1', '맛집 후기 본문', ['https://blog.naver.com/ok']), ('2', placeholder, [])])
+
+        # 저장된 장소(결과와 부정 캐시)는 다시 검색하지 않고, 일시적으로 실패한 장소만 다시 크롤링합니다.
+        self.searched.clear()
+        records = self.crawl('맛집', '없는곳', '장애', '불안정')
+        self.assertEqual([(r.contentid, r.text, r.urls) for r in records], expected)
+        self.assertEqual(self.searched, ['장애', '불안정'])
+
+    def test_expired_negative_entry_is_crawled_again(self):
+        self.crawl('맛집', '없는곳')
+        CrawledText.objects.filter(content_id='2').update(checked_at=timezone.now() - timedelta(hours=7))
+        self.searched.clear()
+        self.crawl('맛집', '없는곳')
+        self.assertEqual(self.searched, ['없는곳'])
+
+    def test_stale_entry_is_used_and_revalidated(self):
+        self.crawl('맛집')
+        CrawledText.objects.update(checked_at=timezone.now() - timedelta(days=8))
+        self.searched.clear()
+
+        records = self.crawl('맛집')
+        self.assertEqual([r.text for r in records], ['맛집 후기 본문'])
+        self.assertEqual(self.searched, [])
+        self.assertEqual([(cid, sources[0]['etag']) for cid, _, _, sources in self.revalidated], [('1', '"v1"')])
+
+
+class BlogSearchStoreTests(TransactionTestCase):
+    # L2 조회/저장은 스레드 풀의 별도 연결(db_sync_to_async)에서 실행되므로 커밋된 데이터가 필요합니다.
+    def setUp(self):
+        self.store = BlogSearchStore(l2_ttl=timedelta(days=7), refresh_after=timedelta(days=1))
+        self.results = {'카페 서울 중구': ['https://blog.naver.com/new']}
+        self.calls = []
+
+    def fetch(self, query: str):
+        async def fetch():
+            self.calls.append(query)
+            await asyncio.sleep(0.01)
+            return self.results.get(query)
+        return fetch
+
+    def get(self, *queries: str) -> list:
+        async def run():
+            results = await asyncio.gather(*(self.store.get(q, self.fetch(q)) for q in queries))
+            await asyncio.gather(*self.store._background_tasks)
+            return results
+        return asyncio.run(run())
+
+    def add_l2(self, query: str, urls: list[str], age: timedelta):
+        BlogSearchCache.objects.create(query=query, urls=urls, fetched_at=timezone.now() - age)
+
+    def test_miss_is_searched_once_and_stored_in_both_levels(self):
+        self.assertEqual(self.get('카페 서울 중구', '카페 서울 중구'), [['https://blog.naver.com/new']] * 2)
+        self.assertEqual(self.get('카페 서울 중구'), [['https://blog.naver.com/new']])
+        self.assertEqual(self.calls, ['카페 서울 중구'])
+        self.assertEqual(BlogSearchCache.objects.get().urls, ['https://blog.naver.com/new'])
+
+        # 다른 워커(빈 L1)는 DB(L2)에서 읽습니다.
+        self.store = BlogSearchStore()
+        self.assertEqual(self.get('카페 서울 중구'), [['https://blog.naver.com/new']])
+        self.assertEqual((len(self.calls), self.store.l2_hits), (1, 1))
+
+    def test_failed_search_is_not_cached(self):
+        self.assertEqual(self.get('장애'), [None])
+        self.assertEqual(self.get('장애'), [None])
+        self.assertEqual(self.calls, ['장애', '장애'])
+        self.assertEqual(self.store.errors, 2)
+        self.assertFalse(BlogSearchCache.objects.exists())
+
+    def test_empty_result_is_cached(self):
+        self.results['없는곳'] = []
+        self.assertEqual(self.get('없는곳') + self.get('없는곳'), [[], []])
+        self.assertEqual(self.calls, ['없는곳'])
+
+    def test_expired_l2_entry_is_searched_again(self):
+        self.add_l2('카페 서울 중구', ['https://blog.naver.com/old'], timedelta(days=8))
+        self.assertEqual(self.get('카페 서울 중구'), [['https://blog.naver.com/new']])
+        self.assertEqual(self.calls, ['카페 서울 중구'])
+
+    def test_stale_l2_entry_is_used_and_refreshed_in_background(self):
+        self.add_l2('카페 서울 중구', ['https://blog.naver.com/old'], timedelta(days=2))
+        self.assertEqual(self.get('카페 서울 중구'), [['https://blog.naver.com/old']])
+        self.assertEqual((self.calls, self.store.refreshes), (['카페 서울 중구'], 1))
+        self.assertEqual(BlogSearchCache.objects.get().urls, ['https://blog.naver.com/new'])
+        self.assertEqual(self.get('카페 서울 중구'), [['https://blog.naver.com/new']])
+
+    def test_get_many_prefetches_l2_in_one_query(self):
+        self.add_l2('a', ['https://blog.naver.com/a'], timedelta(hours=1))
+        self.add_l2('b', ['https://blog.naver.com/b'], timedelta(days=2))
+        self.add_l2('c', ['https://blog.naver.com/c'], timedelta(days=8))
+        with mock.patch.object(BlogSearchStore, '_load', side_effect=AssertionError('개별 조회')):
+            found = asyncio.run(self.store.get_many(['a', 'b', 'c', 'a']))
+            self.assertEqual(found, {'a': ['https://blog.naver.com/a'], 'b': ['https://blog.naver.com/b']})
+            # L1에 채운 항목 중 갱신 시점이 지난 것(b)은 다음 get()에서 백그라운드로 갱신합니다.
+            self.results['b'] = ['https://blog.naver.com/b2']
+            self.assertEqual(self.get('a', 'b'), [['https://blog.naver.com/a'], ['https://blog.naver.com/b']])
+        self.assertEqual(self.calls, ['b'])
+        self.assertEqual(self.store.l1.get('b'), ['https://blog.naver.com/b2'])
+
+
+class SharedSessionTests(SimpleTestCase):
+    def test_session_is_shared_within_a_loop_and_closed_on_shutdown(self):
+        async def run():
+            session = get_session()
+            self.assertIs(get_session(), session)
+            await close_sessions()
+            self.assertTrue(session.closed)
+            replacement = get_session()
+            self.assertIsNot(replacement, session)
+            await close_sessions()
+            return replacement
+
+        self.assertTrue(asyncio.run(run()).closed)
+
+    def test_sessions_of_closed_loops_are_discarded(self):
+        async def open_session():
+            return get_session()
+
+        stale = asyncio.run(open_session())  # 요청마다 새 루프를 쓰는 환경 (async_to_sync)
+
+        async def run():
+            session = get_session()
+            self.assertIsNot(session, stale)
+            self.assertEqual(list(_sessions.values()), [session])
+            await close_sessions()
+
+        asyncio.run(run())
+        self.assertEqual(_sessions, {})
+
+
+class BlogExtractionTests(SimpleTestCase):
+    def setUp(self):
+        self.enterContext(mock.patch.dict('ai.extraction._encodings', {'test-model': _FakeEncoding()}))
+
+    def extract(self, html: str, follow_iframe: bool = True, max_tokens: int = 100):
+        kind, value, seconds = extract_blog_page(html.encode('utf-8'), 'utf-8', follow_iframe, 'test-model', max_tokens)
+        self.assertGreaterEqual(seconds, 0)
+        return kind, value
+
+    def test_iframe_is_followed_only_on_outer_page(self):
+        html = '<iframe id="mainFrame" src="/PostView.naver?logNo=1"></iframe><div class="se-main-container">본문</div>'
+        self.assertEqual(self.extract(html), ('iframe', '/PostView.naver?logNo=1'))
+        self.assertEqual(self.extract(html, follow_iframe=False), ('text', '본문'))
+
+    def test_text_is_cleaned_and_truncated(self):
+        html = '<div class="se-main-container"><p>조용한 \u200b정원 😀</p> <p>연못 카페 한옥 뷰</p></div>'
+        self.assertEqual(self.extract(html, max_tokens=2), ('text', '조용한 정원'))
+        self.assertEqual(self.extract('<div>다른 형식</div>'), ('empty', None))
+
+    async def test_pool_limits_queued_work(self):
+        pool = ExtractionPool(workers=0, max_queue=1)  # 워커 0: 기본 스레드 풀 사용
+        running, peak = 0, 0
+
+        def slow_extract(*args):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            time.sleep(0.02)
+            running -= 1
+            return 'text', '본문', 0.02
+
+        with mock.patch('ai.extraction.extract_blog_page', slow_extract):
+            results = await asyncio.gather(*(pool.extract(b'', None, True, 'test-model', 10) for _ in range(3)))
+
+        self.assertEqual(results, [('text', '본문')] * 3)
+        self.assertEqual(peak, 1)
+        stats = pool.stats()
+        self.assertEqual((stats['waiting'], stats['running'], stats['parse']['count']), (0, 0, 3))
+
+
+class PlaceProfileStoreTests(TestCase):
+    def setUp(self):
+        self.store = PlaceProfileStore()
+        self.store.save_many([('1', '정원 후기', '#정원 #연못 #한옥'), ('2', '카페 후기', '#라떼 #테라스 #빵')])
+
+    def test_base_hashtags_only_for_unchanged_text(self):
+        self.assertEqual(self.store.base_hashtags({'1': '정원 후기', '2': '새 카페 후기', '3': '후기'}),
+                         {'1': '#정원 #연못 #한옥'})
+        self.assertEqual(self.store.base_hashtags({}), {})
+
+    def test_save_many_replaces_and_enriched_ids_respects_max_age(self):
+        self.store.save_many([('2', '새 카페 후기', '#케이크 #정원 #뷰')])
+        self.assertEqual(self.store.base_hashtags({'2': '새 카페 후기'}), {'2': '#케이크 #정원 #뷰'})
+
+        PlaceProfile.objects.filter(content_id='1').update(enriched_at=timezone.now() - timedelta(days=31))
+        self.assertEqual(self.store.enriched_ids(['1', '2', '3']), {'2'})
+        self.assertEqual(self.store.enriched_ids(['1', '2'], max_age=timedelta(days=60)), {'1', '2'})
@@ -0,0 +1,279 @@
+# ai/upstream.py
+
+import asyncio
+import random
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .http_client import get_session
+
+
+# ===================================================================
+# 업스트림 호출 정책 (서킷 브레이커 / 재시도 예산 / 헤지 요청 / 호스트별 상태)
+# ===================================================================
+# 느린 업스트림 하나가 모든 요청을 타임아웃(5~10초)까지 붙잡지 않도록,
+# 호스트마다 다음 정책을 적용합니다.
+#  - 서킷 브레이커: 연속 실패가 쌓이면 일정 시간 동안 호출하지 않고 즉시 실패
+#  - 재시도 예산: 지터를 준 백오프로 재시도하되, 전체 요청량의 일정 비율까지만 허용
+#  - 헤지 요청: 멱등 GET이 p95 지연보다 오래 걸리면 같은 요청을 한 번 더 보내 먼저 온 응답을 사용
+#    요청 수만큼 쿼터를 쓰는 API(dapi.kakao.com, TourAPI)에 보내지 않도록 get_policy(host, hedge=True)로 켠 호스트만 사용합니다.
+FAILURE_THRESHOLD = 5       # 서킷을 여는 연속 실패 횟수
+OPEN_SECONDS = 30           # 서킷이 열린 뒤 다시 시도해 보기까지의 시간 (초)
+RETRY_BUDGET_RATIO = 0.2    # 요청 1건당 적립되는 재시도 토큰 (최대 20% 추가 부하)
+RETRY_BUDGET_MAX = 10       # 적립 가능한 최대 재시도 토큰
+BACKOFF_BASE = 0.1          # 재시도 백오프 기본값 (초)
+BACKOFF_MAX = 1.0
+HEDGE_MIN_SAMPLES = 20      # 헤지 지연(p95)을 계산하기 위한 최소 표본 수
+HEDGE_MIN_DELAY = 0.05
+LATENCY_WINDOW = 200
+
+
+class UpstreamUnavailable(aiohttp.ClientError):
+    """
+    서킷이 열려 있어 호출하지 않고 즉시 실패한 경우.
+    aiohttp.ClientError를 상속하므로 기존 예외 처리 코드에서 그대로 처리됩니다.
+    """
+
+
+def is_failure(exc: BaseException) -> bool:
+    """
+    업스트림 상태 판단용: 네트워크 오류/타임아웃/5xx/429는 실패, 그 외 4xx는 호출자 문제로 봅니다.
+    (aiohttp는 .status, OpenAI SDK는 .status_code 를 사용합니다.)
+    """
+    status = getattr(exc, 'status', None) or getattr(exc, 'status_code', None)
+    if isinstance(status, int):
+        return status >= 500 or status == 429
+    return isinstance(exc, Exception)
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, open_seconds: float = OPEN_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == 'closed':
+            return True
+        if self.state == 'open' and time.monotonic() - self.opened_at >= self.open_seconds:
+            self.state = 'half_open'
+        if self.state == 'half_open' and not self._probe_in_flight:
+            # 반쯤 열린 상태에서는 한 번의 시험 호출만 허용합니다.
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def release_probe(self):
+        """
+        시험 호출이 결과 없이 취소된 경우, 다음 호출이 다시 시험할 수 있게 합니다.
+        """
+        self._probe_in_flight = False
+
+    def record_success(self):
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == 'half_open' or self.consecutive_failures >= self.failure_threshold:
+            if self.state != 'open':
+                print(f"[업스트림] 서킷 열림 (연속 실패 {self.consecutive_failures}회)")
+            self.state = 'open'
+            self.opened_at = time.monotonic()
+
+
+class RetryBudget:
+    """
+    요청마다 ratio만큼 토큰을 적립하고, 재시도/헤지 요청마다 토큰 1개를 사용합니다.
+    """
+    def __init__(self, ratio: float = RETRY_BUDGET_RATIO, max_tokens: float = RETRY_BUDGET_MAX):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+
+    def deposit(self):
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class HostStats:
+    def __init__(self):
+        self.latencies = deque(maxlen=LATENCY_WINDOW)  # 성공한 호출의 지연 시간 (초)
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0   # 서킷이 열려 즉시 실패한 횟수
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def percentile(self, q: float) -> float | None:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class UpstreamPolicy:
+    def __init__(self, host: str, hedge: bool = False):
+        self.host = host
+        self.hedge = hedge
+        self.breaker = CircuitBreaker()
+        self.budget = RetryBudget()
+        self.stats = HostStats()
+
+    def hedge_delay(self, timeout: float | None) -> float | None:
+        if len(self.stats.latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        delay = max(self.stats.percentile(0.95), HEDGE_MIN_DELAY)
+        if timeout is not None and delay >= timeout / 2:
+            return None  # 타임아웃에 가까운 지연이면 헤지해도 얻는 것이 없습니다.
+        return delay
+
+    async def _attempt(self, factory):
+        """
+        서킷 브레이커를 거쳐 한 번 호출하고, 결과를 상태/통계에 기록합니다.
+        """
+        if not self.breaker.allow():
+            self.stats.rejected += 1
+            raise UpstreamUnavailable(f"{self.host} 서킷이 열려 있어 호출하지 않았습니다.")
+        start = time.monotonic()
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            self.breaker.release_probe()
+            raise
+        except Exception as e:
+            if is_failure(e):
+                self.stats.failures += 1
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        self.stats.successes += 1
+        self.stats.latencies.append(time.monotonic() - start)
+        self.breaker.record_success()
+        return result
+
+    async def _hedged_attempt(self, factory, delay: float):
+        """
+        첫 호출이 delay 안에 끝나지 않으면 같은 호출을 한 번 더 보내고, 먼저 성공한 결과를 사용합니다.
+        """
+        primary = asyncio.ensure_future(self._attempt(factory))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or not self.budget.withdraw():
+            return await primary
+
+        self.stats.hedges += 1
+        hedge = asyncio.ensure_future(self._attempt(factory))
+        pending = {primary, hedge}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.stats.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(self, factory, *, retries: int = 0, hedge: bool = False, timeout: float | None = None):
+        """
+        factory()는 업스트림 호출 코루틴을 새로 만드는 함수입니다. (재시도/헤지 때마다 다시 호출됩니다)
+        hedge는 멱등 요청에서만 켜야 합니다.
+        """
+        self.stats.requests += 1
+        self.budget.deposit()
+        attempt = 0
+        while True:
+            delay = self.hedge_delay(timeout) if hedge else None
+            try:
+                if delay is None:
+                    return await self._attempt(factory)
+                return await self._hedged_attempt(factory, delay)
+            except UpstreamUnavailable:
+                raise
+            except Exception as e:
+                if attempt >= retries or not is_failure(e) or not self.budget.withdraw():
+                    raise
+            attempt += 1
+            self.stats.retries += 1
+            # full jitter 백오프
+            await asyncio.sleep(random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)))
+
+    async def request(self, method: str, url: str, handler, *, retries: int = 0, hedge: bool = None,
+                      timeout: float = 10, **kwargs):
+        """
+        공유 aiohttp 세션으로 요청을 보내고 handler(response) 코루틴의 반환값을 돌려줍니다.
+        hedge를 생략하면 헤지를 켠 호스트의 GET만 헤지 요청을 사용합니다.
+        """
+        if hedge is None:
+            hedge = self.hedge and method.upper() == 'GET'
+
+        async def send():
+            session = get_session()
+            async with session.request(method, url, timeout=timeout, **kwargs) as response:
+                return await handler(response)
+
+        return await self.call(send, retries=retries, hedge=hedge, timeout=timeout)
+
+    def snapshot(self) -> dict:
+        stats = self.stats
+        p50, p95 = stats.percentile(0.5), stats.percentile(0.95)
+        return {
+            "state": self.breaker.state,
+            "hedge": self.hedge,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "requests": stats.requests,
+            "successes": stats.successes,
+            "failures": stats.failures,
+            "rejected": stats.rejected,
+            "retries": stats.retries,
+            "hedges": stats.hedges,
+            "hedge_wins": stats.hedge_wins,
+            "retry_tokens": round(self.budget.tokens, 2),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+
+
+_policies: dict[str, UpstreamPolicy] = {}
+
+
+def get_policy(url_or_host: str, hedge: bool = None) -> UpstreamPolicy:
+    """
+    호스트의 정책을 반환합니다. hedge를 주면 그 호스트의 GET 헤지 사용 여부를 설정합니다. (기본: 사용 안 함)
+    """
+    host = urlsplit(url_or_host).hostname or url_or_host
+    policy = _policies.get(host)
+    if policy is None:
+        policy = _policies[host] = UpstreamPolicy(host)
+    if hedge is not None:
+        policy.hedge = hedge
+    return policy
+
+
+async def upstream_request(method: str, url: str, handler, **kwargs):
+    return await get_policy(url).request(method, url, handler, **kwargs)
+
+
+def upstream_health() -> dict:
+    return {host: policy.snapshot() for host, policy in sorted(_policies.items())}
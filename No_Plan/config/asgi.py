@@ -11,6 +11,10 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from config.lifespan import LifespanApplication
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+application = LifespanApplication(django_application)
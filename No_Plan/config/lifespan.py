@@ -0,0 +1,53 @@
+# config/lifespan.py
+
+# ===================================================================
+# ASGI lifespan 훅 레지스트리
+# ===================================================================
+# Django의 ASGIHandler는 lifespan 이벤트를 처리하지 않으므로,
+# 앱 수명 동안 유지되는 자원(공유 HTTP 세션 등)의 생성/정리 훅을 여기에 등록합니다.
+# 각 앱은 AppConfig.ready()에서 on_startup / on_shutdown 으로 훅을 등록합니다.
+
+startup_hooks = []
+shutdown_hooks = []
+
+
+def on_startup(hook):
+    startup_hooks.append(hook)
+    return hook
+
+
+def on_shutdown(hook):
+    shutdown_hooks.append(hook)
+    return hook
+
+
+class LifespanApplication:
+    """
+    lifespan 스코프는 직접 처리하고, 나머지(http 등)는 Django ASGI 앱으로 넘기는 래퍼
+    """
+    def __init__(self, django_application):
+        self.django_application = django_application
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'lifespan':
+            return await self.django_application(scope, receive, send)
+
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    for hook in startup_hooks:
+                        await hook()
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                # 종료 훅은 하나가 실패해도 나머지는 모두 실행합니다.
+                for hook in reversed(shutdown_hooks):
+                    try:
+                        await hook()
+                    except Exception as e:
+                        print(f"lifespan 종료 훅 실행 중 오류: {e}")
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
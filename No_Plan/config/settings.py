@@ -13,6 +13,56 @@ KAKAO_API_KEY = os.getenv('KAKAO_API_KEY')
 DAUM_API_KEY = os.getenv('DAUM_API_KEY')
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 
+# 형용사 조합별 쿼리 임베딩 파일 (python manage.py precompute_query_embeddings 로 생성)
+QUERY_EMBEDDINGS_PATH = os.getenv('QUERY_EMBEDDINGS_PATH', os.path.join(BASE_DIR, 'ai', 'data', 'query_embeddings.npz'))
+# 파일에 없는 조합은 단일 형용사 벡터의 정규화 합으로 만들지 여부
+QUERY_EMBEDDINGS_COMPOSE = os.getenv('QUERY_EMBEDDINGS_COMPOSE', 'true').lower() == 'true'
+
+# 추천 이유/해시태그를 한 번의 LLM 호출로 만들 장소 수 (1이면 장소별 호출)
+AI_REASON_BATCH_SIZE = int(os.getenv('AI_REASON_BATCH_SIZE', '6'))
+# 배치 호출 하나에 넣을 블로그 텍스트의 최대 토큰 수
+AI_REASON_BATCH_TOKEN_BUDGET = int(os.getenv('AI_REASON_BATCH_TOKEN_BUDGET', '12000'))
+
+# 블로그 본문 추출(파싱/토큰 자르기) 프로세스 풀 크기 (0이면 스레드 풀 사용)
+AI_EXTRACT_WORKERS = int(os.getenv('AI_EXTRACT_WORKERS', min(4, os.cpu_count() or 1)))
+# 추출 풀에 동시에 맡길 수 있는 최대 작업 수
+AI_EXTRACT_MAX_QUEUE = int(os.getenv('AI_EXTRACT_MAX_QUEUE', '64'))
+
+# 오래된 카카오 블로그 검색 캐시를 사용하면서 백그라운드에서 다시 검색할지 여부
+KAKAO_SEARCH_BACKGROUND_REFRESH = os.getenv('KAKAO_SEARCH_BACKGROUND_REFRESH', 'true').lower() == 'true'
+
+# 블로그 텍스트 어휘(BM25) 사전 필터에 사용할 토크나이저 (함수 경로, 함수(text) -> list[str])
+AI_LEXICAL_TOKENIZER = os.getenv('AI_LEXICAL_TOKENIZER', 'ai.lexical.char_bigram_tokenizer')
+# 카테고리별로 임베딩/추천 이유 생성까지 진행할 최대 장소 수 (BM25 상위, 0이면 사전 필터 사용 안 함)
+AI_LEXICAL_PREFILTER_KEEP = int(os.getenv('AI_LEXICAL_PREFILTER_KEEP', '40'))
+# 임베딩 단계가 이 시간(초) 안에 끝나지 않거나 실패하면 BM25 점수로 순위를 매깁니다.
+AI_EMBEDDING_TIMEOUT = float(os.getenv('AI_EMBEDDING_TIMEOUT', '8'))
+
+# 장소 임베딩 벡터 인덱스 디렉터리 (python manage.py build_vector_index 로 생성)
+PLACE_VECTOR_INDEX_PATH = os.getenv('PLACE_VECTOR_INDEX_PATH', os.path.join(BASE_DIR, 'tour_api', 'data', 'vector_index'))
+
+# OpenAI 동시 호출 수 적응형 제한 (엔드포인트별 초기값/최소/최대, bulk 레인이 쓸 수 있는 비율)
+OPENAI_CONCURRENCY_INITIAL = int(os.getenv('OPENAI_CONCURRENCY_INITIAL', '10'))
+OPENAI_CONCURRENCY_MIN = int(os.getenv('OPENAI_CONCURRENCY_MIN', '2'))
+OPENAI_CONCURRENCY_MAX = int(os.getenv('OPENAI_CONCURRENCY_MAX', '64'))
+OPENAI_BULK_SHARE = float(os.getenv('OPENAI_BULK_SHARE', '0.5'))
+
+# 비동기 JWT 인증의 사용자 캐시 유지 시간 (초). 캐시는 워커 프로세스마다 따로 있어, 사용자 정보가 바뀌면 (비활성화, 비밀번호 변경 등)
+# 바꾼 프로세스에서만 바로 지워지고 다른 워커는 최대 이 시간 동안 이전 정보로 인증할 수 있습니다.
+AUTH_USER_CACHE_TTL = float(os.getenv('AUTH_USER_CACHE_TTL', '3'))
+
+# 위치정보 취급대장 쓰기 버퍼: 모아서 쓰는 기록 수 / 쓰기 주기 / 쓰지 못한 기록의 최대 보관 시간(넘으면 요청이 대기) / 최대 보관 건수
+USAGE_LOG_BATCH_SIZE = int(os.getenv('USAGE_LOG_BATCH_SIZE', '200'))
+USAGE_LOG_FLUSH_MS = int(os.getenv('USAGE_LOG_FLUSH_MS', '250'))
+USAGE_LOG_MAX_DELAY_MS = int(os.getenv('USAGE_LOG_MAX_DELAY_MS', '2000'))
+USAGE_LOG_MAX_PENDING = int(os.getenv('USAGE_LOG_MAX_PENDING', '5000'))
+# 취급대장 보존: DB에 남기는 개월 수 (위치정보법상 6개월 이상) / 지난 달의 기록을 압축해 옮길 경로
+USAGE_LOG_RETENTION_MONTHS = int(os.getenv('USAGE_LOG_RETENTION_MONTHS', '12'))
+USAGE_LOG_ARCHIVE_DIR = os.getenv('USAGE_LOG_ARCHIVE_DIR', os.path.join(BASE_DIR, 'users', 'data', 'usage_log_archive'))
+
+# livepopulartimes 스크래핑 전용 스레드 풀 크기
+POPULARTIMES_WORKERS = int(os.getenv('POPULARTIMES_WORKERS', '8'))
+
 SOCIALACCOUNT_PROVIDERS = {
     'kakao': {
         'VERIFIED_EMAIL': True
@@ -132,7 +182,7 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.BrowsableAPIRenderer',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.AsyncJWTAuthentication',
     )
 }
 
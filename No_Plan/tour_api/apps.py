@@ -4,3 +4,17 @@ from django.apps import AppConfig
 class TourApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tour_api'
+
+    def ready(self):
+        # 혼잡도 스크래핑 스레드 풀은 처음 사용할 때 시작되고, 종료 시 정리합니다.
+        from config.lifespan import on_shutdown
+        from .populartimes import populartimes_service
+        on_shutdown(populartimes_service.close)
+
+        # 장소 임베딩 벡터 인덱스는 서버 시작 시(관리 명령에서는 열지 않음) 메모리 맵으로 엽니다.
+        # 파일이 없으면 벡터 검색 API가 503을 반환하고, 다시 만들어지면 재시작 없이 새 인덱스를 사용합니다.
+        from django.conf import settings
+        from config.lifespan import on_startup
+        from .vector_index import place_vector_index
+        place_vector_index.path = settings.PLACE_VECTOR_INDEX_PATH
+        on_startup(place_vector_index.ensure_current)
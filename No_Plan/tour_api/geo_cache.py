@@ -0,0 +1,135 @@
+# tour_api/geo_cache.py
+
+import math
+
+from ai.cache import TTLCache
+
+
+# ===================================================================
+# TourAPI locationBasedList2 결과용 지오 타일 캐시
+# ===================================================================
+# 같은 동네에 있는 사용자들의 요청을 하나의 타일로 묶어서, 타일마다 TTL 동안
+# 업스트림 호출을 한 번만 하도록 합니다.
+#  - 키: (양자화된 mapX/mapY 타일, 반경 버킷, contentTypeId/cat1~3 등 나머지 파라미터)
+#  - 값: 타일 중심에서 (반경 버킷 + 타일 반대각선) 안에 있는 장소 전체(상위 집합)
+#  - 응답: 상위 집합을 실제 좌표 기준 거리로 다시 필터링/정렬해서 반환
+TILE_SIZE_DEG = 0.01                            # 약 0.9km x 1.1km
+RADIUS_BUCKETS = (1000, 2000, 3000, 5000, 10000, 15000)
+MAX_UPSTREAM_RADIUS = 20000                     # TourAPI 반경 상한 (m)
+TILE_FETCH_ROWS = 1000                          # 타일 상위 집합을 가져올 때의 numOfRows
+CACHE_TTL = 60 * 60                             # 1시간
+CACHE_MAXSIZE = 512
+
+# 타일 키에서 제외되는 파라미터 (좌표/페이지 관련)
+_GEO_PARAMS = {'mapX', 'mapY', 'radius', 'numOfRows', 'pageNo', 'arrange'}
+# 상위 집합이 잘려서 캐시를 사용할 수 없는 타일 표시
+_TRUNCATED = object()
+
+
+def haversine_m(x1: float, y1: float, x2: float, y2: float) -> float:
+    """
+    두 좌표(경도 x, 위도 y) 사이의 거리를 미터 단위로 반환합니다.
+    """
+    lon1, lat1, lon2, lat2 = map(math.radians, (x1, y1, x2, y2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371008.8 * math.asin(math.sqrt(a))
+
+
+def filter_by_distance(items: list, map_x: float, map_y: float, radius: float) -> list:
+    """
+    장소 목록에서 (map_x, map_y) 기준 반경 안의 장소만 남기고 거리순으로 정렬합니다.
+    캐시된 원본이 오염되지 않도록 각 장소는 복사본을 반환하며, 'dist'는 다시 계산합니다.
+    """
+    results = []
+    for item in items:
+        try:
+            dist = haversine_m(map_x, map_y, float(item['mapx']), float(item['mapy']))
+        except (KeyError, TypeError, ValueError):
+            continue
+        if dist <= radius:
+            results.append((dist, item))
+    results.sort(key=lambda pair: pair[0])
+    return [{**item, 'dist': f"{dist:.6f}"} for dist, item in results]
+
+
+def paginate(items: list, params: dict) -> list:
+    try:
+        rows = int(params.get('numOfRows', 10))
+        page = max(int(params.get('pageNo', 1)), 1)
+    except (TypeError, ValueError):
+        return items
+    start = (page - 1) * rows
+    return items[start:start + rows]
+
+
+class GeoTileCache:
+    def __init__(self, tile_size: float = TILE_SIZE_DEG, ttl: float = CACHE_TTL, maxsize: int = CACHE_MAXSIZE):
+        self.tile_size = tile_size
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def tile_of(self, map_x: float, map_y: float) -> tuple[int, int]:
+        return math.floor(map_x / self.tile_size), math.floor(map_y / self.tile_size)
+
+    def tile_query(self, tile: tuple[int, int], bucket: int) -> tuple[float, float, int]:
+        """
+        타일 안의 어떤 지점에서 bucket 반경으로 질의해도 빠짐없이 포함되는
+        (타일 중심 x, 타일 중심 y, 업스트림 반경)을 반환합니다.
+        """
+        tx, ty = tile
+        center_x, center_y = (tx + 0.5) * self.tile_size, (ty + 0.5) * self.tile_size
+        # 타일 중심에서 가장 먼 꼭짓점까지의 거리 (적도 쪽 모서리가 더 김)
+        corner_y = ty * self.tile_size if center_y >= 0 else (ty + 1) * self.tile_size
+        margin = haversine_m(center_x, center_y, tx * self.tile_size, corner_y)
+        return center_x, center_y, bucket + math.ceil(margin)
+
+    def key_for(self, params: dict) -> tuple | None:
+        """
+        캐시 키 (타일, 반경 버킷, 나머지 파라미터)를 반환합니다. 캐시할 수 없는 요청이면 None.
+        """
+        try:
+            map_x, map_y = float(params['mapX']), float(params['mapY'])
+            radius = float(params.get('radius', 0))
+        except (KeyError, TypeError, ValueError):
+            return None
+        bucket = next((b for b in RADIUS_BUCKETS if radius <= b), None)
+        if bucket is None:
+            return None
+        tile = self.tile_of(map_x, map_y)
+        if self.tile_query(tile, bucket)[2] > MAX_UPSTREAM_RADIUS:
+            return None
+        filters = tuple(sorted((k, str(v)) for k, v in params.items() if k not in _GEO_PARAMS))
+        return tile, bucket, filters
+
+    async def fetch(self, params: dict, request) -> list | None:
+        """
+        locationBasedList2 요청을 타일 캐시를 거쳐 처리합니다.
+        request(params)는 업스트림을 호출해 장소 목록(실패 시 None)을 반환하는 코루틴 함수입니다.
+        """
+        key = self.key_for(params)
+        if key is None:
+            return await request(params)
+
+        superset = self.cache.get(key)
+        if superset is None:
+            tile, bucket, _ = key
+            center_x, center_y, upstream_radius = self.tile_query(tile, bucket)
+            tile_params = {
+                **{k: v for k, v in params.items() if k not in _GEO_PARAMS},
+                'mapX': f"{center_x:.6f}", 'mapY': f"{center_y:.6f}", 'radius': str(upstream_radius),
+                'numOfRows': str(TILE_FETCH_ROWS), 'pageNo': '1', 'arrange': 'E',
+            }
+            items = await request(tile_params)
+            if items is None:
+                return None  # 실패 결과는 캐시하지 않습니다.
+            # 결과가 numOfRows만큼 꽉 찼다면 상위 집합이 잘렸을 수 있으므로 이 타일은 캐시를 우회합니다.
+            superset = _TRUNCATED if len(items) >= TILE_FETCH_ROWS else items
+            self.cache.set(key, superset)
+
+        if superset is _TRUNCATED:
+            return await request(params)
+
+        matched = filter_by_distance(superset, float(params['mapX']), float(params['mapY']), float(params['radius']))
+        return paginate(matched, params)
+
+
+tour_tile_cache = GeoTileCache()
@@ -0,0 +1,89 @@
+# tour_api/management/commands/benchmark_async_auth.py
+
+import asyncio
+import time
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ai.benchmarking import summarize
+from tour_api.views import AsyncAPIView
+from users.authentication import user_cache
+
+
+class BenchmarkView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request):
+        return Response({"user": request.user.pk})
+
+
+class LegacyBenchmarkView(BenchmarkView):
+    """
+    이전 방식: APIView.initial 전체(인증 + 사용자 DB 조회 + 권한)를 thread_sensitive 스레드에서 실행
+    """
+    async def initial_async(self, request, *args, **kwargs):
+        await sync_to_async(self.initial, thread_sensitive=True)(request, *args, **kwargs)
+
+
+class Command(BaseCommand):
+    help = ("AsyncAPIView의 인증/권한 확인 경로를 동시 요청으로 측정합니다. "
+            "이전 방식(thread_sensitive 스레드에서 initial 실행)과 비동기 경로(캐시 사용/미사용)의 처리량과 지연을 비교합니다. "
+            "위치정보 취급대장에 기록이 남지 않도록 핸들러는 DB에 쓰지 않습니다.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', help="토큰을 발급할 사용자 이메일 (기본: 첫 번째 활성 사용자)")
+        parser.add_argument('--requests', type=int, default=2000, help="방식별 요청 수")
+        parser.add_argument('--concurrency', type=int, default=50, help="동시 요청 수")
+        parser.add_argument('--no-request-context', action='store_true',
+                            help="요청별 ThreadSensitiveContext 없이 실행 (ASGIHandler 밖: 프로세스 전체가 스레드 하나를 공유)")
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.filter(is_active=True)
+        user = (users.filter(email=options['email']) if options['email'] else users.order_by('pk')).first()
+        if user is None:
+            raise CommandError("토큰을 발급할 활성 사용자가 없습니다.")
+        token = str(AccessToken.for_user(user))
+        self.stdout.write(f"사용자 {user.pk}, 요청 {options['requests']}개, 동시 {options['concurrency']}개"
+                          f"{' (요청별 컨텍스트 없음)' if options['no_request_context'] else ''}")
+
+        modes = [
+            ('이전 방식 (thread_sensitive)', LegacyBenchmarkView, False),
+            ('비동기 (사용자 캐시 없음)', BenchmarkView, True),
+            ('비동기 (사용자 캐시)', BenchmarkView, False),
+        ]
+        for name, view_class, cold in modes:
+            user_cache.clear()
+            elapsed, samples, failures = asyncio.run(self.run(view_class.as_view(), token, cold, options))
+            self.stdout.write(f"{name:<28}: {options['requests'] / elapsed:8.1f} req/s, {summarize(samples)}"
+                              + (f", 실패 {failures}건" if failures else ""))
+
+    async def run(self, view, token: str, cold: bool, options: dict):
+        factory = APIRequestFactory()
+        semaphore = asyncio.Semaphore(options['concurrency'])
+        samples, failures = [], 0
+
+        async def one():
+            nonlocal failures
+            async with semaphore:
+                if cold:
+                    user_cache.clear()
+                request = factory.get('/benchmark/', HTTP_AUTHORIZATION=f"Bearer {token}")
+                t = time.perf_counter()
+                if options['no_request_context']:
+                    response = await view(request)
+                else:
+                    async with ThreadSensitiveContext():
+                        response = await view(request)
+                samples.append(time.perf_counter() - t)
+                if response.status_code != 200:
+                    failures += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(options['requests'])))
+        return time.perf_counter() - start, samples, failures
@@ -0,0 +1,56 @@
+# tour_api/management/commands/benchmark_place_index.py
+
+import asyncio
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ai.benchmarking import summarize
+from tour_api.place_index import place_index
+from tour_api.views import _request_tour_api
+
+
+class Command(BaseCommand):
+    help = "장소 인덱스 반경 질의와 실시간 TourAPI locationBasedList2 호출의 지연 시간을 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mapX', default='126.9769', help="경도 (기본: 경복궁)")
+        parser.add_argument('--mapY', default='37.5796', help="위도 (기본: 경복궁)")
+        parser.add_argument('--radius', default='5000')
+        parser.add_argument('--content-type', default='12')
+        parser.add_argument('--repeat', type=int, default=1000, help="인덱스 질의 반복 횟수")
+        parser.add_argument('--live-repeat', type=int, default=5, help="실시간 API 호출 횟수 (일일 쿼터 주의)")
+
+    def handle(self, *args, **options):
+        params = {'mapX': options['mapX'], 'mapY': options['mapY'], 'radius': options['radius'],
+                  'contentTypeId': options['content_type'], 'numOfRows': '50'}
+
+        load_start = time.perf_counter()
+        place_index.refresh()
+        self.stdout.write(f"인덱스 적재: {time.perf_counter() - load_start:.2f} 초, {place_index.stats()}")
+        if place_index.query(params) is None:
+            raise CommandError("해당 좌표/관광타입은 아직 수집되지 않았습니다. ingest_places를 먼저 실행하세요.")
+
+        index_samples = []
+        for _ in range(options['repeat']):
+            t = time.perf_counter()
+            index_items = place_index.query(params)
+            index_samples.append(time.perf_counter() - t)
+
+        async def run_live():
+            samples, items = [], []
+            for _ in range(options['live_repeat']):
+                t = time.perf_counter()
+                items = await _request_tour_api(params) or []
+                samples.append(time.perf_counter() - t)
+            return samples, items
+
+        live_samples, live_items = asyncio.run(run_live()) if options['live_repeat'] else ([], [])
+
+        self.stdout.write(f"인덱스      : {summarize(index_samples)}, {len(index_items)}개")
+        if live_samples:
+            self.stdout.write(f"locationBasedList2: {summarize(live_samples)}, {len(live_items)}개")
+            index_ids = {item['contentid'] for item in index_items}
+            live_ids = {item['contentid'] for item in live_items}
+            overlap = len(index_ids & live_ids) / len(live_ids) if live_ids else 1.0
+            self.stdout.write(f"결과 일치율 (실시간 기준): {overlap:.1%}")
@@ -0,0 +1,44 @@
+# tour_api/management/commands/build_vector_index.py
+
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ai.embedding_store import embedding_store, text_hash
+from ai.models import CrawledText
+from tour_api.models import Place
+from tour_api.vector_index import PlaceVectorIndex
+
+
+class Command(BaseCommand):
+    help = ("크롤링 캐시의 블로그 텍스트와 임베딩 캐시의 벡터로 장소 벡터 인덱스(IVF)를 만듭니다. "
+            "임베딩이 없는 장소는 enrich_places로 먼저 채워야 합니다. "
+            "실행 중인 서버는 재시작 없이 다음 벡터 검색 때(최대 RELOAD_CHECK_INTERVAL 이내) 새 인덱스로 바꿉니다.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=settings.PLACE_VECTOR_INDEX_PATH)
+        parser.add_argument('--model', default='text-embedding-3-small')
+        parser.add_argument('--nlist', type=int, help="IVF 리스트 수 (기본: 2 * sqrt(장소 수))")
+
+    def handle(self, *args, **options):
+        start = time.time()
+        texts = dict(CrawledText.objects.exclude(text__isnull=True).exclude(text='').values_list('content_id', 'text'))
+        places = [row for row in Place.objects.order_by('content_id').values_list(
+            'content_id', 'content_type_id', 'cat3', 'mapx', 'mapy') if str(row[0]) in texts]
+        hashes = [text_hash(texts[str(row[0])]) for row in places]
+        vectors = {}
+        for i in range(0, len(hashes), 1000):
+            vectors.update(embedding_store.get_many(options['model'], hashes[i:i + 1000]))
+        rows = [(row, vectors[h]) for row, h in zip(places, hashes) if h in vectors]
+        self.stdout.write(f"블로그 텍스트가 있는 장소 {len(places)}개 중 임베딩이 있는 장소 {len(rows)}개")
+        if not rows:
+            raise CommandError("인덱스에 넣을 장소가 없습니다.")
+
+        content_ids, content_types, cat3, xs, ys = zip(*(row for row, _ in rows))
+        matrix = np.array([vector for _, vector in rows], dtype=np.float32)
+        nlist = PlaceVectorIndex.save(options['output'], options['model'], content_ids, content_types, cat3, xs, ys,
+                                      matrix, nlist=options['nlist'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(rows)}개 장소 ({matrix.shape[1]}차원, {nlist}개 리스트) -> {options['output']} ({time.time() - start:.1f}초)"))
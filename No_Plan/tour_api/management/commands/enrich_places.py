@@ -0,0 +1,116 @@
+# tour_api/management/commands/enrich_places.py
+
+import asyncio
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ai.db import db_sync_to_async
+from ai.profiles import PROFILE_MAX_AGE, place_profile_store
+from ai.services import BlogCrawler, RecommendationEngine, gather_with_concurrency
+from tour_api.models import Place
+
+
+CAFE_CAT3 = 'A05020900'
+
+
+def place_type_of(content_type_id: str, cat3: str) -> str:
+    """
+    추천 API에서 사용하는 장소유형 이름 (NEARBY_CATEGORIES의 place_type과 같음)
+    """
+    if content_type_id == '39':
+        return '카페' if cat3 == CAFE_CAT3 else '음식점'
+    return {'12': '관광지', '32': '숙소'}.get(content_type_id, '관광지')
+
+
+class Command(BaseCommand):
+    help = ("장소 카탈로그(Place)의 장소들을 미리 크롤링/임베딩하고 기본 해시태그를 만들어 둡니다. "
+            "결과는 크롤링 캐시, 임베딩 캐시, 장소 프로필에 저장되어 추천 요청에서 바로 사용됩니다.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--area-code', help="지역 코드")
+        parser.add_argument('--bbox', help="경계 상자 'minX,minY,maxX,maxY' (경도/위도)")
+        parser.add_argument('--content-type', action='append', dest='content_types',
+                            help="관광타입 ID (여러 번 지정 가능, 기본: 12 32 39)")
+        parser.add_argument('--batch-size', type=int, default=50, help="한 번에 처리하고 저장(체크포인트)할 장소 수")
+        parser.add_argument('--llm-concurrency', type=int, default=4, help="동시에 보낼 해시태그 생성 요청 수")
+        parser.add_argument('--max-age-days', type=int, default=PROFILE_MAX_AGE.days,
+                            help="이 기간 안에 처리한 장소는 건너뜀 (중단 후 이어서 실행)")
+        parser.add_argument('--force', action='store_true', help="처리 이력과 관계없이 모두 다시 처리")
+        parser.add_argument('--limit', type=int, help="처리할 최대 장소 수")
+
+    def handle(self, *args, **options):
+        if not options['area_code'] and not options['bbox']:
+            raise CommandError("--area-code 또는 --bbox 로 처리할 지역을 지정하세요.")
+        places = Place.objects.filter(content_type_id__in=options['content_types'] or ['12', '32', '39'])
+        if options['area_code']:
+            places = places.filter(area_code=options['area_code'])
+        if options['bbox']:
+            try:
+                min_x, min_y, max_x, max_y = map(float, options['bbox'].split(','))
+            except ValueError:
+                raise CommandError("--bbox 는 'minX,minY,maxX,maxY' 형식이어야 합니다.")
+            places = places.filter(mapx__gte=min_x, mapx__lte=max_x, mapy__gte=min_y, mapy__lte=max_y)
+
+        rows = [(str(cid), type_id, title, cat3, (raw or {}).get('addr1', '')) for cid, type_id, title, cat3, raw in
+                places.order_by('content_id').values_list('content_id', 'content_type_id', 'title', 'cat3', 'raw')]
+        done = set() if options['force'] else place_profile_store.enriched_ids(
+            [row[0] for row in rows], timedelta(days=options['max_age_days']))
+        todo = [row for row in rows if row[0] not in done]
+        if options['limit']:
+            todo = todo[:options['limit']]
+        self.stdout.write(f"대상 {len(rows)}개 장소 중 이미 처리 {len(done)}개, 이번에 처리 {len(todo)}개")
+        if todo:
+            asyncio.run(self.enrich(todo, options['batch_size'], options['llm_concurrency']))
+
+    async def enrich(self, todo: list[tuple], batch_size: int, llm_concurrency: int):
+        totals = defaultdict(int)
+        start = time.time()
+        batches = [todo[i:i + batch_size] for i in range(0, len(todo), batch_size)]
+        # bulk 레인: 서비스 요청의 OpenAI 호출보다 뒤로 밀리고, 동시성 제한의 일부만 사용합니다.
+        async with RecommendationEngine(lane='bulk') as engine:
+            crawler = BlogCrawler()
+            for number, batch in enumerate(batches, 1):
+                batch_start = time.time()
+                crawled = await crawler.crawl_all([(cid, title, addr) for cid, _, title, _, addr in batch])
+                with_text = [record for record in crawled if record.text.strip() and record.text != crawler.placeholder]
+                t_crawl = time.time()
+
+                # 임베딩 캐시에 없는 텍스트만 임베딩됩니다.
+                if with_text:
+                    await engine.get_embedding([record.text for record in with_text])
+                t_embed = time.time()
+
+                type_of = {cid: place_type_of(type_id, cat3) for cid, type_id, _, cat3, _ in batch}
+                by_type = defaultdict(list)
+                for record in with_text:
+                    by_type[type_of[record.contentid]].append(record)
+                tasks = [engine.generate_base_hashtags(group, place_type)
+                         for place_type, records in by_type.items() for group in engine.make_reason_batches(records)]
+                hashtags = {}
+                for result in await gather_with_concurrency(llm_concurrency, *tasks):
+                    hashtags.update(result)
+                t_tags = time.time()
+
+                # 체크포인트: 블로그가 없는 장소와 해시태그까지 만든 장소만 저장합니다. (실패한 장소는 다음 실행에서 다시 처리)
+                text_of = {record.contentid: record.text for record in with_text}
+                profiles = [(cid, text_of.get(cid, ''), hashtags.get(cid, '')) for cid, *_ in batch
+                            if cid not in text_of or cid in hashtags]
+                await db_sync_to_async(place_profile_store.save_many)(profiles)
+
+                elapsed = time.time() - batch_start
+                totals['places'] += len(batch)
+                totals['with_text'] += len(with_text)
+                totals['tagged'] += len(hashtags)
+                totals['failed'] += len(batch) - len(profiles)
+                self.stdout.write(
+                    f"[{number}/{len(batches)}] {len(batch)}개: 텍스트 {len(with_text)}개, 해시태그 {len(hashtags)}개 "
+                    f"(크롤링 {t_crawl - batch_start:.1f}초, 임베딩 {t_embed - t_crawl:.1f}초, 해시태그 {t_tags - t_embed:.1f}초, "
+                    f"{len(batch) / elapsed:.2f}개/초)")
+
+        elapsed = time.time() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"완료: {totals['places']}개 장소, 텍스트 {totals['with_text']}개, 해시태그 {totals['tagged']}개, "
+            f"실패 {totals['failed']}개 / {elapsed:.1f}초 ({totals['places'] / elapsed:.2f}개/초)"))
@@ -0,0 +1,125 @@
+# tour_api/management/commands/ingest_places.py
+
+import json
+import time
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Max, Min
+
+from tour_api.models import Place, PlaceCatalogArea
+from tour_api.views import TlsAdapter
+
+
+AREA_BASED_LIST_URL = "https://apis.data.go.kr/B551011/KorService2/areaBasedList2"
+UPDATE_FIELDS = ['content_type_id', 'title', 'area_code', 'cat1', 'cat2', 'cat3', 'mapx', 'mapy',
+                 'modified_time', 'raw', 'updated_at']
+
+
+class Command(BaseCommand):
+    help = "TourAPI areaBasedList2 목록을 장소 카탈로그(Place)에 일괄 수집합니다. 기본은 수정일 기준 증분 수집입니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--content-type', action='append', dest='content_types',
+                            help="관광타입 ID (여러 번 지정 가능, 기본: 12 32 39)")
+        parser.add_argument('--area-code', default='', help="지역 코드 (생략하면 전국)")
+        parser.add_argument('--rows', type=int, default=1000, help="페이지당 항목 수")
+        parser.add_argument('--full', action='store_true', help="증분 기준을 무시하고 전체를 다시 수집")
+
+    def handle(self, *args, **options):
+        if not settings.TOUR_API_SERVICE_KEY:
+            raise CommandError("TOUR_API_SERVICE_KEY가 설정되어 있지 않습니다.")
+        session = requests.Session()
+        session.mount('https://', TlsAdapter())
+        for content_type_id in options['content_types'] or ['12', '32', '39']:
+            self.ingest(session, content_type_id, options['area_code'], options['rows'], options['full'])
+
+    def fetch_page(self, session, params: dict) -> list:
+        default_params = {'serviceKey': settings.TOUR_API_SERVICE_KEY, 'MobileOS': 'ETC', 'MobileApp': 'MyTourApp',
+                          '_type': 'json'}
+        for attempt in range(3):
+            try:
+                response = session.get(AREA_BASED_LIST_URL, params={**default_params, **params}, timeout=30)
+                response.raise_for_status()
+                data = response.json()
+                if data.get('response', {}).get('body', {}).get('items') == '': return []
+                items = data.get('response', {}).get('body', {}).get('items', {}).get('item', [])
+                return [items] if isinstance(items, dict) else items
+            except (json.JSONDecodeError, requests.exceptions.RequestException) as e:
+                self.stderr.write(f"  API 요청 실패 (시도 {attempt + 1}/3): {e}")
+                time.sleep(2 ** attempt)
+        raise CommandError("TourAPI 요청이 계속 실패하여 수집을 중단합니다.")
+
+    def ingest(self, session, content_type_id: str, area_code: str, rows: int, full: bool):
+        area = PlaceCatalogArea.objects.filter(content_type_id=content_type_id, area_code=area_code).first()
+        since = '' if full or area is None else area.last_modified_time
+        self.stdout.write(f"[{content_type_id}] {area_code or '전국'} 수집 시작 (기준 수정일: {since or '없음'})")
+
+        start = time.time()
+        page, total = 1, 0
+        while True:
+            params = {'contentTypeId': content_type_id, 'numOfRows': str(rows), 'pageNo': str(page), 'arrange': 'C'}
+            if area_code:
+                params['areaCode'] = area_code
+            items = self.fetch_page(session, params)
+
+            # 수정일 내림차순(arrange=C)이므로 기준 수정일 이하가 나오면 그 뒤는 이미 수집된 항목입니다.
+            fresh = [item for item in items if item.get('modifiedtime', '') > since]
+            places = [place for place in map(self.to_place, fresh) if place is not None]
+            if places:
+                # MySQL은 충돌 대상 컬럼을 지정할 수 없으므로 unique 인덱스에 맡깁니다.
+                unique_fields = ['content_id'] if connection.features.supports_update_conflicts_with_target else None
+                Place.objects.bulk_create(places, update_conflicts=True, unique_fields=unique_fields,
+                                          update_fields=UPDATE_FIELDS)
+            total += len(places)
+            self.stdout.write(f"  {page} 페이지: {len(places)}개 반영")
+            if len(items) < rows or len(fresh) < len(items):
+                break
+            page += 1
+
+        self.update_coverage(content_type_id, area_code)
+        self.stdout.write(self.style.SUCCESS(
+            f"[{content_type_id}] {area_code or '전국'} 수집 완료: {total}개 ({time.time() - start:.1f} 초)"))
+
+    @staticmethod
+    def to_place(item: dict) -> Place | None:
+        try:
+            map_x, map_y = float(item['mapx']), float(item['mapy'])
+            content_id = int(item['contentid'])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if not map_x or not map_y:
+            return None
+        return Place(
+            content_id=content_id,
+            content_type_id=str(item.get('contenttypeid', '')),
+            title=item.get('title', '')[:200],
+            area_code=str(item.get('areacode') or ''),
+            cat1=item.get('cat1') or '',
+            cat2=item.get('cat2') or '',
+            cat3=item.get('cat3') or '',
+            mapx=map_x,
+            mapy=map_y,
+            modified_time=item.get('modifiedtime') or '',
+            raw=item,
+        )
+
+    @staticmethod
+    def update_coverage(content_type_id: str, area_code: str):
+        places = Place.objects.filter(content_type_id=content_type_id)
+        if area_code:
+            places = places.filter(area_code=area_code)
+        bounds = places.aggregate(min_x=Min('mapx'), max_x=Max('mapx'), min_y=Min('mapy'), max_y=Max('mapy'),
+                                  last_modified=Max('modified_time'))
+        if bounds['min_x'] is None:
+            return
+        PlaceCatalogArea.objects.update_or_create(
+            content_type_id=content_type_id, area_code=area_code,
+            defaults={
+                'min_mapx': bounds['min_x'], 'max_mapx': bounds['max_x'],
+                'min_mapy': bounds['min_y'], 'max_mapy': bounds['max_y'],
+                'last_modified_time': bounds['last_modified'] or '',
+            },
+        )
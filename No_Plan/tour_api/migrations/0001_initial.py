@@ -0,0 +1,58 @@
+# Generated by Django 5.2.4 on 2026-10-17 12:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Place',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_id', models.IntegerField(unique=True, verbose_name='콘텐츠 ID')),
+                ('content_type_id', models.CharField(max_length=4, verbose_name='관광타입 ID')),
+                ('title', models.CharField(max_length=200, verbose_name='장소 이름')),
+                ('area_code', models.CharField(blank=True, default='', max_length=10, verbose_name='지역 코드')),
+                ('cat1', models.CharField(blank=True, default='', max_length=10, verbose_name='대분류')),
+                ('cat2', models.CharField(blank=True, default='', max_length=10, verbose_name='중분류')),
+                ('cat3', models.CharField(blank=True, default='', max_length=10, verbose_name='소분류')),
+                ('mapx', models.FloatField(verbose_name='경도')),
+                ('mapy', models.FloatField(verbose_name='위도')),
+                ('modified_time', models.CharField(blank=True, default='', max_length=14, verbose_name='콘텐츠 수정일')),
+                ('raw', models.JSONField(verbose_name='원본 데이터')),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True, verbose_name='반영 시각')),
+            ],
+            options={
+                'verbose_name': '장소 카탈로그',
+                'verbose_name_plural': '장소 카탈로그 목록',
+                'db_table': 'tour_place',
+                'indexes': [models.Index(fields=['content_type_id', 'area_code'], name='tour_place_type_area_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PlaceCatalogArea',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_type_id', models.CharField(max_length=4, verbose_name='관광타입 ID')),
+                ('area_code', models.CharField(blank=True, default='', max_length=10, verbose_name='지역 코드')),
+                ('min_mapx', models.FloatField(verbose_name='최소 경도')),
+                ('max_mapx', models.FloatField(verbose_name='최대 경도')),
+                ('min_mapy', models.FloatField(verbose_name='최소 위도')),
+                ('max_mapy', models.FloatField(verbose_name='최대 위도')),
+                ('last_modified_time', models.CharField(blank=True, default='', max_length=14, verbose_name='최근 콘텐츠 수정일')),
+                ('ingested_at', models.DateTimeField(auto_now=True, verbose_name='수집 시각')),
+            ],
+            options={
+                'verbose_name': '장소 카탈로그 수집 범위',
+                'verbose_name_plural': '장소 카탈로그 수집 범위 목록',
+                'db_table': 'tour_place_catalog_area',
+                'unique_together': {('content_type_id', 'area_code')},
+            },
+        ),
+    ]
@@ -1,3 +1,81 @@
+# tour_api/models.py
+
 from django.db import models
 
-# Create your models here.
+
+class Place(models.Model):
+    """
+    TourAPI(areaBasedList2)에서 일괄 수집한 장소 카탈로그.
+    주변 장소 목록 API는 이 테이블로 만든 메모리 공간 인덱스에서 먼저 응답합니다.
+    """
+    # TourAPI 콘텐츠 ID
+    content_id = models.IntegerField(unique=True, verbose_name='콘텐츠 ID')
+
+    # 관광타입 ID (12: 관광지, 32: 숙박, 39: 음식점 등)
+    content_type_id = models.CharField(max_length=4, verbose_name='관광타입 ID')
+
+    title = models.CharField(max_length=200, verbose_name='장소 이름')
+
+    # 지역 코드 (수집 범위 구분용)
+    area_code = models.CharField(max_length=10, blank=True, default='', verbose_name='지역 코드')
+
+    # 분류 코드
+    cat1 = models.CharField(max_length=10, blank=True, default='', verbose_name='대분류')
+    cat2 = models.CharField(max_length=10, blank=True, default='', verbose_name='중분류')
+    cat3 = models.CharField(max_length=10, blank=True, default='', verbose_name='소분류')
+
+    # 경도 (Longitude)
+    mapx = models.FloatField(verbose_name='경도')
+
+    # 위도 (Latitude)
+    mapy = models.FloatField(verbose_name='위도')
+
+    # TourAPI 콘텐츠 수정일 (YYYYMMDDhhmmss)
+    modified_time = models.CharField(max_length=14, blank=True, default='', verbose_name='콘텐츠 수정일')
+
+    # TourAPI 원본 항목 (목록 API 응답과 같은 형태로 돌려주기 위해 저장)
+    raw = models.JSONField(verbose_name='원본 데이터')
+
+    # 카탈로그에 반영된 시각 (메모리 인덱스의 증분 갱신 기준)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name='반영 시각')
+
+    def __str__(self):
+        return f"[{self.content_type_id}] {self.title} ({self.content_id})"
+
+    class Meta:
+        db_table = 'tour_place'
+        verbose_name = '장소 카탈로그'
+        verbose_name_plural = '장소 카탈로그 목록'
+        indexes = [
+            models.Index(fields=['content_type_id', 'area_code'], name='tour_place_type_area_idx'),
+        ]
+
+
+class PlaceCatalogArea(models.Model):
+    """
+    장소 카탈로그에 수집이 끝난 범위(관광타입 + 지역)와 그 좌표 경계.
+    전국(또는 모든 지역) 수집이 끝난 관광타입만 인덱스로 응답하고, 나머지는 TourAPI로 넘깁니다.
+    """
+    content_type_id = models.CharField(max_length=4, verbose_name='관광타입 ID')
+
+    # 빈 문자열이면 전국
+    area_code = models.CharField(max_length=10, blank=True, default='', verbose_name='지역 코드')
+
+    min_mapx = models.FloatField(verbose_name='최소 경도')
+    max_mapx = models.FloatField(verbose_name='최대 경도')
+    min_mapy = models.FloatField(verbose_name='최소 위도')
+    max_mapy = models.FloatField(verbose_name='최대 위도')
+
+    # 다음 증분 수집의 기준이 되는 가장 최근 콘텐츠 수정일
+    last_modified_time = models.CharField(max_length=14, blank=True, default='', verbose_name='최근 콘텐츠 수정일')
+
+    ingested_at = models.DateTimeField(auto_now=True, verbose_name='수집 시각')
+
+    def __str__(self):
+        return f"[{self.content_type_id}] {self.area_code or '전국'}"
+
+    class Meta:
+        db_table = 'tour_place_catalog_area'
+        verbose_name = '장소 카탈로그 수집 범위'
+        verbose_name_plural = '장소 카탈로그 수집 범위 목록'
+        unique_together = ('content_type_id', 'area_code')
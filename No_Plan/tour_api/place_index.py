@@ -0,0 +1,248 @@
+# tour_api/place_index.py
+
+import asyncio
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+from .geo_cache import paginate
+
+
+# ===================================================================
+# 장소 카탈로그(Place) 메모리 공간 인덱스
+# ===================================================================
+# 좌표를 CELL_SIZE_DEG 간격의 격자로 나누어 (관광타입, 격자) -> 장소 목록으로 보관합니다.
+# 반경 질의는 원이 걸치는 격자만 훑고 정확한 거리로 다시 걸러내므로 TourAPI 호출이 필요 없습니다.
+# 격자마다 좌표/분류 코드를 NumPy 배열로 묶어 두고 거리 계산과 필터링을 한 번에 벡터 연산으로 처리합니다.
+# 갱신은 새 스냅샷을 따로 만든 뒤 참조 하나만 바꿔 끼우므로(copy-on-write) 질의는 잠금 없이 일관된 상태를 읽습니다.
+CELL_SIZE_DEG = 0.05        # 약 4.5km x 5.5km
+REFRESH_INTERVAL = 5 * 60   # DB 변경분을 다시 읽어오는 주기 (초)
+# 갱신 도중 커밋된 행을 놓치지 않도록 직전 갱신 시점보다 조금 앞에서부터 다시 읽습니다. (upsert라 중복 무해)
+REFRESH_OVERLAP = timedelta(minutes=1)
+
+# 인덱스로 처리할 수 있는 필터 파라미터 -> TourAPI 항목 필드
+_FILTER_FIELDS = {'contentTypeId': 'contenttypeid', 'cat1': 'cat1', 'cat2': 'cat2', 'cat3': 'cat3'}
+# 인덱스가 무시해도 되는 파라미터 (응답 형식/페이지 관련)
+_PASSTHROUGH_PARAMS = {'mapX', 'mapY', 'radius', 'numOfRows', 'pageNo', 'arrange'}
+_EARTH_RADIUS_M = 6371008.8
+# TourAPI 지역 코드 전체. 관광타입별로 모두 수집했으면 전국 수집과 같이 취급합니다.
+ALL_AREA_CODES = frozenset({'1', '2', '3', '4', '5', '6', '7', '8',
+                            '31', '32', '33', '34', '35', '36', '37', '38', '39'})
+
+
+class _CellArrays:
+    """
+    한 격자의 장소들을 벡터 연산용 배열로 묶은 스냅샷
+    """
+    __slots__ = ('xs', 'ys', 'cats', 'items')
+
+    def __init__(self, entries: list[tuple[float, float, dict]]):
+        self.xs = np.radians(np.fromiter((e[0] for e in entries), dtype=np.float64, count=len(entries)))
+        self.ys = np.radians(np.fromiter((e[1] for e in entries), dtype=np.float64, count=len(entries)))
+        self.cats = {field: np.array([e[2].get(field) or '' for e in entries])
+                     for field in ('cat1', 'cat2', 'cat3')}
+        self.items = [e[2] for e in entries]
+
+
+class _Snapshot:
+    """
+    인덱스의 한 시점 상태. 만들어진 뒤에는 갱신 스레드가 고치지 않습니다. (cell_arrays는 질의가 채우는 캐시)
+    """
+    __slots__ = ('places', 'cells', 'cell_arrays', 'covered_types')
+
+    def __init__(self, places: dict, cells: dict, cell_arrays: dict, covered_types: frozenset):
+        self.places = places                # content_id -> (관광타입, 격자, 원본 항목)
+        self.cells = cells                  # (관광타입, cx, cy) -> {content_id: (경도, 위도, 원본 항목)}
+        self.cell_arrays = cell_arrays      # (관광타입, cx, cy) -> _CellArrays
+        self.covered_types = covered_types  # 전국 수집이 끝난 관광타입
+
+
+class PlaceIndex:
+    def __init__(self, cell_size: float = CELL_SIZE_DEG, refresh_interval: float = REFRESH_INTERVAL):
+        self.cell_size = cell_size
+        self.refresh_interval = refresh_interval
+        self._state = _Snapshot({}, {}, {}, frozenset())
+        self._synced_until = None           # 마지막으로 반영한 Place.updated_at
+        self._checked_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self._refresh_task = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._synced_until is not None
+
+    def cell_of(self, map_x: float, map_y: float) -> tuple[int, int]:
+        return math.floor(map_x / self.cell_size), math.floor(map_y / self.cell_size)
+
+    # ---------------------------------------------------------------
+    # 적재 / 증분 갱신
+    # ---------------------------------------------------------------
+    @staticmethod
+    def _writable_cell(cells: dict, touched: set, cell: tuple) -> dict:
+        # 이전 스냅샷과 공유하는 격자는 처음 고칠 때 복사합니다.
+        if cell not in touched:
+            cells[cell] = dict(cells.get(cell, {}))
+            touched.add(cell)
+        return cells[cell]
+
+    def _upsert(self, places: dict, cells: dict, touched: set, content_id: int, content_type_id: str,
+                map_x: float, map_y: float, item: dict):
+        previous = places.pop(content_id, None)
+        if previous is not None:
+            self._writable_cell(cells, touched, previous[1]).pop(content_id, None)
+        if item.get('showflag') == '0':  # TourAPI에서 비공개 처리된 장소
+            return
+        cell = (content_type_id, *self.cell_of(map_x, map_y))
+        self._writable_cell(cells, touched, cell)[content_id] = (map_x, map_y, item)
+        places[content_id] = (content_type_id, cell, item)
+
+    @staticmethod
+    def _arrays_of(state: _Snapshot, cell: tuple) -> _CellArrays | None:
+        arrays = state.cell_arrays.get(cell)
+        if arrays is None:
+            entries = tuple(state.cells.get(cell, {}).values())
+            if not entries:
+                return None
+            arrays = state.cell_arrays[cell] = _CellArrays(entries)
+        return arrays
+
+    def refresh(self):
+        """
+        마지막 갱신 이후 카탈로그에 반영된 장소만 읽어와 인덱스에 반영합니다. (동기 함수)
+        """
+        from .models import Place, PlaceCatalogArea
+
+        if not self._refresh_lock.acquire(blocking=False):
+            return  # 다른 스레드가 이미 갱신 중
+        try:
+            start = time.time()
+            rows = Place.objects.order_by('updated_at')
+            if self._synced_until is not None:
+                rows = rows.filter(updated_at__gte=self._synced_until - REFRESH_OVERLAP)
+            state = self._state
+            places, cells, touched = dict(state.places), dict(state.cells), set()
+            count = 0
+            synced_until = self._synced_until
+            for content_id, content_type_id, map_x, map_y, raw, updated_at in rows.values_list(
+                    'content_id', 'content_type_id', 'mapx', 'mapy', 'raw', 'updated_at').iterator(chunk_size=5000):
+                self._upsert(places, cells, touched, content_id, content_type_id, map_x, map_y, raw)
+                synced_until = updated_at
+                count += 1
+
+            # 지역 하나의 좌표 경계만으로는 경계 근처에 이웃 지역(미수집) 장소가 있는지 알 수 없으므로,
+            # 전국 수집(또는 모든 지역 수집)이 끝난 관광타입만 인덱스로 응답합니다.
+            area_codes = {}
+            for content_type_id, area_code in PlaceCatalogArea.objects.values_list('content_type_id', 'area_code'):
+                area_codes.setdefault(content_type_id, set()).add(area_code)
+            covered_types = frozenset(t for t, codes in area_codes.items() if '' in codes or codes >= ALL_AREA_CODES)
+
+            cell_arrays = {cell: arrays for cell, arrays in state.cell_arrays.items() if cell not in touched}
+            self._state = _Snapshot(places, cells, cell_arrays, covered_types)
+
+            # 카탈로그가 비어 있어도 '적재 완료' 상태로 표시합니다.
+            self._synced_until = synced_until or datetime(1970, 1, 1)
+            if count:
+                print(f"[장소 인덱스] {count}개 장소 반영 (총 {len(places)}개, {time.time() - start:.2f} 초)")
+        except Exception as e:
+            print(f"[장소 인덱스] 갱신 실패: {e}")
+        finally:
+            self._checked_at = time.monotonic()
+            self._refresh_lock.release()
+            close_old_connections()
+
+    def ensure_fresh(self):
+        """
+        갱신 주기가 지났으면 백그라운드에서 증분 갱신을 시작합니다. 요청은 기다리지 않습니다.
+        """
+        if time.monotonic() - self._checked_at < self.refresh_interval:
+            return
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._checked_at = time.monotonic()
+        self._refresh_task = asyncio.ensure_future(sync_to_async(self.refresh, thread_sensitive=False)())
+
+    # ---------------------------------------------------------------
+    # 반경 질의
+    # ---------------------------------------------------------------
+    def is_covered(self, content_type_id: str) -> bool:
+        """
+        관광타입의 전국 수집이 끝나 어느 위치의 질의든 인덱스로 빠짐없이 답할 수 있는지 확인합니다.
+        """
+        return content_type_id in self._state.covered_types
+
+    def query(self, params: dict) -> list | None:
+        """
+        locationBasedList2와 같은 파라미터로 반경 질의를 수행합니다.
+        인덱스로 답할 수 없는 요청(미적재, 미수집 지역, 지원하지 않는 파라미터)이면 None을 반환합니다.
+        """
+        if not self.is_loaded:
+            return None
+        if any(k not in _FILTER_FIELDS and k not in _PASSTHROUGH_PARAMS for k in params):
+            return None
+        try:
+            map_x, map_y = float(params['mapX']), float(params['mapY'])
+            radius = float(params['radius'])
+            content_type_id = str(params['contentTypeId'])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if not self.is_covered(content_type_id):
+            return None
+
+        filters = [(field, str(params[key])) for key, field in _FILTER_FIELDS.items()
+                   if key in params and key != 'contentTypeId']
+        dy = radius / 111_320
+        dx = dy / max(math.cos(math.radians(map_y)), 1e-6)
+        min_cx, min_cy = self.cell_of(map_x - dx, map_y - dy)
+        max_cx, max_cy = self.cell_of(map_x + dx, map_y + dy)
+
+        state = self._state
+        lon0, lat0 = math.radians(map_x), math.radians(map_y)
+        matches = []  # (거리 배열, 원본 항목 목록)
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                arrays = self._arrays_of(state, (content_type_id, cx, cy))
+                if arrays is None:
+                    continue
+                # haversine 거리 (m)
+                a = (np.sin((arrays.ys - lat0) / 2) ** 2
+                     + math.cos(lat0) * np.cos(arrays.ys) * np.sin((arrays.xs - lon0) / 2) ** 2)
+                dists = 2 * _EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+                mask = dists <= radius
+                for field, value in filters:
+                    mask &= arrays.cats[field] == value
+                hit = np.flatnonzero(mask)
+                if hit.size:
+                    matches.append((dists[hit], [arrays.items[i] for i in hit]))
+
+        if not matches:
+            return []
+        dists = np.concatenate([d for d, _ in matches])
+        items = [item for _, group in matches for item in group]
+        order = np.argsort(dists, kind='stable')
+        page = paginate(order, params)
+        # 원본이 오염되지 않도록 복사본에 거리('dist')를 넣어 반환합니다.
+        return [{**items[i], 'dist': f"{dists[i]:.6f}"} for i in page]
+
+    def get(self, content_id: int) -> dict | None:
+        """
+        content_id 장소의 원본 항목 (인덱스에 없으면 None)
+        """
+        entry = self._state.places.get(content_id)
+        return None if entry is None else entry[2]
+
+    def stats(self) -> dict:
+        state = self._state
+        return {
+            "places": len(state.places),
+            "cells": sum(1 for c in state.cells.values() if c),
+            "covered_types": sorted(state.covered_types),
+            "synced_until": self._synced_until,
+        }
+
+
+place_index = PlaceIndex()
@@ -0,0 +1,190 @@
+# tour_api/populartimes.py
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import livepopulartimes
+
+from ai.cache import TTLCache, SingleFlight
+
+
+# ===================================================================
+# livepopulartimes 혼잡도 조회 (전용 스레드 풀 + 캐시)
+# ===================================================================
+# livepopulartimes는 구글 검색 결과를 동기로 스크래핑하므로 스레드에서 실행해야 합니다.
+# 기본 asyncio.to_thread 풀을 쓰면 요청당 최대 수십 건의 스크래핑이 다른 to_thread 작업(ORM 등)의 자리를
+# 차지하므로, 크기가 제한된 전용 스레드 풀에서 실행합니다.
+# 결과는 가공(process_populartimes_data)을 마친 형태로 두 단계로 캐시합니다.
+#  - 주간 요약 (평점, 요일/시간대별 히스토그램, 가장 붐비는 시간): 거의 바뀌지 않으므로 며칠 동안
+#  - 실시간 혼잡도 (current_popularity): 몇 분 동안
+# 실시간 값이 만료된 장소는 히스토그램의 현재 요일/시간대 값으로 혼잡도를 추정해 바로 응답하고,
+# 백그라운드에서 다시 조회합니다.
+WEEKLY_TTL = 60 * 60 * 24 * 3   # 3일
+CURRENT_TTL = 60 * 5            # 5분
+NO_DATA_TTL = 60 * 60 * 24      # 혼잡도 정보가 없는 장소 (1일)
+CACHE_MAXSIZE = 4096
+
+_MISSING = object()
+_NO_DATA = object()
+
+
+def popularity_status(current_pop) -> str:
+    if current_pop is None:
+        return "not_busy"
+    if current_pop >= 70:
+        return "busy"
+    if current_pop >= 40:
+        return "normal"
+    return "not_busy"
+
+
+def summarize_weekly(pop_data) -> dict | None:
+    """
+    livepopulartimes 결과에서 실시간 값을 뺀 주간 요약을 만듭니다.
+    hours[요일(월=0)][시] 는 시간대별 혼잡도입니다.
+    """
+    if not pop_data:
+        return None
+    try:
+        weekly = {"rating": pop_data.get("rating"), "rating_n": pop_data.get("rating_n"), "hours": None}
+        if "populartimes" in pop_data and pop_data["populartimes"]:
+            busiest_day = ""
+            busiest_hour = -1
+            max_popularity = -1
+            for day_data in pop_data["populartimes"]:
+                for hour, popularity in enumerate(day_data["data"]):
+                    if popularity > max_popularity:
+                        max_popularity = popularity
+                        busiest_day = day_data["name"]
+                        busiest_hour = hour
+            if busiest_day:
+                weekly["busiest_time"] = {
+                    "day": busiest_day,
+                    "hour": f"{busiest_hour}:00"
+                }
+            weekly["hours"] = [list(day_data["data"]) for day_data in pop_data["populartimes"]]
+        return weekly
+    except (TypeError, IndexError, KeyError) as e:
+        print(f"populartimes 데이터 처리 중 오류: {e}")
+        return None
+
+
+def build_populartimes(weekly: dict, current_pop) -> dict:
+    """
+    주간 요약과 실시간 혼잡도로 API 응답용 혼잡도 정보를 만듭니다.
+    """
+    processed = {"rating": weekly["rating"], "rating_n": weekly["rating_n"],
+                 "current_status": popularity_status(current_pop)}
+    if "busiest_time" in weekly:
+        processed["busiest_time"] = dict(weekly["busiest_time"])
+    return processed
+
+
+def process_populartimes_data(pop_data):
+    weekly = summarize_weekly(pop_data)
+    if weekly is None:
+        return None
+    return build_populartimes(weekly, pop_data.get("current_popularity"))
+
+
+def estimate_current(weekly: dict, now: datetime = None):
+    """
+    히스토그램에서 현재 요일/시간대의 혼잡도를 읽습니다. 히스토그램이 없으면 None.
+    """
+    hours = weekly.get("hours")
+    if not hours:
+        return None
+    now = now or datetime.now()
+    try:
+        return hours[now.weekday()][now.hour]
+    except (IndexError, TypeError):
+        return None
+
+
+class PopulartimesService:
+    def __init__(self, workers: int = None, maxsize: int = CACHE_MAXSIZE):
+        self.workers = workers
+        self.weekly = TTLCache(maxsize=maxsize, ttl=WEEKLY_TTL)
+        self.current = TTLCache(maxsize=maxsize, ttl=CURRENT_TTL)
+        self.flight = SingleFlight()
+        self._executor = None
+        self._refreshing = set()  # 백그라운드 재조회 Task (가비지 컬렉션 방지용 참조)
+        self.scrapes = 0
+        self.errors = 0
+        self.estimated = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            if self.workers is None:
+                from django.conf import settings
+                self.workers = settings.POPULARTIMES_WORKERS
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='populartimes')
+        return self._executor
+
+    async def _scrape(self, key: tuple[str, str]) -> dict | None:
+        title, address = key
+        self.scrapes += 1
+        try:
+            data = await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), livepopulartimes.get_populartimes_by_address, f"{title}, {address}")
+        except Exception as e:
+            # 오류는 캐시하지 않습니다.
+            self.errors += 1
+            print(f"'{title}' 혼잡도 조회 중 오류 발생: {e}")
+            return None
+        weekly = summarize_weekly(data) if data and data.get('populartimes') else None
+        if weekly is None:
+            self.weekly.set(key, _NO_DATA, ttl=NO_DATA_TTL)
+            return None
+        self.weekly.set(key, weekly)
+        self.current.set(key, data.get('current_popularity'))
+        return weekly
+
+    def _refresh(self, key: tuple[str, str]):
+        task = asyncio.ensure_future(self.flight.do(key, lambda: self._scrape(key)))
+        self._refreshing.add(task)
+        task.add_done_callback(self._refreshing.discard)
+
+    async def get(self, place_title: str, place_address: str) -> dict | None:
+        """
+        장소의 혼잡도 정보 (process_populartimes_data와 같은 형태). 정보가 없으면 None.
+        """
+        if not place_address:
+            return None
+        key = (place_title, place_address)
+        weekly = self.weekly.get(key, _MISSING)
+        if weekly is _NO_DATA:
+            return None
+        if weekly is _MISSING:
+            weekly = await self.flight.do(key, lambda: self._scrape(key))
+            if weekly is None:
+                return None
+        current_pop = self.current.get(key, _MISSING)
+        if current_pop is _MISSING:
+            self.estimated += 1
+            current_pop = estimate_current(weekly)
+            self._refresh(key)
+        return build_populartimes(weekly, current_pop)
+
+    async def close(self):
+        """
+        ASGI lifespan shutdown 훅: 스크래핑 스레드 풀을 정리합니다.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "scrapes": self.scrapes,
+            "errors": self.errors,
+            "estimated": self.estimated,
+            "weekly": self.weekly.stats(),
+            "current": self.current.stats(),
+            "flight": self.flight.stats(),
+        }
+
+
+populartimes_service = PopulartimesService()
@@ -1,3 +1,558 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import tempfile
+from datetime import datetime
+from unittest import mock
 
-# Create your tests here.
+import aiohttp
+import numpy as np
+from django.core.cache import cache
+from django.test import SimpleTestCase, TransactionTestCase
+from rest_framework.authentication import BasicAuthentication
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.throttling import UserRateThrottle
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.authentication import user_cache
+from users.models import User
+
+from .geo_cache import TILE_FETCH_ROWS, GeoTileCache, _TRUNCATED
+from .models import Place, PlaceCatalogArea
+from .place_index import ALL_AREA_CODES, PlaceIndex
+from .populartimes import PopulartimesService, estimate_current, process_populartimes_data
+from .vector_index import PlaceVectorIndex
+from .views import (NEARBY_CATEGORIES, AsyncAPIView, NearbyPlacesView, RestaurantListView, TourDetailBatchView, TourDetailView, _request_tour_api,
+                    detail_cache, encode_stream_event, get_stream_format)
+
+
+def make_place(content_id: int, map_x: float, map_y: float) -> dict:
+    return {'contentid': str(content_id), 'title': f'장소 {content_id}', 'mapx': str(map_x), 'mapy': str(map_y)}
+
+
+def call_view(view_class, url: str = '/', **kwargs):
+    """
+    비동기 뷰를 익명 GET 요청으로 실행합니다.
+    """
+    return asyncio.run(view_class.as_view()(APIRequestFactory().get(url), **kwargs))
+
+
+class FakeUpstream:
+    """
+    locationBasedList2 대신 받은 파라미터를 기록하고 정해진 목록을 돌려주는 코루틴 함수
+    """
+    def __init__(self, items):
+        self.items = items
+        self.calls = []
+
+    async def __call__(self, params):
+        self.calls.append(params)
+        return None if self.items is None else [dict(item) for item in self.items]
+
+
+class GeoTileCacheTests(SimpleTestCase):
+    params = {'mapX': '126.9780', 'mapY': '37.5665', 'radius': '1000', 'contentTypeId': '39'}
+
+    def setUp(self):
+        self.cache = GeoTileCache()
+        self.places = [
+            make_place(1, 126.9785, 37.5665),  # 약 44m
+            make_place(2, 126.9780, 37.5700),  # 약 390m
+            make_place(3, 126.9780, 37.5800),  # 약 1.5km (반경 밖)
+        ]
+
+    def test_filters_and_sorts_tile_superset_by_distance(self):
+        upstream = FakeUpstream(list(reversed(self.places)))
+        items = asyncio.run(self.cache.fetch(self.params, upstream))
+
+        self.assertEqual([item['contentid'] for item in items], ['1', '2'])
+        self.assertLess(float(items[0]['dist']), float(items[1]['dist']))
+        # 타일 상위 집합은 타일 중심 기준 넓은 반경으로 한 번에 가져옵니다.
+        self.assertEqual(len(upstream.calls), 1)
+        self.assertEqual(upstream.calls[0]['numOfRows'], str(TILE_FETCH_ROWS))
+        self.assertEqual(upstream.calls[0]['contentTypeId'], '39')
+        self.assertGreater(float(upstream.calls[0]['radius']), 1000)
+
+    def test_nearby_request_reuses_tile_without_mutating_it(self):
+        upstream = FakeUpstream(self.places)
+        first = asyncio.run(self.cache.fetch(self.params, upstream))
+        first[0]['title'] = '변경'
+        second = asyncio.run(self.cache.fetch({**self.params, 'mapX': '126.9781'}, upstream))
+
+        self.assertEqual(len(upstream.calls), 1)
+        self.assertEqual(second[0]['title'], '장소 1')
+        self.assertNotIn('dist', self.cache.cache.get(self.cache.key_for(self.params))[0])
+
+    def test_paginates_filtered_results(self):
+        upstream = FakeUpstream(self.places)
+        page = asyncio.run(self.cache.fetch({**self.params, 'numOfRows': '1', 'pageNo': '2'}, upstream))
+        self.assertEqual([item['contentid'] for item in page], ['2'])
+
+    def test_failure_is_not_cached(self):
+        upstream = FakeUpstream(None)
+        self.assertIsNone(asyncio.run(self.cache.fetch(self.params, upstream)))
+        upstream.items = self.places
+        self.assertEqual(len(asyncio.run(self.cache.fetch(self.params, upstream))), 2)
+        self.assertEqual(len(upstream.calls), 2)
+
+    def test_truncated_tile_falls_back_to_original_request(self):
+        upstream = FakeUpstream([make_place(i, 126.9780, 37.5665) for i in range(TILE_FETCH_ROWS)])
+        asyncio.run(self.cache.fetch(self.params, upstream))
+
+        self.assertIs(self.cache.cache.get(self.cache.key_for(self.params)), _TRUNCATED)
+        # 잘린 타일이면 원래 파라미터 그대로 업스트림을 호출합니다.
+        self.assertEqual(upstream.calls[-1], self.params)
+        asyncio.run(self.cache.fetch(self.params, upstream))
+        self.assertEqual(upstream.calls[-1], self.params)
+        self.assertEqual(len(upstream.calls), 3)
+
+    def test_large_radius_bypasses_cache(self):
+        upstream = FakeUpstream(self.places)
+        params = {**self.params, 'radius': '20000'}
+        self.assertIsNone(self.cache.key_for(params))
+        asyncio.run(self.cache.fetch(params, upstream))
+        self.assertEqual(upstream.calls, [params])
+
+
+class PlaceIndexTests(TransactionTestCase):
+    # refresh()가 끝날 때 close_old_connections를 호출하므로 테스트 트랜잭션으로 감싸지 않습니다.
+    params = {'mapX': '126.9780', 'mapY': '37.5665', 'radius': '1000', 'contentTypeId': '39'}
+
+    def add_place(self, content_id: int, map_x: float, map_y: float, area_code: str = '1', **raw):
+        Place.objects.create(content_id=content_id, content_type_id='39', title=f'장소 {content_id}',
+                             area_code=area_code, mapx=map_x, mapy=map_y,
+                             raw={**make_place(content_id, map_x, map_y), 'contenttypeid': '39', **raw})
+
+    def add_area(self, area_code: str):
+        PlaceCatalogArea.objects.create(content_type_id='39', area_code=area_code,
+                                        min_mapx=126.9, max_mapx=127.1, min_mapy=37.5, max_mapy=37.6)
+
+    def setUp(self):
+        self.add_place(1, 126.9785, 37.5665, cat3='A05020100')
+        self.add_place(2, 126.9780, 37.5700, cat3='A05020900')
+        self.add_place(3, 126.9780, 37.5800)  # 반경 밖
+        self.index = PlaceIndex()
+
+    def test_single_area_ingest_is_not_covered(self):
+        # 지역 하나의 경계만으로는 이웃 지역(미수집) 장소가 빠졌는지 알 수 없으므로 TourAPI로 넘깁니다.
+        self.add_area('1')
+        self.index.refresh()
+        self.assertTrue(self.index.is_loaded)
+        self.assertFalse(self.index.is_covered('39'))
+        self.assertIsNone(self.index.query(self.params))
+
+    def test_nationwide_or_all_areas_ingest_is_covered(self):
+        self.add_area('')
+        self.index.refresh()
+        self.assertTrue(self.index.is_covered('39'))
+        self.assertFalse(self.index.is_covered('12'))
+
+        PlaceCatalogArea.objects.all().delete()
+        for area_code in ALL_AREA_CODES:
+            self.add_area(area_code)
+        self.index.refresh()
+        self.assertTrue(self.index.is_covered('39'))
+
+    def test_query_filters_by_radius_and_category(self):
+        self.add_area('')
+        self.index.refresh()
+        items = self.index.query(self.params)
+        self.assertEqual([item['contentid'] for item in items], ['1', '2'])
+        self.assertLess(float(items[0]['dist']), float(items[1]['dist']))
+        self.assertNotIn('dist', self.index.get(1))
+
+        items = self.index.query({**self.params, 'cat3': 'A05020900'})
+        self.assertEqual([item['contentid'] for item in items], ['2'])
+        self.assertEqual(self.index.query({**self.params, 'numOfRows': '1', 'pageNo': '2'})[0]['contentid'], '2')
+        # 인덱스로 처리할 수 없는 파라미터가 있으면 TourAPI로 넘깁니다.
+        self.assertIsNone(self.index.query({**self.params, 'modifiedtime': '20240101'}))
+
+    def test_refresh_applies_changes_to_a_new_snapshot(self):
+        self.add_area('')
+        self.index.refresh()
+        before = self.index._state
+
+        Place.objects.filter(content_id=2).delete()
+        self.add_place(2, 127.5, 37.5700)  # 다른 격자로 이동
+        self.add_place(4, 126.9781, 37.5666, showflag='0')  # 비공개 장소는 넣지 않음
+        self.index.refresh()
+
+        self.assertEqual([item['contentid'] for item in self.index.query(self.params)], ['1'])
+        self.assertIsNone(self.index.get(4))
+        # 이전 스냅샷은 바뀌지 않으므로 그것을 읽던 질의는 일관된 결과를 봅니다.
+        old_cell = before.places[2][1]
+        self.assertIn(2, before.cells[old_cell])
+        self.assertNotIn(2, self.index._state.cells[old_cell])
+        self.assertNotIn(4, before.places)
+
+
+class RequestCoalescingTests(SimpleTestCase):
+    async def test_identical_requests_share_one_upstream_call_with_separate_copies(self):
+        calls = []
+
+        async def call_tour_api(params):
+            calls.append(params)
+            await asyncio.sleep(0.01)
+            return [make_place(1, 126.9785, 37.5665)]
+
+        params = {'mapX': '126.978', 'mapY': '37.5665', 'radius': '1000'}
+        with mock.patch('tour_api.views._call_tour_api', call_tour_api):
+            first, second = await asyncio.gather(
+                _request_tour_api(params), _request_tour_api({**params, 'mapX': '126.978000'}))
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(first, second)
+        # 결과를 공유해도 호출자마다 복사본을 받으므로 한쪽의 수정이 다른 쪽에 보이지 않습니다.
+        first[0]['dist'] = '0'
+        self.assertNotIn('dist', second[0])
+
+
+class _TwoPerMinuteThrottle(UserRateThrottle):
+    rate = '2/min'
+
+
+class _MemberView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request):
+        return Response({'user': request.user.pk})
+
+
+class AsyncAPIViewTests(TransactionTestCase):
+    # 인증 중 사용자 조회가 스레드 풀의 별도 연결에서 실행되므로 커밋된 데이터가 필요합니다.
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.user = User.objects.create_user(username='member', email='member@example.com', password='pw-12345')
+        self.factory = APIRequestFactory()
+
+    def call(self, view_class, **headers):
+        response = asyncio.run(view_class.as_view()(self.factory.get('/', **headers)))
+        return response.status_code, response.data
+
+    def bearer(self) -> dict:
+        return {'HTTP_AUTHORIZATION': f"Bearer {AccessToken.for_user(self.user)}"}
+
+    def test_authenticated_request_reaches_handler(self):
+        self.assertEqual(self.call(_MemberView, **self.bearer()), (200, {'user': self.user.pk}))
+
+    def test_missing_or_invalid_token_is_rejected(self):
+        self.assertEqual(self.call(_MemberView)[0], 401)
+        self.assertEqual(self.call(_MemberView, HTTP_AUTHORIZATION='Bearer invalid')[0], 401)
+
+    def test_authenticator_without_async_method_runs_in_thread_pool(self):
+        view_class = type('BasicView', (_MemberView,), {'authentication_classes': [BasicAuthentication]})
+        self.assertEqual(self.call(view_class, HTTP_AUTHORIZATION='Basic ' + 'bWVtYmVyOnB3LTEyMzQ1')[0], 200)
+
+    def test_throttle_classes_are_checked(self):
+        view_class = type('ThrottledView', (_MemberView,), {'throttle_classes': [_TwoPerMinuteThrottle]})
+        statuses = [self.call(view_class, **self.bearer())[0] for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+
+
+class PlaceVectorIndexTests(SimpleTestCase):
+    # (content_id, 관광타입, 소분류, 경도, 위도, 벡터)
+    places = [
+        (1, '12', 'A', 126.9780, 37.5665, [1.0, 0.0, 0.0, 0.0]),
+        (2, '12', 'B', 126.9790, 37.5670, [0.9, 0.1, 0.0, 0.0]),
+        (3, '12', 'A', 126.9800, 37.5700, [0.0, 1.0, 0.0, 0.0]),
+        (4, '12', 'A', 129.0750, 35.1800, [0.8, 0.0, 0.2, 0.0]),  # 부산
+        (5, '39', 'A', 126.9780, 37.5665, [1.0, 0.0, 0.0, 0.05]),
+        (6, '12', 'A', 126.9785, 37.5668, [0.0, 0.0, 1.0, 0.0]),
+    ]
+
+    def setUp(self):
+        self.path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), 'index')
+        self.build(self.places)
+        self.index = PlaceVectorIndex()
+        self.index.load(self.path)
+
+    def build(self, places):
+        content_ids, content_types, cat3, xs, ys, vectors = zip(*places)
+        PlaceVectorIndex.save(self.path, 'test-model', content_ids, content_types, cat3, xs, ys,
+                              np.array(vectors, dtype=np.float32), nlist=3)
+
+    def ids(self, results) -> list[int]:
+        return [content_id for content_id, _, _ in results]
+
+    def test_exact_search_ranks_by_similarity(self):
+        results = self.index.search([1.0, 0.0, 0.0, 0.0], k=3)
+        self.assertEqual(self.ids(results), [1, 5, 2])
+        self.assertAlmostEqual(results[0][1], 1.0, places=3)
+        self.assertIsNone(results[0][2])
+        self.assertEqual(self.index.exact_scans, 1)
+
+    def test_ivf_probe_matches_exact_search_when_all_lists_are_probed(self):
+        exact = self.ids(self.index.search([1.0, 0.0, 0.0, 0.0], k=4))
+        with mock.patch('tour_api.vector_index.EXACT_SCAN_LIMIT', 2):
+            probed = self.ids(self.index.search([1.0, 0.0, 0.0, 0.0], k=4, nprobe=3))
+            nearest_list = self.index.search([0.0, 1.0, 0.0, 0.0], k=4, nprobe=1)
+        self.assertEqual(probed, exact)
+        self.assertEqual(self.index.exact_scans, 1)
+        self.assertEqual(nearest_list[0][0], 3)
+
+    def test_radius_and_category_filters(self):
+        results = self.index.search([1.0, 0.0, 0.0, 0.0], k=10, center=(126.9780, 37.5665), radius=5000,
+                                    content_type_id='12', cat3=['A'])
+        # 3과 6은 유사도가 같으므로 순서는 확인하지 않습니다.
+        self.assertEqual(self.ids(results)[0], 1)
+        self.assertEqual(sorted(self.ids(results)), [1, 3, 6])
+        self.assertLess(results[0][2], 1)
+        self.assertTrue(all(dist <= 5000 for _, _, dist in results))
+
+    def test_similar_excludes_the_place_itself(self):
+        self.assertEqual(self.ids(self.index.similar(1, k=3)), [5, 2, 4])
+        nearby = self.ids(self.index.similar(1, k=10, radius=1000))
+        self.assertEqual((nearby[:2], sorted(nearby)), ([5, 2], [2, 3, 5, 6]))
+        self.assertEqual(self.ids(self.index.similar(1, k=2, content_type_id='12')), [2, 4])
+        self.assertIsNone(self.index.similar(999))
+
+    async def test_ensure_current_reloads_rebuilt_index(self):
+        index = PlaceVectorIndex(self.path, reload_check_interval=0)
+        await index.ensure_current()
+        self.assertEqual(index.stats()['places'], 6)
+
+        self.build(self.places[:2])
+        meta = os.path.join(self.path, 'meta.npz')
+        mtime = os.stat(meta).st_mtime_ns + 1_000_000_000
+        os.utime(meta, ns=(mtime, mtime))  # 같은 시각에 다시 만들어도 변경으로 보이도록
+        await index.ensure_current()
+        self.assertEqual(index.stats()['places'], 2)
+        self.assertEqual(self.ids(index.search([0.0, 1.0, 0.0, 0.0], k=5)), [2, 1])
+
+    async def test_missing_index_is_not_loaded(self):
+        index = PlaceVectorIndex(self.path + '-missing', reload_check_interval=0)
+        await index.ensure_current()
+        self.assertFalse(index.is_loaded)
+        self.assertEqual(index.search([1.0, 0.0, 0.0, 0.0]), [])
+
+
+class TourDetailViewTests(SimpleTestCase):
+    def setUp(self):
+        detail_cache.clear()
+        self.calls = []
+
+    async def upstream_request(self, method, url, handler, params, **kwargs):
+        self.calls.append(params['contentId'])
+        if params['contentId'] == '500':
+            raise aiohttp.ClientConnectionError('연결 실패')
+        if params['contentId'] == '404':
+            return {'response': {'body': {'items': ''}}}
+        return {'response': {'body': {'items': {'item': [{'contentid': params['contentId'], 'title': '장소'}]}}}}
+
+    def call(self, view_class, url: str = '/', **kwargs):
+        with mock.patch('tour_api.views.upstream_request', self.upstream_request):
+            return call_view(view_class, url, **kwargs)
+
+    def test_detail_is_cached(self):
+        first = self.call(TourDetailView, content_id=126508)
+        second = self.call(TourDetailView, content_id=126508)
+        self.assertEqual((first.status_code, second.status_code), (200, 200))
+        self.assertEqual(second.data['contentid'], '126508')
+        self.assertEqual(self.calls, ['126508'])
+
+    def test_missing_or_failed_detail_is_404_and_not_cached(self):
+        for content_id in (404, 500, 404):
+            self.assertEqual(self.call(TourDetailView, content_id=content_id).status_code, 404)
+        self.assertEqual(self.calls, ['404', '500', '404'])
+
+    def test_batch_returns_found_and_not_found_once_per_id(self):
+        self.call(TourDetailView, content_id=1)
+        response = self.call(TourDetailBatchView, '/?contentIds=1, 2,404,2,500')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([d['contentid'] for d in response.data['results']], ['1', '2'])
+        self.assertEqual(response.data['not_found'], ['404', '500'])
+        self.assertEqual(self.calls, ['1', '2', '404', '500'])  # 1은 캐시, 중복 2는 한 번만
+
+    def test_batch_rejects_invalid_ids(self):
+        too_many = ','.join(str(i) for i in range(1, 102))
+        for query in ('', '?contentIds=', '?contentIds=1,abc', f'?contentIds={too_many}'):
+            self.assertEqual(self.call(TourDetailBatchView, '/' + query).status_code, 400, query)
+        self.assertEqual(self.calls, [])
+
+
+class StreamingResponseTests(SimpleTestCase):
+    places = [make_place(1, 126.9785, 37.5665), make_place(2, 126.9780, 37.5700)]
+    events = [{'event': 'places', 'data': places},
+              {'event': 'annotation', 'data': {'contentid': '1', 'recommend_reason': '조용한 정원'}},
+              {'event': 'done', 'data': places}]
+
+    def test_encode_ndjson_and_sse(self):
+        event = self.events[1]
+        self.assertEqual(encode_stream_event(event, 'ndjson'),
+                         '{"event": "annotation", "data": {"contentid": "1", "recommend_reason": "조용한 정원"}}\n')
+        self.assertEqual(encode_stream_event(event, 'sse'),
+                         'event: annotation\ndata: ' + encode_stream_event(event, 'ndjson').rstrip('\n') + '\n\n')
+
+    def test_stream_format_from_query_or_accept_header(self):
+        factory = APIRequestFactory()
+        self.assertEqual(get_stream_format(Request(factory.get('/?stream=ndjson'))), 'ndjson')
+        self.assertEqual(get_stream_format(Request(factory.get('/', HTTP_ACCEPT='text/event-stream'))), 'sse')
+        self.assertIsNone(get_stream_format(Request(factory.get('/?stream=xml'))))
+        self.assertIsNone(get_stream_format(Request(factory.get('/'))))
+
+    async def get_list(self, query: str, **headers):
+        async def fetch_nearby_restaurants(map_x, map_y, radius):
+            return self.places
+
+        async def iter_ai_recommendations(places, adjectives, place_type, deadline):
+            self.assertEqual((adjectives, place_type), (['고즈넉한', '모던한'], '음식점'))
+            for event in self.events:
+                yield event
+
+        async def get_ai_recommendations(places, adjectives, place_type, deadline):
+            return list(reversed(places))
+
+        request = APIRequestFactory().get('/?mapX=126.978&mapY=37.5665&adjectives=고즈넉한, 모던한' + query, **headers)
+        with mock.patch('tour_api.views.fetch_nearby_restaurants', fetch_nearby_restaurants), \
+                mock.patch('tour_api.views.iter_ai_recommendations', iter_ai_recommendations), \
+                mock.patch('tour_api.views.get_ai_recommendations', get_ai_recommendations):
+            response = await RestaurantListView.as_view()(request)
+            if not response.streaming:
+                return response, None
+            return response, b''.join([chunk async for chunk in response.streaming_content]).decode()
+
+    async def test_ndjson_stream_sends_one_line_per_event(self):
+        response, body = await self.get_list('&stream=ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        self.assertEqual([json.loads(line) for line in body.splitlines()], self.events)
+
+    async def test_sse_stream_from_accept_header(self):
+        response, body = await self.get_list('', HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(body, ''.join(encode_stream_event(event, 'sse') for event in self.events))
+
+    def test_event_stream_accept_header_is_not_rejected_by_negotiation(self):
+        request = APIRequestFactory().get('/?adjectives=고즈넉한', HTTP_ACCEPT='text/event-stream')
+        response = asyncio.run(RestaurantListView.as_view()(request))
+        self.assertEqual(response.status_code, 400)  # 406이 아니라 파라미터 검증 오류
+        self.assertIn('mapX', json.loads(response.rendered_content)['error'])
+
+    async def test_without_stream_returns_final_result(self):
+        response, body = await self.get_list('')
+        self.assertIsNone(body)
+        self.assertEqual([p['contentid'] for p in response.data], ['2', '1'])
+
+
+class NearbyPlacesViewTests(SimpleTestCase):
+    def setUp(self):
+        self.fetched = []
+
+        def fake_fetch(category):
+            async def fetch(map_x, map_y, radius):
+                self.fetched.append((category, radius))
+                return [make_place(len(self.fetched), 126.978, 37.5665)]
+            return fetch
+
+        categories = {c: {**entry, 'fetch': fake_fetch(c)} for c, entry in NEARBY_CATEGORIES.items()}
+        self.enterContext(mock.patch.dict('tour_api.views.NEARBY_CATEGORIES', categories))
+
+    def get(self, query: str):
+        return call_view(NearbyPlacesView, '/?mapX=126.978&mapY=37.5665' + query)
+
+    def test_unknown_or_empty_categories_are_rejected(self):
+        for query in ('&categories=cafes,bars', '&categories=,', '&categories=Cafes'):
+            response = self.get(query)
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('restaurants', response.data['error'])
+        self.assertEqual(self.fetched, [])
+
+    def test_missing_coordinates_or_invalid_budget_are_rejected(self):
+        self.assertEqual(call_view(NearbyPlacesView, '/?categories=cafes&mapX=126.978').status_code, 400)
+        self.assertEqual(self.get('&categories=cafes&budget_ms=soon').status_code, 400)
+        self.assertEqual(self.fetched, [])
+
+    def test_selected_categories_are_fetched_once_each(self):
+        response = self.get('&categories=cafes, attractions,cafes&radius=2000')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.data), ['cafes', 'attractions'])
+        self.assertEqual(sorted(self.fetched), [('attractions', '2000'), ('cafes', '2000')])
+
+    def test_default_is_all_categories(self):
+        self.assertEqual(list(self.get('').data), list(NEARBY_CATEGORIES))
+
+    def test_adjectives_run_one_grouped_pipeline(self):
+        groups_seen = []
+
+        async def iter_grouped_ai_recommendations(groups, adjectives, deadline):
+            groups_seen.append((groups, adjectives))
+            for category, (places, _) in groups.items():
+                yield {'event': 'places', 'category': category, 'data': places}
+                yield {'event': 'done', 'category': category, 'data': [{**p, 'ranked': True} for p in places]}
+
+        with mock.patch('tour_api.views.iter_grouped_ai_recommendations', iter_grouped_ai_recommendations):
+            response = self.get('&categories=restaurants,cafes&adjectives=고즈넉한,모던한')
+
+        self.assertEqual(len(groups_seen), 1)
+        groups, adjectives = groups_seen[0]
+        self.assertEqual(adjectives, ['고즈넉한', '모던한'])
+        self.assertEqual({c: place_type for c, (_, place_type) in groups.items()},
+                         {'restaurants': '음식점', 'cafes': '카페'})
+        self.assertEqual(list(response.data), ['restaurants', 'cafes'])
+        self.assertTrue(all(p['ranked'] for places in response.data.values() for p in places))
+
+
+class PopulartimesServiceTests(SimpleTestCase):
+    # 월요일 18시가 가장 붐비는 히스토그램
+    data = {'rating': 4.5, 'rating_n': 120, 'current_popularity': 80,
+            'populartimes': [{'name': day, 'data': [90 if (i, h) == (0, 18) else 30 for h in range(24)]}
+                             for i, day in enumerate(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday',
+                                                      'Saturday', 'Sunday'])]}
+
+    def setUp(self):
+        self.service = PopulartimesService(workers=2)
+        self.results = {'카페, 서울 중구': self.data, '빈 가게, 서울 중구': {'populartimes': []}}
+        self.scraped = []
+        self.enterContext(mock.patch('tour_api.populartimes.livepopulartimes.get_populartimes_by_address',
+                                     self.scrape))
+
+    def tearDown(self):
+        asyncio.run(self.service.close())
+
+    def scrape(self, query: str):
+        self.scraped.append(query)
+        if query not in self.results:
+            raise RuntimeError('스크래핑 실패')
+        return self.results[query]
+
+    def get(self, *titles: str) -> list:
+        async def run():
+            results = await asyncio.gather(*(self.service.get(title, '서울 중구') for title in titles))
+            await asyncio.gather(*self.service._refreshing)
+            return results
+        return asyncio.run(run())
+
+    def test_result_is_processed_like_direct_lookup_and_cached(self):
+        first, second = self.get('카페', '카페')
+        self.assertEqual(first, process_populartimes_data(self.data))
+        self.assertEqual(first, second)
+        self.assertEqual(first['current_status'], 'busy')
+        self.assertEqual(first['busiest_time'], {'day': 'Monday', 'hour': '18:00'})
+        self.get('카페')
+        self.assertEqual(self.scraped, ['카페, 서울 중구'])
+
+    def test_places_without_data_are_cached_but_errors_are_not(self):
+        self.assertEqual(self.get('빈 가게', '빈 가게', '오류', '오류'), [None] * 4)
+        self.assertEqual(self.get('빈 가게', '오류'), [None, None])
+        self.assertEqual(sorted(self.scraped), ['빈 가게, 서울 중구', '오류, 서울 중구', '오류, 서울 중구'])
+        self.assertEqual(self.service.errors, 2)
+
+    def test_expired_current_value_is_estimated_and_refreshed(self):
+        self.get('카페')
+        self.service.current.clear()
+        with mock.patch('tour_api.populartimes.estimate_current', return_value=10):
+            (result,) = self.get('카페')
+        self.assertEqual(result['current_status'], 'not_busy')
+        self.assertEqual(self.service.estimated, 1)
+        self.assertEqual(len(self.scraped), 2)  # 백그라운드 재조회
+        self.assertEqual(self.get('카페')[0]['current_status'], 'busy')
+
+    def test_estimate_current_reads_histogram(self):
+        weekly = {'hours': [day['data'] for day in self.data['populartimes']]}
+        self.assertEqual(estimate_current(weekly, datetime(2025, 6, 2, 18)), 90)  # 월요일 18시
+        self.assertEqual(estimate_current(weekly, datetime(2025, 6, 3, 18)), 30)
+        self.assertIsNone(estimate_current({'hours': None}))
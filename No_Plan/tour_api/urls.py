@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import RestaurantListView, CafeListView, TouristAttractionListView, AccommodationListView, TourDetailView, TripSummaryView
+from .views import NearbyPlacesView, RestaurantListView, CafeListView, TouristAttractionListView, AccommodationListView, TourDetailView, TourDetailBatchView, TripSummaryView, UpstreamHealthView, VectorSearchView, SimilarPlacesView
 
 urlpatterns = [
     # 식당 조회 API
@@ -14,9 +14,24 @@ urlpatterns = [
     # 숙소 조회 API
     path('accommodations/', AccommodationListView.as_view(), name='accommodation-list'),
 
+    # 여러 카테고리 통합 조회 API
+    path('nearby/', NearbyPlacesView.as_view(), name='nearby-list'),
+
+    # 장소 카탈로그 전체 벡터 검색 API
+    path('search/', VectorSearchView.as_view(), name='vector-search'),
+
+    # 비슷한 장소 조회 API
+    path('similar/<int:content_id>/', SimilarPlacesView.as_view(), name='similar-places'),
+
     # contentId 기반 장소 조회 API
     path('detail/<int:content_id>/', TourDetailView.as_view(), name='tour-detail'),
 
+    # 여러 contentId 상세 정보 일괄 조회 API
+    path('detail/batch/', TourDetailBatchView.as_view(), name='tour-detail-batch'),
+
     # 여행 요약 생성 API
     path('trips/<int:trip_id>/summarize/', TripSummaryView.as_view(), name='trip-summary'),
+
+    # 업스트림 상태 조회 API (관리자 전용)
+    path('health/upstreams/', UpstreamHealthView.as_view(), name='upstream-health'),
 ]
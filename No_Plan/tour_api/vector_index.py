@@ -0,0 +1,260 @@
+# tour_api/vector_index.py
+
+import asyncio
+import glob
+import math
+import os
+import time
+
+import numpy as np
+
+from ai.ranking import normalize_rows, top_k_indices
+
+
+# ===================================================================
+# 장소 임베딩 벡터 검색 (IVF 근사 최근접 이웃 + 반경 필터)
+# ===================================================================
+# 장소 카탈로그의 블로그 텍스트 임베딩(크롤링 캐시 + 임베딩 캐시)을 build_vector_index 명령으로 모아
+# 정규화된 float16 행렬 파일로 저장하고, 서버는 이 파일을 메모리 맵으로 열어 사용합니다.
+# 벡터는 k-means 군집(IVF 리스트) 순서로 정렬해 저장하므로 리스트 하나가 파일의 연속 구간입니다.
+# 질의는
+#  1) 좌표/관광타입/소분류 필터를 메타데이터 배열에 벡터 연산으로 적용하고
+#  2) 남은 후보가 EXACT_SCAN_LIMIT개 이하이면 후보 전체를, 많으면 질의와 가까운 nprobe개 리스트의 후보만
+#     내적으로 점수를 매겨 상위 k개를 고릅니다.
+# 서버는 시작 시(lifespan) 또는 첫 질의 때 파일을 열고, RELOAD_CHECK_INTERVAL마다 meta.npz 수정 시각을 확인해
+# build_vector_index로 다시 만들어졌으면 재시작 없이 새 인덱스로 바꿉니다.
+EXACT_SCAN_LIMIT = 5000
+DEFAULT_NPROBE = 8
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 20000
+RELOAD_CHECK_INTERVAL = 60  # meta.npz 변경 확인 주기 (초)
+_EARTH_RADIUS_M = 6371008.8
+
+
+def default_nlist(n: int) -> int:
+    return max(1, min(4096, int(round(2 * math.sqrt(n)))))
+
+
+def train_ivf(vectors: np.ndarray, nlist: int, iterations: int = KMEANS_ITERATIONS, seed: int = 0) -> np.ndarray:
+    """
+    정규화된 벡터로 구면 k-means를 학습해 (nlist, 차원) 중심 행렬을 반환합니다.
+    """
+    rng = np.random.default_rng(seed)
+    sample = vectors if len(vectors) <= KMEANS_SAMPLE else vectors[rng.choice(len(vectors), KMEANS_SAMPLE, replace=False)]
+    sample = np.asarray(sample, dtype=np.float32)
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        for c in range(nlist):
+            members = sample[assign == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+            else:
+                # 빈 군집은 임의의 점으로 다시 시작합니다.
+                centroids[c] = sample[rng.integers(len(sample))]
+        centroids = normalize_rows(centroids)
+    return centroids
+
+
+def assign_lists(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 8192) -> np.ndarray:
+    return np.concatenate([np.argmax(np.asarray(vectors[i:i + chunk], dtype=np.float32) @ centroids.T, axis=1)
+                           for i in range(0, len(vectors), chunk)]) if len(vectors) else np.empty(0, dtype=np.intp)
+
+
+class PlaceVectorIndex:
+    def __init__(self, path: str = None, reload_check_interval: float = RELOAD_CHECK_INTERVAL):
+        self.path = path
+        self.reload_check_interval = reload_check_interval
+        self._meta_mtime = None  # 읽어 둔 meta.npz의 수정 시각
+        self._checked_at = None
+        self.model = None
+        self.vectors = None      # (N, 차원) float16 메모리 맵, 정규화됨
+        self.content_ids = None  # (N,) int64
+        self.content_types = None
+        self.cat3 = None
+        self.xs = None           # 경도/위도 (라디안)
+        self.ys = None
+        self.centroids = None    # (nlist, 차원) float32
+        self.list_of = None      # (N,) 행이 속한 IVF 리스트
+        self._row_of = {}        # content_id -> 행 번호
+        self.built_at = None
+        self.queries = 0
+        self.exact_scans = 0
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.vectors is not None
+
+    # ---------------------------------------------------------------
+    # 파일 저장 / 읽기
+    # ---------------------------------------------------------------
+    @staticmethod
+    def save(path: str, model: str, content_ids, content_types, cat3, xs, ys, vectors: np.ndarray, nlist: int = None):
+        """
+        (build_vector_index 명령용) IVF를 학습하고 리스트 순서로 정렬해 저장합니다.
+        벡터 파일을 먼저 새 이름으로 쓰고 메타데이터 파일을 교체하므로, 읽는 쪽은 항상 완성된 쌍을 봅니다.
+        """
+        os.makedirs(path, exist_ok=True)
+        vectors = normalize_rows(vectors)
+        nlist = min(nlist or default_nlist(len(vectors)), len(vectors))
+        centroids = train_ivf(vectors, nlist)
+        lists = assign_lists(vectors, centroids)
+        order = np.argsort(lists, kind='stable')
+
+        vectors_name = f"vectors-{int(time.time())}.npy"
+        np.save(os.path.join(path, vectors_name), vectors[order].astype(np.float16))
+        meta_tmp = os.path.join(path, 'meta.tmp.npz')
+        np.savez(meta_tmp, model=np.array(model), vectors_file=np.array(vectors_name),
+                 content_ids=np.asarray(content_ids, dtype=np.int64)[order],
+                 content_types=np.asarray(content_types)[order], cat3=np.asarray(cat3)[order],
+                 xs=np.asarray(xs, dtype=np.float64)[order], ys=np.asarray(ys, dtype=np.float64)[order],
+                 centroids=centroids, lists=lists[order], built_at=np.array(time.time()))
+        os.replace(meta_tmp, os.path.join(path, 'meta.npz'))
+        for old in glob.glob(os.path.join(path, 'vectors-*.npy')):
+            if os.path.basename(old) != vectors_name:
+                os.remove(old)  # 이미 열어 둔 프로세스는 메모리 맵이 닫힐 때까지 계속 읽을 수 있습니다. (POSIX)
+        return nlist
+
+    @staticmethod
+    def _mtime_of(path: str) -> int | None:
+        try:
+            return os.stat(os.path.join(path, 'meta.npz')).st_mtime_ns
+        except (OSError, TypeError):
+            return None
+
+    @staticmethod
+    def _read(path: str) -> dict:
+        with np.load(os.path.join(path, 'meta.npz'), allow_pickle=False) as meta:
+            content_ids = meta['content_ids']
+            return {
+                'vectors': np.load(os.path.join(path, str(meta['vectors_file'])), mmap_mode='r'),
+                'model': str(meta['model']),
+                'content_ids': content_ids,
+                'content_types': meta['content_types'],
+                'cat3': meta['cat3'],
+                'xs': np.radians(meta['xs']),
+                'ys': np.radians(meta['ys']),
+                'centroids': meta['centroids'],
+                'list_of': meta['lists'],
+                'built_at': float(meta['built_at']),
+                '_row_of': {cid: row for row, cid in enumerate(content_ids.tolist())},
+            }
+
+    def _apply(self, fields: dict, mtime: int):
+        # 이벤트 루프 스레드에서 await 없이 한 번에 바꾸므로 질의가 섞인 상태를 보지 않습니다.
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self._meta_mtime = mtime
+        print(f"[벡터 인덱스] {len(self.content_ids)}개 장소, {len(self.centroids)}개 리스트 로드 ({self.model})")
+
+    def load(self, path: str) -> bool:
+        """
+        (동기 함수) path의 인덱스를 바로 읽습니다. 서버에서는 ensure_current를 사용합니다.
+        """
+        self.path = path
+        mtime = self._mtime_of(path)
+        if mtime is None:
+            print(f"[벡터 인덱스] 파일이 없어 벡터 검색을 사용하지 않습니다: {path}")
+            return False
+        self._apply(self._read(path), mtime)
+        return True
+
+    async def ensure_current(self):
+        """
+        처음 호출되거나 확인 주기가 지났으면 meta.npz를 확인해, 새로 만들어졌으면 스레드에서 읽어 바꿉니다.
+        (lifespan 시작 훅과 벡터 검색 API에서 호출)
+        """
+        first = self._checked_at is None
+        if not first and time.monotonic() - self._checked_at < self.reload_check_interval:
+            return
+        self._checked_at = time.monotonic()
+        mtime = self._mtime_of(self.path)
+        if mtime is None:
+            if first:
+                print(f"[벡터 인덱스] 파일이 없어 벡터 검색을 사용하지 않습니다: {self.path}")
+            return
+        if mtime == self._meta_mtime:
+            return
+        try:
+            fields = await asyncio.to_thread(self._read, self.path)
+        except Exception as e:
+            print(f"[벡터 인덱스] 로드 실패: {e}")
+            return
+        self._apply(fields, mtime)
+
+    # ---------------------------------------------------------------
+    # 질의
+    # ---------------------------------------------------------------
+    def _filter(self, center: tuple[float, float] = None, radius: float = None,
+                content_type_id: str = None, cat3: list[str] = None) -> tuple[np.ndarray, np.ndarray | None]:
+        mask = np.ones(len(self.content_ids), dtype=bool)
+        if content_type_id is not None:
+            mask &= self.content_types == content_type_id
+        if cat3:
+            mask &= np.isin(self.cat3, cat3)
+        dists = None
+        if center is not None and radius is not None:
+            lon0, lat0 = math.radians(center[0]), math.radians(center[1])
+            a = (np.sin((self.ys - lat0) / 2) ** 2
+                 + math.cos(lat0) * np.cos(self.ys) * np.sin((self.xs - lon0) / 2) ** 2)
+            dists = 2 * _EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+            mask &= dists <= radius
+        return mask, dists
+
+    def search(self, query, k: int = 30, center: tuple[float, float] = None, radius: float = None,
+               content_type_id: str = None, cat3: list[str] = None, nprobe: int = DEFAULT_NPROBE,
+               exclude: int = None) -> list[tuple[int, float, float | None]]:
+        """
+        질의 벡터와 가장 가까운 장소 k개를 [(content_id, 유사도, 거리(m) 또는 None)] 으로 반환합니다.
+        """
+        if not self.is_loaded:
+            return []
+        self.queries += 1
+        query = normalize_rows(query)[0]
+        mask, dists = self._filter(center, radius, content_type_id, cat3)
+        if exclude is not None and exclude in self._row_of:
+            mask[self._row_of[exclude]] = False
+        if mask.sum() > EXACT_SCAN_LIMIT:
+            probe = top_k_indices(self.centroids @ query, nprobe)
+            mask &= np.isin(self.list_of, probe)
+        else:
+            self.exact_scans += 1
+        rows = np.flatnonzero(mask)
+        if not rows.size:
+            return []
+        # 리스트 순서로 저장되어 있으므로 rows(오름차순)는 파일을 앞에서부터 읽습니다.
+        scores = np.asarray(self.vectors[rows], dtype=np.float32) @ query
+        best = top_k_indices(scores, k)
+        return [(int(self.content_ids[row]), float(score), None if dists is None else float(dists[row]))
+                for row, score in zip(rows[best].tolist(), scores[best].tolist())]
+
+    def vector_of(self, content_id: int) -> np.ndarray | None:
+        row = self._row_of.get(content_id)
+        return None if row is None else np.asarray(self.vectors[row], dtype=np.float32)
+
+    def location_of(self, content_id: int) -> tuple[float, float] | None:
+        row = self._row_of.get(content_id)
+        return None if row is None else (math.degrees(self.xs[row]), math.degrees(self.ys[row]))
+
+    def similar(self, content_id: int, k: int = 30, radius: float = None, **filters) -> list | None:
+        """
+        content_id 장소와 블로그 내용이 비슷한 장소 (radius가 있으면 그 장소 기준 반경 안에서). 인덱스에 없으면 None.
+        """
+        vector = self.vector_of(content_id)
+        if vector is None:
+            return None
+        center = self.location_of(content_id) if radius is not None else None
+        return self.search(vector, k, center=center, radius=radius, exclude=content_id, **filters)
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model,
+            "places": 0 if self.content_ids is None else len(self.content_ids),
+            "lists": 0 if self.centroids is None else len(self.centroids),
+            "built_at": self.built_at,
+            "queries": self.queries,
+            "exact_scans": self.exact_scans,
+        }
+
+
+place_vector_index = PlaceVectorIndex()
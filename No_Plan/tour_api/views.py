@@ -2,34 +2,103 @@
 
 import aiohttp
 import asyncio
+import numpy as np
 import requests
 from django.conf import settings
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
-from rest_framework.permissions import AllowAny, IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework import exceptions, renderers, status
+from rest_framework.settings import api_settings
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated, IsAuthenticatedOrReadOnly
 import ssl
 import json
-import pandas as pd
-import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 from urllib3 import poolmanager
 import time
 from asgiref.sync import sync_to_async
 from django.shortcuts import get_object_or_404
+from django.http import StreamingHttpResponse
 from django.core.exceptions import ObjectDoesNotExist
 
-import livepopulartimes
-
-from ai.services import BlogCrawler, RecommendationEngine
+from ai.services import BlogCrawler, RecommendationEngine, gather_with_concurrency, merge_async_iterators
+from ai.ranking import score_places, top_places
+from ai.lexical import lexical_query, lexical_scores, prefilter, score_places_lexical
+from ai.extraction import extraction_pool
+from ai.profiles import place_profile_store
+from ai.upstream import upstream_request, upstream_health
+from ai.limiter import openai_limiter_stats
+from ai.deadline import Deadline, CRAWL_SHARE, EMBEDDING_SHARE, ANNOTATION_SHARE
+from ai.cache import TTLCache, SingleFlight
+from ai.db import db_sync_to_async
+from .geo_cache import tour_tile_cache
+from .place_index import place_index
+from .populartimes import populartimes_service
+from .vector_index import place_vector_index
+from .models import Place
 from users.models import Trip, VisitedContent
-from users.models import LocationUsageLog
+from users.usage_log import log_location_usage
 
 
 # ===================================================================
 # AsyncAPIView의 dispatch 메소드
 # ===================================================================
 class AsyncAPIView(APIView):
+    """
+    인증/권한 확인까지 이벤트 루프에서 처리하는 APIView
+    APIView.initial은 인증(사용자 DB 조회)을 포함하므로 thread_sensitive 스레드로 넘기면
+    모든 비동기 요청이 그 스레드 하나에 줄을 서게 됩니다. 여기서는 같은 순서를 비동기로 실행합니다.
+      - 인증: authenticate_async가 있는 인증 클래스(users.authentication.AsyncJWTAuthentication)는 바로 await,
+              없는 클래스만 스레드 풀(thread_sensitive=False)에서 실행
+      - 권한: has_permission_async가 있으면 await, 없으면 그대로 호출 (DRF 기본 권한은 request.user 속성만 확인)
+      - 스로틀: 설정된 경우에만 스레드 풀에서 실행
+    """
+    async def initial_async(self, request, *args, **kwargs):
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        await self.perform_authentication_async(request)
+        await self.check_permissions_async(request)
+        if self.get_throttles():
+            await db_sync_to_async(self.check_throttles)(request)
+
+    async def perform_authentication_async(self, request):
+        """
+        rest_framework.request.Request._authenticate의 비동기 버전
+        """
+        for authenticator in request.authenticators:
+            try:
+                if hasattr(authenticator, 'authenticate_async'):
+                    user_auth_tuple = await authenticator.authenticate_async(request)
+                else:
+                    user_auth_tuple = await sync_to_async(authenticator.authenticate, thread_sensitive=False)(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+
+        request._not_authenticated()
+
+    async def check_permissions_async(self, request):
+        for permission in self.get_permissions():
+            if hasattr(permission, 'has_permission_async'):
+                allowed = await permission.has_permission_async(request, self)
+            else:
+                allowed = permission.has_permission(request, self)
+            if not allowed:
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, 'message', None),
+                    code=getattr(permission, 'code', None)
+                )
+
     async def dispatch(self, request, *args, **kwargs):
         self.args = args
         self.kwargs = kwargs
@@ -37,7 +106,7 @@ class AsyncAPIView(APIView):
         self.request = request
         self.headers = self.default_response_headers
         try:
-            await sync_to_async(self.initial, thread_sensitive=True)(request, *args, **kwargs)
+            await self.initial_async(request, *args, **kwargs)
 
             if request.method.lower() in self.http_method_names:
                 handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
@@ -51,205 +120,440 @@ class AsyncAPIView(APIView):
         return self.response
 
 
-# ===================================================================
-# populartimes 데이터 가공 헬퍼 함수
-# ===================================================================
-def process_populartimes_data(pop_data):
-    if not pop_data:
-        return None
-    try:
-        processed = {
-            "rating": pop_data.get("rating"),
-            "rating_n": pop_data.get("rating_n")
-        }
-        current_pop = pop_data.get("current_popularity")
-        status_text = "unknown"
-        if current_pop is None:
-            status_text = "not_busy"
-        elif current_pop >= 70:
-            status_text = "busy"
-        elif current_pop >= 40:
-            status_text = "normal"
-        else:
-            status_text = "not_busy"
-        processed["current_status"] = status_text
-        if "populartimes" in pop_data and pop_data["populartimes"]:
-            busiest_day = ""
-            busiest_hour = -1
-            max_popularity = -1
-            for day_data in pop_data["populartimes"]:
-                for hour, popularity in enumerate(day_data["data"]):
-                    if popularity > max_popularity:
-                        max_popularity = popularity
-                        busiest_day = day_data["name"]
-                        busiest_hour = hour
-            if busiest_day:
-                processed["busiest_time"] = {
-                    "day": busiest_day,
-                    "hour": f"{busiest_hour}:00"
-                }
-        return processed
-    except (TypeError, IndexError, KeyError) as e:
-        print(f"populartimes 데이터 처리 중 오류: {e}")
-        return None
+async def get_populartimes_async(place_title: str, place_address: str):
+    """
+    가공된 혼잡도 정보 (전용 스레드 풀 + 캐시, tour_api/populartimes.py 참고)
+    """
+    return await populartimes_service.get(place_title, place_address)
 
 
-async def get_populartimes_async(place_title: str, place_address: str):
-    if not place_address:
-        return None
+# ##################################################################
+# ### ▼▼▼ 이 함수에 방어 로직이 추가되었습니다 ▼▼▼ ###
+# ##################################################################
+async def get_ai_recommendations(places: list, adjectives: list, place_type: str, deadline: Deadline = None) -> list:
+    """
+    같은 장소 목록/형용사/장소유형(/시간 예산)으로 동시에 들어온 요청은 파이프라인을 한 번만 실행하고 결과를 공유합니다.
+    """
+    if not places or not adjectives:
+        return places
+    deadline = deadline or Deadline(None)
+    key = (tuple(p['contentid'] for p in places), tuple(sorted(adjectives)), place_type, deadline.budget)
+    results = await ai_recommendation_flight.do(
+        key, lambda: _run_ai_recommendations(places, adjectives, place_type, deadline))
+    return [dict(place) for place in results]
+
+
+async def _run_ai_recommendations(places: list, adjectives: list, place_type: str, deadline: Deadline = None) -> list:
+    final_places = places
+    async for event in iter_ai_recommendations(places, adjectives, place_type, deadline):
+        if event['event'] == 'done':
+            final_places = event['data']
+    return final_places
+
+
+async def iter_ai_recommendations(places: list, adjectives: list, place_type: str, deadline: Deadline = None):
+    """
+    AI 추천 파이프라인을 단계별 이벤트로 내보내는 비동기 제너레이터
+      - places     : 거리순 TourAPI 목록 (즉시)
+      - ranking    : 임베딩 유사도 순위 + 혼잡도 (임베딩 완료 후)
+      - annotation : 장소별 추천 이유/해시태그 (LLM 응답이 올 때마다)
+      - done       : 최종 결과 (get_ai_recommendations의 반환값과 동일)
+    """
+    async for event in iter_grouped_ai_recommendations({place_type: (places, place_type)}, adjectives, deadline):
+        yield {'event': event['event'], 'data': event['data']}
+
+
+async def _query_embedding_or_none(recomm_engine: RecommendationEngine, adjectives: list):
+    """
+    쿼리 임베딩을 만들지 못하면 None (BM25 순위로 대체)
+    """
     try:
-        formatted_query = f"{place_title}, {place_address}"
-        data = await asyncio.to_thread(
-            livepopulartimes.get_populartimes_by_address,
-            formatted_query
-        )
-        if data and data.get('popular_times'):
-            return data
-        return None
+        return await recomm_engine.get_adjectives_embedding(adjectives)
     except Exception as e:
-        print(f"'{place_title}' 혼잡도 조회 중 오류 발생: {e}")
+        print(f"  [경고] 쿼리 임베딩 실패: {e!r}")
         return None
 
 
-# ##################################################################
-# ### ▼▼▼ 이 함수에 방어 로직이 추가되었습니다 ▼▼▼ ###
-# ##################################################################
-async def get_ai_recommendations(places: list, adjectives: list, place_type: str) -> list:
+async def iter_grouped_ai_recommendations(groups: dict, adjectives: list, deadline: Deadline = None):
+    """
+    여러 카테고리의 AI 추천을 한 번의 파이프라인으로 처리합니다.
+    groups: {카테고리: (거리순 장소 목록, 장소유형)}
+    크롤링/쿼리 임베딩/텍스트 임베딩은 모든 카테고리의 장소를 합쳐(contentid 중복 제거) 한 번만 수행하고,
+    순위와 추천 이유는 카테고리별로 만듭니다. 모든 이벤트에는 'category'가 붙습니다.
+    deadline(?budget_ms=)이 있으면 각 단계는 예산 중 자기 몫까지만 기다리고 그때까지의 결과로 진행합니다. (ai/deadline.py)
+    장소마다 'stages'에 단계별 완료 여부를 기록합니다.
+      - crawl        : done / pending (시간 초과, 순위 없이 목록 끝에 남음)
+      - populartimes : done / pending
+      - ranking      : embedding / lexical (BM25 대체) / skipped
+      - annotation   : done / pending (시간 초과) / skipped (추천 이유 대상 아님)
+    """
+    deadline = deadline or Deadline(None)
+    for category, (places, _) in groups.items():
+        yield {'event': 'places', 'category': category, 'data': places}
     print("\n==============[AI 추천 파이프라인 시작]===============")
     total_start_time = time.time()
-    if not places or not adjectives:
-        return places
-    place_infos_with_id = [(p['contentid'], p['title'], p.get('addr1', '')) for p in places]
+    all_places = list({p['contentid']: p for places, _ in groups.values() for p in places}.values())
+    if not all_places or not adjectives:
+        for category, (places, _) in groups.items():
+            yield {'event': 'done', 'category': category, 'data': places}
+        return
+    place_infos_with_id = [(p['contentid'], p['title'], p.get('addr1', '')) for p in all_places]
+    if deadline.is_limited:
+        print(f"  [시간 예산] {deadline.budget * 1000:.0f} ms")
 
     async with RecommendationEngine() as recomm_engine:
         crawler = BlogCrawler()
-        query = recomm_engine.adjectives_to_query(adjectives)
-        crawl_task = crawler.crawl_all(place_infos_with_id)
-        query_emb_task = recomm_engine.get_query_embedding(query)
-        populartimes_tasks = [get_populartimes_async(p['title'], p.get('addr1', '')) for p in places]
+        crawl_task = asyncio.ensure_future(crawler.crawl_all_until(place_infos_with_id, deadline.at(CRAWL_SHARE)))
+        query_emb_task = asyncio.ensure_future(_query_embedding_or_none(recomm_engine, adjectives))
+        populartimes_tasks = [asyncio.ensure_future(get_populartimes_async(p['title'], p.get('addr1', '')))
+                              for p in all_places]
 
         t1 = time.time()
-        all_results = await asyncio.gather(
-            crawl_task,
-            query_emb_task,
-            *populartimes_tasks
-        )
-        crawling_df = all_results[0]
-        query_emb = all_results[1]
-        populartimes_results = all_results[2:]
+        try:
+            # 크롤링은 예산의 CRAWL_SHARE 시점에 끝난 장소까지만 반환하고, 혼잡도 조회도 같은 시점까지만 기다립니다.
+            crawled, pending_crawl_ids = await crawl_task
+            await asyncio.wait(populartimes_tasks, timeout=deadline.remaining(CRAWL_SHARE))
+            await asyncio.wait([query_emb_task], timeout=deadline.remaining(EMBEDDING_SHARE))
+        finally:
+            # 기다리지 않은 혼잡도 조회는 취소해도 서비스 안에서 계속 진행되어 캐시에 저장됩니다. (SingleFlight가 shield)
+            for task in [crawl_task, query_emb_task, *populartimes_tasks]:
+                if not task.done():
+                    task.cancel()
+        query_emb = query_emb_task.result() if query_emb_task.done() else None
+        # 장소 목록을 거르기 전에 contentid 기준으로 (가공된) 혼잡도 결과를 묶어 둡니다.
+        contentid_to_populartimes = {
+            place['contentid']: task.result()
+            for place, task in zip(all_places, populartimes_tasks) if task.done()
+        }
+        for place in all_places:
+            place['stages'] = {
+                'crawl': 'pending' if place['contentid'] in pending_crawl_ids else 'done',
+                'populartimes': 'done' if place['contentid'] in contentid_to_populartimes else 'pending',
+                'ranking': 'skipped',
+                'annotation': 'skipped',
+            }
         t2 = time.time()
-        print(f"  [1/4] 블로그 크롤링, 쿼리 임베딩, 혼잡도 조회 동시 완료: {t2 - t1:.2f} 초 ({len(places)}개 중 {len(crawling_df) if not crawling_df.empty else 0}개 장소)")
+        print(f"  [1/4] 블로그 크롤링, 쿼리 임베딩, 혼잡도 조회 동시 완료: {t2 - t1:.2f} 초 ({len(all_places)}개 중 {len(crawled)}개 장소)")
+        if pending_crawl_ids or len(contentid_to_populartimes) < len(all_places):
+            print(f"        시간 예산 초과로 미완료: 크롤링 {len(pending_crawl_ids)}개 / 혼잡도 {len(all_places) - len(contentid_to_populartimes)}개")
+        extract_stats = extraction_pool.stats()
+        print(f"        본문 추출 풀: 대기 {extract_stats['queue_wait']['avg_ms']} ms / 파싱 {extract_stats['parse']['avg_ms']} ms / 왕복 {extract_stats['roundtrip']['avg_ms']} ms (평균, 누적 {extract_stats['parse']['count']}건)")
+        pop_stats = populartimes_service.stats()
+        print(f"        혼잡도: 스크래핑 누적 {pop_stats['scrapes']}건 / 주간 캐시 적중률 {pop_stats['weekly']['hit_rate']} / 실시간 추정 {pop_stats['estimated']}건")
 
         # === KeyError 방어 코드 시작 ===
         # 크롤링 결과가 비어있는지 먼저 확인합니다.
-        if crawling_df.empty:
+        if not crawled:
             print("  [경고] 블로그 크롤링 결과가 없어 AI 추천을 건너뛰고 기본 목록을 반환합니다.")
             # 혼잡도 정보만 추가해서 반환하고 함수를 즉시 종료합니다.
-            contentid_to_populartimes = {
-                place['contentid']: pop_result
-                for place, pop_result in zip(places, populartimes_results)
-            }
-            for place in places:
-                raw_pop_data = contentid_to_populartimes.get(place['contentid'])
-                place['populartimes'] = process_populartimes_data(raw_pop_data)
-            return places
+            for place in all_places:
+                place['populartimes'] = contentid_to_populartimes.get(place['contentid'])
+            for category, (places, _) in groups.items():
+                yield {'event': 'done', 'category': category, 'data': places}
+            return
         # === KeyError 방어 코드 끝 ===
 
-        valid_ids = set(crawling_df['contentid'])
-        places = [p for p in places if p['contentid'] in valid_ids]
-        if crawling_df.empty or crawling_df['텍스트'].str.strip().eq('').all():
-            return places
-
+        # 크롤링 결과가 없는 장소는 제외하고, 시간 초과로 크롤링이 끝나지 않은 장소는 순위 없이 남겨 둡니다.
+        valid_ids = {place.contentid for place in crawled} | pending_crawl_ids
+        groups = {category: ([p for p in places if p['contentid'] in valid_ids], place_type)
+                  for category, (places, place_type) in groups.items()}
+        with_text = [place for place in crawled if place.text.strip()]
+        if not with_text:
+            for category, (places, _) in groups.items():
+                yield {'event': 'done', 'category': category, 'data': places}
+            return
+
+        # BM25 사전 필터: 카테고리별로 어휘 점수 상위 장소만 임베딩/추천 이유 생성까지 진행합니다.
         t3 = time.time()
-        texts_to_embed = crawling_df[crawling_df['텍스트'].str.strip().ne('')]
-        if not texts_to_embed.empty:
-            embeddings = await recomm_engine.get_embedding(texts_to_embed['텍스트'].tolist())
-            crawling_df['embedding'] = None
-            crawling_df.loc[texts_to_embed.index, 'embedding'] = pd.Series(embeddings, index=texts_to_embed.index)
-        t4 = time.time()
-        print(f"  [2/4] 텍스트 임베딩 생성 완료: {t4 - t3:.2f} 초")
-
-        t5 = time.time()
-        df_embed = crawling_df.dropna(subset=['embedding'])
-        if not df_embed.empty:
-            matrix = df_embed["embedding"].tolist()
-            sims = cosine_similarity([query_emb], matrix)[0]
-            crawling_df.loc[df_embed.index, 'similarity'] = sims
+        lex_scores = dict(zip((place.contentid for place in with_text),
+                              lexical_scores([place.text for place in with_text], lexical_query(adjectives)).tolist()))
+        kept_ids = set()
+        for places, _ in groups.values():
+            category_ids = {p['contentid'] for p in places}
+            candidates = [record for record in with_text if record.contentid in category_ids]
+            scores = np.array([lex_scores[record.contentid] for record in candidates])
+            kept_ids.update(record.contentid for record in
+                            prefilter(candidates, scores, settings.AI_LEXICAL_PREFILTER_KEEP))
+        to_embed = [record for record in with_text if record.contentid in kept_ids]
+        print(f"        BM25 사전 필터: {len(with_text)}개 중 {len(to_embed)}개 ({time.time() - t3:.3f} 초)")
+
+        try:
+            if query_emb is None:
+                raise ValueError("쿼리 임베딩이 없습니다.")
+            embeddings = await asyncio.wait_for(recomm_engine.get_embedding([place.text for place in to_embed]),
+                                                deadline.remaining(EMBEDDING_SHARE, cap=settings.AI_EMBEDDING_TIMEOUT))
+            t4 = time.time()
+            print(f"  [2/4] 텍스트 임베딩 생성 완료: {t4 - t3:.2f} 초")
+            score_places(to_embed, embeddings, query_emb)
+            ranking = 'embedding'
+        except Exception as e:
+            # OpenAI가 느리거나 장애일 때(또는 시간 예산을 넘었을 때)는 임베딩 없이 BM25 점수로 순위를 매깁니다.
+            t4 = time.time()
+            print(f"  [2/4] 텍스트 임베딩 실패 ({t4 - t3:.2f} 초, {e!r}), BM25 순위로 대체합니다.")
+            score_places_lexical(to_embed, np.array([lex_scores[record.contentid] for record in to_embed]))
+            ranking = 'lexical'
         t6 = time.time()
-        print(f"  [3/4] 유사도 계산 완료: {t6 - t5:.2f} 초")
+        print(f"  [3/4] 유사도 계산 완료: {t6 - t4:.2f} 초")
+
+        # enrich_places로 미리 만든 기본 해시태그 (추천 이유를 만들지 않는 장소에도 표시)
+        try:
+            base_hashtags = await db_sync_to_async(place_profile_store.base_hashtags)(
+                {record.contentid: record.text for record in crawled})
+        except Exception as e:
+            print(f"  [장소 프로필] 조회 실패: {e}")
+            base_hashtags = {}
+
+        original_place_map = {p['contentid']: p for places, _ in groups.values() for p in places}
+        similarities = {record.contentid: record.similarity for record in crawled}
+        for contentid, place in original_place_map.items():
+            place['similarity'] = similarities.get(contentid)
+            place['recommend_reason'] = None
+            place['hashtags'] = base_hashtags.get(contentid)
+            place['populartimes'] = contentid_to_populartimes.get(contentid)
+            if place['similarity'] is not None:
+                place['stages']['ranking'] = ranking
+
+        annotation_targets = []
+        for category, (places, place_type) in groups.items():
+            category_ids = {p['contentid'] for p in places}
+            top_30 = top_places([record for record in crawled if record.contentid in category_ids], 30)
+            if top_30:
+                annotation_targets.append((category, top_30, place_type))
+                for record in top_30:
+                    original_place_map[record.contentid]['stages']['annotation'] = 'pending'
+
+        sorted_groups = {}
+        for category, (places, _) in groups.items():
+            sorted_groups[category] = sorted(
+                places,
+                key=lambda p: p.get('similarity') if p.get('similarity') is not None else -1.0,
+                reverse=True
+            )
+            yield {'event': 'ranking', 'category': category, 'data': sorted_groups[category]}
 
         t7 = time.time()
-        top_30_df = crawling_df.sort_values(by="similarity", ascending=False).head(30)
-        if not top_30_df.empty:
-            result_df = await recomm_engine.add_reasons_and_hashtags(top_30_df, adjectives, place_type)
-            crawling_df = crawling_df.merge(result_df[['contentid', '추천이유', '해시태그']], on='contentid', how='left')
+
+        async def annotate(category: str, records: list, place_type: str):
+            async for contentid, reason, tags in recomm_engine.iter_reasons_and_hashtags(records, adjectives, place_type):
+                yield category, contentid, reason, tags
+
+        # 예산의 ANNOTATION_SHARE 시점까지 끝난 장소의 추천 이유만 내보내고, 나머지는 'pending'으로 남긴 채 생성을 중단합니다.
+        merged = merge_async_iterators(*(annotate(*target) for target in annotation_targets))
+        try:
+            while True:
+                try:
+                    category, contentid, reason, tags = await asyncio.wait_for(
+                        anext(merged), deadline.remaining(ANNOTATION_SHARE))
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    pending = sum(p['stages']['annotation'] == 'pending' for p in original_place_map.values())
+                    print(f"  [4/4] 시간 예산 초과로 추천 이유 {pending}개를 pending으로 남깁니다.")
+                    break
+                if contentid in original_place_map:
+                    original_place_map[contentid]['recommend_reason'] = reason
+                    original_place_map[contentid]['hashtags'] = tags
+                    original_place_map[contentid]['stages']['annotation'] = 'done'
+                yield {'event': 'annotation', 'category': category,
+                       'data': {'contentid': contentid, 'recommend_reason': reason, 'hashtags': tags}}
+        finally:
+            await merged.aclose()
         t8 = time.time()
         print(f"  [4/4] 추천 이유/해시태그 생성 완료: {t8 - t7:.2f} 초")
 
-    crawling_df = crawling_df.replace({np.nan: None})
-    original_place_map = {p['contentid']: p for p in places}
-
-    contentid_to_populartimes = {
-        place['contentid']: pop_result
-        for place, pop_result in zip(places, populartimes_results)
-    }
-
-    for _, row in crawling_df.iterrows():
-        contentid = row['contentid']
-        if contentid in original_place_map:
-            original_place_map[contentid]['similarity'] = row.get('similarity')
-            original_place_map[contentid]['recommend_reason'] = row.get('추천이유')
-            original_place_map[contentid]['hashtags'] = row.get('해시태그')
-
-            raw_pop_data = contentid_to_populartimes.get(contentid)
-            original_place_map[contentid]['populartimes'] = process_populartimes_data(raw_pop_data)
-
-    sorted_places = sorted(
-        original_place_map.values(),
-        key=lambda p: p.get('similarity') if p.get('similarity') is not None else -1.0,
-        reverse=True
-    )
     total_end_time = time.time()
     print(f"  [AI 추천 파이프라인 종료] 총 소요 시간: {total_end_time - total_start_time:.2f} 초")
     print("======================================================\n")
-    return sorted_places
+    for category, sorted_places in sorted_groups.items():
+        yield {'event': 'done', 'category': category, 'data': sorted_places}
+
+
+STREAM_FORMATS = {'ndjson': 'application/x-ndjson', 'sse': 'text/event-stream'}
+
+
+class EventStreamRenderer(renderers.JSONRenderer):
+    """
+    Accept: text/event-stream 요청이 콘텐츠 협상에서 406으로 거절되지 않도록 등록하는 렌더러
+    스트림은 StreamingHttpResponse로 직접 보내므로, 이 렌더러는 스트림이 아닌 응답(오류 등)만 JSON 본문으로 보냅니다.
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
+
+
+# 스트리밍을 지원하는 목록 API의 렌더러 (기본 렌더러 + text/event-stream)
+STREAMING_RENDERER_CLASSES = [*api_settings.DEFAULT_RENDERER_CLASSES, EventStreamRenderer]
+
+
+def get_stream_format(request) -> str | None:
+    """
+    ?stream=ndjson|sse 또는 Accept: text/event-stream 이면 스트리밍 형식을 반환합니다.
+    """
+    stream = request.query_params.get('stream')
+    if stream in STREAM_FORMATS:
+        return stream
+    if 'text/event-stream' in request.META.get('HTTP_ACCEPT', ''):
+        return 'sse'
+    return None
+
+
+def encode_stream_event(event: dict, stream_format: str) -> str:
+    payload = json.dumps(event, ensure_ascii=False, default=str)
+    if stream_format == 'sse':
+        return f"event: {event['event']}\ndata: {payload}\n\n"
+    return payload + "\n"
+
+
+def streaming_response(events, stream_format: str) -> StreamingHttpResponse:
+    async def body():
+        async for event in events:
+            yield encode_stream_event(event, stream_format)
+
+    response = StreamingHttpResponse(body(), content_type=STREAM_FORMATS[stream_format])
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # 프록시(nginx) 버퍼링 비활성화
+    return response
+
+
+async def ai_recommendation_response(request, places: list, adjectives_str: str, place_type: str):
+    """
+    목록 API 공통: 스트리밍 요청이면 단계별 이벤트를, 아니면 최종 결과를 한 번에 응답합니다.
+    """
+    places_for_ai = places[:MAX_PLACES_FOR_AI]
+    adjectives = [adj.strip() for adj in adjectives_str.split(',')]
+    try:
+        deadline = Deadline.from_ms(request.query_params.get('budget_ms'))
+    except ValueError:
+        return Response({"error": "budget_ms는 정수여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+    stream_format = get_stream_format(request)
+    if stream_format:
+        return streaming_response(iter_ai_recommendations(places_for_ai, adjectives, place_type, deadline), stream_format)
+    final_results = await get_ai_recommendations(places_for_ai, adjectives, place_type=place_type, deadline=deadline)
+    return Response(final_results, status=status.HTTP_200_OK)
 
 
 ssl_context = ssl.create_default_context()
 ssl_context.set_ciphers('DEFAULT@SECLEVEL=1')
 
 
-async def fetch_from_tour_api(session: aiohttp.ClientSession, params: dict):
+# 동시에 들어온 같은 업스트림 요청 / AI 파이프라인 요청을 하나로 합치기 위한 객체
+tour_api_flight = SingleFlight()
+ai_recommendation_flight = SingleFlight()
+
+
+def normalize_tour_params(params: dict) -> tuple:
+    """
+    업스트림 요청 합치기용 키: 좌표는 소수점 6자리로 맞추고 파라미터 순서를 정렬합니다.
+    """
+    normalized = {}
+    for key, value in params.items():
+        if key in ('mapX', 'mapY'):
+            try:
+                value = f"{float(value):.6f}"
+            except (TypeError, ValueError):
+                pass
+        normalized[key] = str(value)
+    return tuple(sorted(normalized.items()))
+
+
+async def _request_tour_api(params: dict) -> list | None:
+    """
+    locationBasedList2 업스트림 호출. 같은 파라미터로 진행 중인 호출이 있으면 그 결과를 함께 사용합니다.
+    """
+    items = await tour_api_flight.do(normalize_tour_params(params), lambda: _call_tour_api(params))
+    # 여러 요청이 같은 결과를 공유하므로, 호출자마다 복사본을 돌려줍니다.
+    return None if items is None else [dict(item) for item in items]
+
+
+async def _call_tour_api(params: dict) -> list | None:
+    """
+    locationBasedList2를 실제로 호출합니다. 실패하면 None을 반환합니다. (실패 결과는 캐시하지 않기 위함)
+    """
     base_url = "https://apis.data.go.kr/B551011/KorService2/locationBasedList2"
     default_params = {'serviceKey': settings.TOUR_API_SERVICE_KEY, 'MobileOS': 'ETC', 'MobileApp': 'MyTourApp',
                       '_type': 'json'}
     request_params = {**default_params, **params}
     try:
-        async with session.get(base_url, params=request_params, ssl=ssl_context, timeout=10) as response:
-            response.raise_for_status()
-            data = await response.json()
-            if data.get('response', {}).get('body', {}).get('items') == '': return []
-            items = data.get('response', {}).get('body', {}).get('items', {}).get('item', [])
-            return [items] if isinstance(items, dict) else items
+        # 공유 세션 + 업스트림 정책(서킷 브레이커/재시도 예산)을 거쳐 호출합니다. (쿼터가 있어 헤지 요청은 보내지 않음)
+        data = await upstream_request('GET', base_url, _read_tour_api_json, params=request_params,
+                                      ssl=ssl_context, timeout=10, retries=1)
+        if data.get('response', {}).get('body', {}).get('items') == '': return []
+        items = data.get('response', {}).get('body', {}).get('items', {}).get('item', [])
+        return [items] if isinstance(items, dict) else items
     except (aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError) as e:
         print(f"API 요청 실패: {e}")
-        return []
+        return None
+
 
+async def _read_tour_api_json(response) -> dict:
+    response.raise_for_status()
+    return await response.json()
 
-async def fetch_restaurants_from_tour_api(session, params):
+
+async def fetch_from_tour_api(params: dict):
+    # 1) 장소 카탈로그가 수집된 지역이면 메모리 공간 인덱스에서 바로 응답합니다.
+    place_index.ensure_fresh()
+    items = place_index.query(params)
+    if items is not None:
+        return items
+    # 2) 미수집 지역은 지오 타일 캐시의 상위 집합에서 거리순으로 다시 잘라서 응답합니다.
+    items = await tour_tile_cache.fetch(params, _request_tour_api)
+    return items if items is not None else []
+
+
+async def fetch_restaurants_from_tour_api(params):
     restaurant_params = {'contentTypeId': '39', 'cat1': 'A05', 'cat2': 'A0502', **params}
-    return await fetch_from_tour_api(session, restaurant_params)
+    return await fetch_from_tour_api(restaurant_params)
+
+
+async def fetch_attractions_from_tour_api(params):
+    return await fetch_from_tour_api(params)
+
+
+# 식당 목록에 포함하는 음식점 소분류 (카페 A05020900 제외)
+RESTAURANT_CAT3 = ['A05020100', 'A05020200', 'A05020300', 'A05020400', 'A05020700']
 
 
-async def fetch_attractions_from_tour_api(session, params):
-    return await fetch_from_tour_api(session, params)
+async def fetch_nearby_restaurants(map_x: str, map_y: str, radius: str) -> list:
+    base_params = {'mapX': map_x, 'mapY': map_y, 'radius': radius, 'numOfRows': '50'}
+    tasks = [fetch_restaurants_from_tour_api({**base_params, 'cat3': cat}) for cat in RESTAURANT_CAT3]
+    results = await asyncio.gather(*tasks)
+    all_restaurants = [item for sublist in results for item in sublist]
+    unique_restaurants = list({p['contentid']: p for p in all_restaurants}.values())
+    return sorted(unique_restaurants, key=lambda x: float(x.get('dist', 0)))
 
 
+async def fetch_nearby_cafes(map_x: str, map_y: str, radius: str) -> list:
+    params = {'mapX': map_x, 'mapY': map_y, 'radius': radius, 'cat3': 'A05020900', 'numOfRows': '50'}
+    cafes = await fetch_restaurants_from_tour_api(params)
+    return sorted(cafes, key=lambda x: float(x.get('dist', 0)))
+
+
+async def fetch_nearby_attractions(map_x: str, map_y: str, radius: str) -> list:
+    params = {'mapX': map_x, 'mapY': map_y, 'radius': radius, 'contentTypeId': '12', 'numOfRows': '50'}
+    attractions = await fetch_attractions_from_tour_api(params)
+    return sorted(attractions, key=lambda x: float(x.get('dist', 0)))
+
+
+async def fetch_nearby_accommodations(map_x: str, map_y: str, radius: str) -> list:
+    params = {'mapX': map_x, 'mapY': map_y, 'radius': radius, 'contentTypeId': '32', 'numOfRows': '50'}
+    accommodations = await fetch_attractions_from_tour_api(params)
+    return sorted(accommodations, key=lambda x: float(x.get('dist', 0)))
+
+
+# 통합 주변 장소 API에서 사용하는 카테고리 정의 (개별 목록 API와 같은 조회 함수/장소유형/취급대장 서비스명)
+NEARBY_CATEGORIES = {
+    'restaurants': {'fetch': fetch_nearby_restaurants, 'place_type': '음식점', 'service': '주변 식당 AI 추천'},
+    'cafes': {'fetch': fetch_nearby_cafes, 'place_type': '카페', 'service': '주변 카페 AI 추천'},
+    'attractions': {'fetch': fetch_nearby_attractions, 'place_type': '관광지', 'service': '주변 관광지 AI 추천'},
+    'accommodations': {'fetch': fetch_nearby_accommodations, 'place_type': '숙소', 'service': '주변 숙소 AI 추천'},
+}
+
 MAX_PLACES_FOR_AI = 30
 
 
 class RestaurantListView(AsyncAPIView):
     permission_classes = [IsAuthenticatedOrReadOnly]
+    renderer_classes = STREAMING_RENDERER_CLASSES
     async def get(self, request):
         ### ▼▼▼ 디버깅용 print문 추가 ▼▼▼ ###
         print("===== LOGGING CHECK (RestaurantListView) =====")
@@ -258,10 +562,7 @@ class RestaurantListView(AsyncAPIView):
         print("============================================")
         ### ▲▲▲ 여기까지 추가 ▲▲▲ ###
         if request.user.is_authenticated:
-            await sync_to_async(LocationUsageLog.objects.create)(
-                user=request.user,
-                provided_service='주변 식당 AI 추천'
-            )
+            await log_location_usage(request.user, '주변 식당 AI 추천')
         
         map_x = request.query_params.get('mapX')
         map_y = request.query_params.get('mapY')
@@ -269,25 +570,16 @@ class RestaurantListView(AsyncAPIView):
         adjectives_str = request.query_params.get('adjectives')
         if not map_x or not map_y:
             return Response({"error": "mapX, mapY는 필수 파라미터입니다."}, status=status.HTTP_400_BAD_REQUEST)
-        food_categories = ['A05020100', 'A05020200', 'A05020300', 'A05020400', 'A05020700']
-        base_params = {'mapX': map_x, 'mapY': map_y, 'radius': radius, 'numOfRows': '50'}
-        async with aiohttp.ClientSession() as session:
-            tasks = [fetch_restaurants_from_tour_api(session, {**base_params, 'cat3': cat}) for cat in food_categories]
-            results = await asyncio.gather(*tasks)
-        all_restaurants = [item for sublist in results for item in sublist]
-        unique_restaurants = list({p['contentid']: p for p in all_restaurants}.values())
-        sorted_restaurants = sorted(unique_restaurants, key=lambda x: float(x.get('dist', 0)))
+        sorted_restaurants = await fetch_nearby_restaurants(map_x, map_y, radius)
         if adjectives_str:
-            places_for_ai = sorted_restaurants[:MAX_PLACES_FOR_AI]
-            adjectives = [adj.strip() for adj in adjectives_str.split(',')]
-            final_results = await get_ai_recommendations(places_for_ai, adjectives, place_type='음식점')
-            return Response(final_results, status=status.HTTP_200_OK)
+            return await ai_recommendation_response(request, sorted_restaurants, adjectives_str, place_type='음식점')
         else:
             return Response(sorted_restaurants, status=status.HTTP_200_OK)
 
 
 class CafeListView(AsyncAPIView):
     permission_classes = [IsAuthenticatedOrReadOnly]
+    renderer_classes = STREAMING_RENDERER_CLASSES
     async def get(self, request):
         ### ▼▼▼ 디버깅용 print문 추가 ▼▼▼ ###
         print("===== LOGGING CHECK (CafeListView) =====")
@@ -296,10 +588,7 @@ class CafeListView(AsyncAPIView):
         print("========================================")
         ### ▲▲▲ 여기까지 추가 ▲▲▲ ###
         if request.user.is_authenticated:
-            await sync_to_async(LocationUsageLog.objects.create)(
-                user=request.user,
-                provided_service='주변 카페 AI 추천'
-            )
+            await log_location_usage(request.user, '주변 카페 AI 추천')
 
         map_x = request.query_params.get('mapX')
         map_y = request.query_params.get('mapY')
@@ -307,21 +596,16 @@ class CafeListView(AsyncAPIView):
         adjectives_str = request.query_params.get('adjectives')
         if not map_x or not map_y:
             return Response({"error": "mapX, mapY는 필수 파라미터입니다."}, status=status.HTTP_400_BAD_REQUEST)
-        params = {'mapX': map_x, 'mapY': map_y, 'radius': radius, 'cat3': 'A05020900', 'numOfRows': '50'}
-        async with aiohttp.ClientSession() as session:
-            cafes = await fetch_restaurants_from_tour_api(session, params)
-        sorted_cafes = sorted(cafes, key=lambda x: float(x.get('dist', 0)))
+        sorted_cafes = await fetch_nearby_cafes(map_x, map_y, radius)
         if adjectives_str:
-            places_for_ai = sorted_cafes[:MAX_PLACES_FOR_AI]
-            adjectives = [adj.strip() for adj in adjectives_str.split(',')]
-            final_results = await get_ai_recommendations(places_for_ai, adjectives, place_type='카페')
-            return Response(final_results, status=status.HTTP_200_OK)
+            return await ai_recommendation_response(request, sorted_cafes, adjectives_str, place_type='카페')
         else:
             return Response(sorted_cafes, status=status.HTTP_200_OK)
 
 
 class TouristAttractionListView(AsyncAPIView):
     permission_classes = [IsAuthenticatedOrReadOnly]
+    renderer_classes = STREAMING_RENDERER_CLASSES
     async def get(self, request):
         ### ▼▼▼ 디버깅용 print문 추가 ▼▼▼ ###
         print("===== LOGGING CHECK (TouristAttractionListView) =====")
@@ -330,10 +614,7 @@ class TouristAttractionListView(AsyncAPIView):
         print("===================================================")
         ### ▲▲▲ 여기까지 추가 ▲▲▲ ###
         if request.user.is_authenticated:
-            await sync_to_async(LocationUsageLog.objects.create)(
-                user=request.user,
-                provided_service='주변 관광지 AI 추천'
-            )
+            await log_location_usage(request.user, '주변 관광지 AI 추천')
 
         map_x = request.query_params.get('mapX')
         map_y = request.query_params.get('mapY')
@@ -341,21 +622,16 @@ class TouristAttractionListView(AsyncAPIView):
         adjectives_str = request.query_params.get('adjectives')
         if not map_x or not map_y:
             return Response({"error": "mapX, mapY는 필수 파라미터입니다."}, status=status.HTTP_400_BAD_REQUEST)
-        params = {'mapX': map_x, 'mapY': map_y, 'radius': radius, 'contentTypeId': '12', 'numOfRows': '50'}
-        async with aiohttp.ClientSession() as session:
-            attractions = await fetch_attractions_from_tour_api(session, params)
-        sorted_attractions = sorted(attractions, key=lambda x: float(x.get('dist', 0)))
+        sorted_attractions = await fetch_nearby_attractions(map_x, map_y, radius)
         if adjectives_str:
-            places_for_ai = sorted_attractions[:MAX_PLACES_FOR_AI]
-            adjectives = [adj.strip() for adj in adjectives_str.split(',')]
-            final_results = await get_ai_recommendations(places_for_ai, adjectives, place_type='관광지')
-            return Response(final_results, status=status.HTTP_200_OK)
+            return await ai_recommendation_response(request, sorted_attractions, adjectives_str, place_type='관광지')
         else:
             return Response(sorted_attractions, status=status.HTTP_200_OK)
 
 
 class AccommodationListView(AsyncAPIView):
     permission_classes = [IsAuthenticatedOrReadOnly]
+    renderer_classes = STREAMING_RENDERER_CLASSES
     async def get(self, request):
         ### ▼▼▼ 디버깅용 print문 추가 ▼▼▼ ###
         print("===== LOGGING CHECK (AccommodationListView) =====")
@@ -364,10 +640,7 @@ class AccommodationListView(AsyncAPIView):
         print("===============================================")
         ### ▲▲▲ 여기까지 추가 ▲▲▲ ###
         if request.user.is_authenticated:
-            await sync_to_async(LocationUsageLog.objects.create)(
-                user=request.user,
-                provided_service='주변 숙소 AI 추천'
-            )
+            await log_location_usage(request.user, '주변 숙소 AI 추천')
         
         map_x = request.query_params.get('mapX')
         map_y = request.query_params.get('mapY')
@@ -375,19 +648,169 @@ class AccommodationListView(AsyncAPIView):
         adjectives_str = request.query_params.get('adjectives')
         if not map_x or not map_y:
             return Response({"error": "mapX, mapY는 필수 파라미터입니다."}, status=status.HTTP_400_BAD_REQUEST)
-        params = {'mapX': map_x, 'mapY': map_y, 'radius': radius, 'contentTypeId': '32', 'numOfRows': '50'}
-        async with aiohttp.ClientSession() as session:
-            accommodations = await fetch_attractions_from_tour_api(session, params)
-        sorted_accommodations = sorted(accommodations, key=lambda x: float(x.get('dist', 0)))
+        sorted_accommodations = await fetch_nearby_accommodations(map_x, map_y, radius)
         if adjectives_str:
-            places_for_ai = sorted_accommodations[:MAX_PLACES_FOR_AI]
-            adjectives = [adj.strip() for adj in adjectives_str.split(',')]
-            final_results = await get_ai_recommendations(places_for_ai, adjectives, place_type='숙소')
-            return Response(final_results, status=status.HTTP_200_OK)
+            return await ai_recommendation_response(request, sorted_accommodations, adjectives_str, place_type='숙소')
         else:
             return Response(sorted_accommodations, status=status.HTTP_200_OK)
 
 
+class NearbyPlacesView(AsyncAPIView):
+    """
+    여러 카테고리의 주변 장소를 한 번에 조회합니다.
+    ?categories=restaurants,cafes,attractions,accommodations&mapX=..&mapY=..[&radius=..][&adjectives=..][&stream=ndjson|sse][&budget_ms=..]
+    TourAPI 조회는 카테고리별로 동시에 하고, AI 추천은 하나의 파이프라인으로 묶어서 처리합니다.
+    """
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    renderer_classes = STREAMING_RENDERER_CLASSES
+    async def get(self, request):
+        categories_str = request.query_params.get('categories', ','.join(NEARBY_CATEGORIES))
+        categories = list(dict.fromkeys(c.strip() for c in categories_str.split(',') if c.strip()))
+        unknown = [c for c in categories if c not in NEARBY_CATEGORIES]
+        if not categories or unknown:
+            return Response({"error": f"categories는 {', '.join(NEARBY_CATEGORIES)} 중에서 선택해야 합니다."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        map_x = request.query_params.get('mapX')
+        map_y = request.query_params.get('mapY')
+        radius = request.query_params.get('radius', '5000')
+        adjectives_str = request.query_params.get('adjectives')
+        if not map_x or not map_y:
+            return Response({"error": "mapX, mapY는 필수 파라미터입니다."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            deadline = Deadline.from_ms(request.query_params.get('budget_ms'))
+        except ValueError:
+            return Response({"error": "budget_ms는 정수여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.user.is_authenticated:
+            await log_location_usage(request.user, *(NEARBY_CATEGORIES[c]['service'] for c in categories))
+
+        results = await asyncio.gather(*(NEARBY_CATEGORIES[c]['fetch'](map_x, map_y, radius) for c in categories))
+        places_by_category = dict(zip(categories, results))
+        if not adjectives_str:
+            return Response(places_by_category, status=status.HTTP_200_OK)
+
+        adjectives = [adj.strip() for adj in adjectives_str.split(',')]
+        groups = {c: (places[:MAX_PLACES_FOR_AI], NEARBY_CATEGORIES[c]['place_type'])
+                  for c, places in places_by_category.items()}
+        events = iter_grouped_ai_recommendations(groups, adjectives, deadline)
+        stream_format = get_stream_format(request)
+        if stream_format:
+            return streaming_response(events, stream_format)
+        final_results = {}
+        async for event in events:
+            if event['event'] == 'done':
+                final_results[event['category']] = event['data']
+        return Response(final_results, status=status.HTTP_200_OK)
+
+
+# 벡터 검색 API의 카테고리 -> (관광타입 ID, 소분류 목록) 필터 (목록 API와 같은 범위)
+VECTOR_CATEGORY_FILTERS = {
+    'restaurants': {'content_type_id': '39', 'cat3': RESTAURANT_CAT3},
+    'cafes': {'content_type_id': '39', 'cat3': ['A05020900']},
+    'attractions': {'content_type_id': '12'},
+    'accommodations': {'content_type_id': '32'},
+}
+MAX_VECTOR_SEARCH_RESULTS = 100
+
+
+def _parse_limit(request) -> int:
+    try:
+        return min(max(int(request.query_params.get('limit', MAX_PLACES_FOR_AI)), 1), MAX_VECTOR_SEARCH_RESULTS)
+    except (TypeError, ValueError):
+        return MAX_PLACES_FOR_AI
+
+
+async def vector_hits_to_places(hits: list) -> list:
+    """
+    벡터 검색 결과 [(content_id, 유사도, 거리)] 를 목록 API와 같은 형태의 장소 항목으로 바꿉니다.
+    """
+    items = {cid: place_index.get(cid) for cid, _, _ in hits}
+    missing = [cid for cid, item in items.items() if item is None]
+    if missing:
+        # 메모리 인덱스가 아직 적재되지 않았으면 카탈로그에서 읽습니다.
+        rows = await db_sync_to_async(lambda: dict(Place.objects.filter(content_id__in=missing).values_list('content_id', 'raw')))()
+        items.update(rows)
+    places = []
+    for cid, similarity, dist in hits:
+        if items.get(cid) is None:
+            continue
+        place = {**items[cid], 'similarity': similarity}
+        if dist is not None:
+            place['dist'] = f"{dist:.6f}"
+        places.append(place)
+    return places
+
+
+class VectorSearchView(AsyncAPIView):
+    """
+    장소 카탈로그 전체에서 형용사와 가장 어울리는 장소를 벡터 인덱스로 찾습니다. (주변 30개 제한 없음)
+    ?category=cafes&adjectives=고즈넉한&mapX=..&mapY=..[&radius=20000][&limit=30]
+    """
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    async def get(self, request):
+        category = request.query_params.get('category')
+        adjectives_str = request.query_params.get('adjectives')
+        map_x = request.query_params.get('mapX')
+        map_y = request.query_params.get('mapY')
+        if category not in VECTOR_CATEGORY_FILTERS or not adjectives_str or not map_x or not map_y:
+            return Response({"error": f"category({', '.join(VECTOR_CATEGORY_FILTERS)}), adjectives, mapX, mapY는 필수 파라미터입니다."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            center = (float(map_x), float(map_y))
+            radius = float(request.query_params.get('radius', '20000'))
+        except ValueError:
+            return Response({"error": "mapX, mapY, radius는 숫자여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+        await place_vector_index.ensure_current()
+        if not place_vector_index.is_loaded:
+            return Response({"error": "벡터 인덱스가 준비되지 않았습니다."}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        adjectives = [adj.strip() for adj in adjectives_str.split(',')]
+        async with RecommendationEngine(embedding_model=place_vector_index.model) as recomm_engine:
+            query_emb = await recomm_engine.get_adjectives_embedding(adjectives)
+        t = time.perf_counter()
+        hits = place_vector_index.search(query_emb, _parse_limit(request), center=center, radius=radius,
+                                         **VECTOR_CATEGORY_FILTERS[category])
+        print(f"[벡터 검색] {category} 반경 {radius:.0f}m: {len(hits)}개 ({(time.perf_counter() - t) * 1000:.1f} ms)")
+        return Response(await vector_hits_to_places(hits), status=status.HTTP_200_OK)
+
+
+class SimilarPlacesView(AsyncAPIView):
+    """
+    블로그 내용이 content_id 장소와 비슷한 장소를 찾습니다.
+    [?category=cafes][&radius=미터 (기준 장소 중심)][&limit=30]
+    """
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    async def get(self, request, content_id):
+        category = request.query_params.get('category')
+        if category is not None and category not in VECTOR_CATEGORY_FILTERS:
+            return Response({"error": f"category는 {', '.join(VECTOR_CATEGORY_FILTERS)} 중에서 선택해야 합니다."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            radius = float(request.query_params['radius']) if 'radius' in request.query_params else None
+        except ValueError:
+            return Response({"error": "radius는 숫자여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+        await place_vector_index.ensure_current()
+        if not place_vector_index.is_loaded:
+            return Response({"error": "벡터 인덱스가 준비되지 않았습니다."}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        hits = place_vector_index.similar(content_id, _parse_limit(request), radius=radius,
+                                          **VECTOR_CATEGORY_FILTERS.get(category, {}))
+        if hits is None:
+            return Response({"error": "벡터 인덱스에 없는 장소입니다."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(await vector_hits_to_places(hits), status=status.HTTP_200_OK)
+
+
+class UpstreamHealthView(APIView):
+    """
+    업스트림 호스트별 서킷 상태와 지연/실패 통계, OpenAI 동시성 제한 상태 (관리자 전용)
+    """
+    permission_classes = [IsAdminUser]
+    def get(self, request):
+        health = upstream_health()
+        health.setdefault('api.openai.com', {})['concurrency'] = openai_limiter_stats()
+        return Response(health, status=status.HTTP_200_OK)
+
+
+# 동기 requests 호출(관리 명령 등)에서 TourAPI에 접속하기 위한 어댑터
 class TlsAdapter(requests.adapters.HTTPAdapter):
     def init_poolmanager(self, connections, maxsize, block=False):
         ctx = ssl.create_default_context()
@@ -396,36 +819,77 @@ class TlsAdapter(requests.adapters.HTTPAdapter):
                                                    ssl_version=ssl.PROTOCOL_TLS, ssl_context=ctx)
 
 
-def fetch_detail_from_tour_api_sync(content_id):
+# contentId별 상세 정보 캐시 (상세 정보는 거의 바뀌지 않으므로 길게 보관합니다)
+detail_cache = TTLCache(maxsize=4096, ttl=6 * 60 * 60)
+MAX_BATCH_DETAIL_IDS = 100
+
+
+async def fetch_detail_from_tour_api(content_id) -> dict | None:
+    content_id = str(content_id)
+    cached = detail_cache.get(content_id)
+    if cached is not None:
+        return cached
+
     base_url = "https://apis.data.go.kr/B551011/KorService2/detailCommon2"
     default_params = {'serviceKey': settings.TOUR_API_SERVICE_KEY, 'MobileOS': 'ETC', 'MobileApp': 'MyTourApp',
                       '_type': 'json', 'contentId': content_id}
-    session = requests.Session()
-    session.mount('https://', TlsAdapter())
     try:
-        response = session.get(base_url, params=default_params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = await upstream_request('GET', base_url, _read_tour_api_json, params=default_params,
+                                      ssl=ssl_context, timeout=10, retries=1)
         if data.get('response', {}).get('body', {}).get('items') == '': return None
         items = data.get('response', {}).get('body', {}).get('items', {}).get('item', [])
-        return items[0] if items else None
-    except (json.JSONDecodeError, requests.exceptions.RequestException) as e:
+        detail = items[0] if isinstance(items, list) and items else (items or None)
+    except (aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError) as e:
         print(f"API 요청 실패: {e}")
         return None
+    if detail:
+        detail_cache.set(content_id, detail)
+    return detail
+
 
+async def fetch_details_from_tour_api(content_ids: list) -> dict:
+    """
+    여러 contentId의 상세 정보를 한 번에 조회합니다. 캐시에 없는 것만 동시에 요청합니다.
+    """
+    unique_ids = list(dict.fromkeys(str(cid) for cid in content_ids))
+    details = await gather_with_concurrency(10, *(fetch_detail_from_tour_api(cid) for cid in unique_ids))
+    return dict(zip(unique_ids, details))
 
-class TourDetailView(APIView):
+
+class TourDetailView(AsyncAPIView):
     permission_classes = [AllowAny]
-    def get(self, request, content_id):
+    async def get(self, request, content_id):
         if not content_id:
             return Response({"error": "contentId가 필요합니다."}, status=status.HTTP_400_BAD_REQUEST)
-        detail_data = fetch_detail_from_tour_api_sync(content_id)
+        detail_data = await fetch_detail_from_tour_api(content_id)
         if detail_data:
             return Response(detail_data, status=status.HTTP_200_OK)
         else:
             return Response({"error": "해당 contentId에 대한 정보를 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
 
 
+class TourDetailBatchView(AsyncAPIView):
+    """
+    여러 장소의 상세 정보를 한 번에 조회합니다. (예: 북마크 화면)
+    ?contentIds=126508,2733967,...
+    """
+    permission_classes = [AllowAny]
+    async def get(self, request):
+        content_ids = [cid.strip() for cid in request.query_params.get('contentIds', '').split(',') if cid.strip()]
+        if not content_ids:
+            return Response({"error": "contentIds는 필수 파라미터입니다."}, status=status.HTTP_400_BAD_REQUEST)
+        if not all(cid.isdigit() for cid in content_ids):
+            return Response({"error": "contentIds는 숫자만 쉼표로 구분해서 입력해야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(content_ids) > MAX_BATCH_DETAIL_IDS:
+            return Response({"error": f"contentIds는 최대 {MAX_BATCH_DETAIL_IDS}개까지 조회할 수 있습니다."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        details = await fetch_details_from_tour_api(content_ids)
+        return Response({
+            "results": [detail for detail in details.values() if detail],
+            "not_found": [cid for cid, detail in details.items() if not detail],
+        }, status=status.HTTP_200_OK)
+
+
 class TripSummaryView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
     def _prepare_trip_context(self, trip: Trip, visited_places: list[VisitedContent]) -> str:
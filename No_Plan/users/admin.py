@@ -2,8 +2,47 @@
 
 from django.contrib import admin
 from django.contrib.admin.models import LogEntry
+from django.contrib.auth import get_user_model
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
 from .models import LocationUsageLog # LocationUsageLog 모델 import
 
+# 테이블 통계상 행 수가 이보다 많으면 필터 없는 목록에서 COUNT(*) 대신 추정치를 사용합니다.
+EXACT_COUNT_LIMIT = 100000
+
+
+def estimated_row_count(model) -> int | None:
+    """
+    DB 통계에 저장된 테이블 행 수 추정치 (MySQL/PostgreSQL, 그 외는 None)
+    """
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute("SELECT TABLE_ROWS FROM information_schema.TABLES "
+                           "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", [table])
+        elif connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    return int(row[0]) if row and row[0] is not None and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    필터/검색이 없는 목록은 전체 COUNT(*) 대신 테이블 통계의 추정치로 페이지 수를 계산합니다.
+    (필터가 있으면 인덱스를 타는 정확한 COUNT)
+    """
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            estimate = estimated_row_count(self.object_list.model)
+            if estimate is not None and estimate > EXACT_COUNT_LIMIT:
+                return estimate
+        return super().count
+
 # LogEntry 모델을 관리자 페이지에 등록
 @admin.register(LogEntry)
 class LogEntryAdmin(admin.ModelAdmin):
@@ -29,6 +68,23 @@ class LocationUsageLogAdmin(admin.ModelAdmin):
     # 검색 기능을 추가하여 특정 사용자의 이메일로 기록을 검색할 수 있습니다.
     search_fields = ('user__email',)
 
+    # 대용량 테이블에서 목록 페이지가 전체 행을 세지 않도록 합니다.
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_select_related = ('user',)
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        이메일 전체를 입력하면 사용자를 먼저 찾아 (user, 이용일시) 인덱스로 조회하고,
+        일부만 입력하면 기존처럼 포함 검색을 합니다.
+        """
+        term = search_term.strip()
+        if '@' in term and ' ' not in term:
+            user_ids = list(get_user_model().objects.filter(email__iexact=term).values_list('pk', flat=True))
+            if user_ids:
+                return queryset.filter(user_id__in=user_ids), False
+        return super().get_search_results(request, queryset, search_term)
+
     # user 객체 대신 이메일 주소를 표시하기 위한 헬퍼 메소드입니다.
     def get_user_email(self, obj):
         return obj.user.email if obj.user else '알 수 없음'
@@ -3,3 +3,9 @@ from django.apps import AppConfig
 class LogInConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        # 취급대장 쓰기 버퍼에 남은 기록을 종료 시 모두 씁니다.
+        from config.lifespan import on_shutdown
+        from .usage_log import location_usage_writer
+        on_shutdown(location_usage_writer.close)
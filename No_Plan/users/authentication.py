@@ -0,0 +1,100 @@
+# users/authentication.py
+
+import copy
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models.signals import post_delete, post_save
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from ai.cache import TTLCache, SingleFlight
+
+
+# ===================================================================
+# 비동기 JWT 인증
+# ===================================================================
+# AsyncAPIView는 authenticate_async가 있는 인증 클래스를 이벤트 루프에서 바로 실행합니다.
+#  - 액세스 토큰 검증(서명/만료 확인)은 DB를 쓰지 않는 CPU 작업이므로 스레드로 넘기지 않습니다.
+#  - 사용자 조회는 짧은 TTL 캐시를 먼저 보고, 없을 때만 DB를 조회합니다. (같은 사용자의 동시 조회는 하나로 합침)
+#    캐시는 프로세스마다 따로 있으므로 다른 워커에서 바뀐 사용자 정보는 TTL(AUTH_USER_CACHE_TTL, 기본 3초)이 지나야 반영됩니다.
+#    조회는 thread_sensitive=False로 실행해 요청들이 하나의 스레드에 줄 서지 않게 합니다.
+# 동기 뷰(dj-rest-auth 등)는 상속받은 authenticate를 그대로 사용합니다.
+user_cache = TTLCache(maxsize=10000, ttl=settings.AUTH_USER_CACHE_TTL)
+user_flight = SingleFlight()
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    async def authenticate_async(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        return await self.get_user_async(validated_token), validated_token
+
+    async def get_user_async(self, validated_token):
+        """
+        JWTAuthentication.get_user와 같은 검사를 하되, 사용자는 캐시 또는 비동기 조회로 가져옵니다.
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = user_cache.get(str(user_id))
+        if user is None:
+            user = await user_flight.do(str(user_id), lambda: self._fetch_user(user_id))
+            if user is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        # 캐시된 인스턴스를 요청끼리 공유하지 않도록 복사본을 넘깁니다.
+        user = copy.copy(user)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
+
+    async def _fetch_user(self, user_id):
+        user = await sync_to_async(self._get_user_sync, thread_sensitive=False)(user_id)
+        if user is not None:
+            user_cache.set(str(user_id), user)
+        return user
+
+    def _get_user_sync(self, user_id):
+        # 스레드 풀의 DB 연결도 요청 처리와 같은 규칙(CONN_MAX_AGE)으로 열고 닫습니다.
+        close_old_connections()
+        try:
+            return self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            return None
+        finally:
+            close_old_connections()
+
+
+def forget_cached_user(sender, instance, **kwargs):
+    """
+    사용자 정보가 바뀌거나 삭제되면 (비활성화, 비밀번호 변경 등) 이 프로세스의 캐시에서 바로 지웁니다.
+    """
+    user_cache.pop(str(getattr(instance, api_settings.USER_ID_FIELD)))
+
+
+post_save.connect(forget_cached_user, sender=settings.AUTH_USER_MODEL, dispatch_uid='forget_cached_user_on_save')
+post_delete.connect(forget_cached_user, sender=settings.AUTH_USER_MODEL, dispatch_uid='forget_cached_user_on_delete')
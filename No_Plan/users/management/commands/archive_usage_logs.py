@@ -0,0 +1,153 @@
+# users/management/commands/archive_usage_logs.py
+
+import csv
+import datetime
+import glob
+import gzip
+import hashlib
+import json
+import os
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from users.models import LocationUsageLog
+
+
+# 위치정보법상 이용·제공사실 확인자료는 6개월 이상 보존해야 하므로 그보다 짧게는 DB에서 지우지 않습니다.
+MIN_RETENTION_MONTHS = 6
+CHUNK_SIZE = 5000
+COLUMNS = ('id', 'user_id', 'user_email', 'acquisition_path', 'provided_service', 'recipient', 'usage_timestamp')
+
+
+def month_start(value: datetime.datetime) -> datetime.datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value: datetime.datetime, months: int) -> datetime.datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Command(BaseCommand):
+    help = ("보존 기간이 지난 달의 위치정보 취급대장(LocationUsageLog)을 월별 gzip CSV 파일로 옮기고 DB에서 지웁니다. "
+            "파일을 끝까지 쓰고 행 수를 확인한 뒤에만 지우며, 중간에 멈춰도 다시 실행하면 이어서 처리합니다.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-months', type=int, default=None,
+                            help=f"DB에 남길 개월 수 (기본: 설정값, 최소 {MIN_RETENTION_MONTHS})")
+        parser.add_argument('--archive-dir', default=None, help="압축 파일을 저장할 경로 (기본: 설정값)")
+        parser.add_argument('--dry-run', action='store_true', help="옮길 달과 행 수만 출력")
+
+    def handle(self, *args, **options):
+        keep_months = options['keep_months'] or settings.USAGE_LOG_RETENTION_MONTHS
+        if keep_months < MIN_RETENTION_MONTHS:
+            raise CommandError(f"취급대장은 {MIN_RETENTION_MONTHS}개월 이상 DB에 보존해야 합니다. (--keep-months {keep_months})")
+        archive_dir = options['archive_dir'] or settings.USAGE_LOG_ARCHIVE_DIR
+        os.makedirs(archive_dir, exist_ok=True)
+
+        cutoff = add_months(month_start(timezone.now()), -keep_months)
+        oldest = LocationUsageLog.objects.filter(usage_timestamp__lt=cutoff).aggregate(Min('usage_timestamp'))
+        if oldest['usage_timestamp__min'] is None:
+            self.stdout.write(f"{cutoff:%Y-%m} 이전의 기록이 없습니다.")
+            return
+
+        month = month_start(oldest['usage_timestamp__min'])
+        while month < cutoff:
+            self.archive_month(month, add_months(month, 1), archive_dir, options['dry_run'])
+            month = add_months(month, 1)
+
+    def archive_month(self, start: datetime.datetime, end: datetime.datetime, archive_dir: str, dry_run: bool):
+        label = f"{start:%Y-%m}"
+        rows = LocationUsageLog.objects.filter(usage_timestamp__gte=start, usage_timestamp__lt=end)
+        manifests = self.load_manifests(archive_dir, label)
+        archived_max_id = max((m['max_id'] for m in manifests), default=None)
+
+        if dry_run:
+            archived = rows.filter(pk__lte=archived_max_id).count() if archived_max_id is not None else 0
+            self.stdout.write(f"{label}: {rows.count()}건 (이미 파일에 있는 {archived}건 포함)")
+            return
+
+        # 이전 실행에서 파일로 옮겼지만 지우지 못한 행
+        if archived_max_id is not None:
+            deleted = self.delete_rows(rows.filter(pk__lte=archived_max_id))
+            if deleted:
+                self.stdout.write(f"{label}: 이미 보관된 {deleted}건 삭제")
+            rows = rows.filter(pk__gt=archived_max_id)
+
+        bounds = rows.aggregate(Min('pk'), Max('pk'))
+        if bounds['pk__min'] is None:
+            return
+        part = len(manifests) + 1
+        name = f"location_usage_log-{label}" + (f".{part}" if part > 1 else "")
+        path = os.path.join(archive_dir, f"{name}.csv.gz")
+        tmp_path = path + ".tmp"
+
+        count = 0
+        with open(tmp_path, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            last_id = bounds['pk__min'] - 1
+            while True:
+                # 큰 달도 메모리에 다 올리지 않도록 id 기준으로 잘라 읽습니다.
+                chunk = list(rows.filter(pk__gt=last_id, pk__lte=bounds['pk__max']).order_by('pk')
+                             .values_list('id', 'user_id', 'user__email', 'acquisition_path',
+                                          'provided_service', 'recipient', 'usage_timestamp')[:CHUNK_SIZE])
+                if not chunk:
+                    break
+                writer.writerows([row[0], row[1] or '', row[2] or '', row[3], row[4], row[5], row[6].isoformat()]
+                                 for row in chunk)
+                count += len(chunk)
+                last_id = chunk[-1][0]
+            f.close()
+            raw.flush()
+            os.fsync(raw.fileno())
+
+        # 다시 읽어 행 수를 확인한 뒤에만 파일을 확정하고 DB에서 지웁니다.
+        with gzip.open(tmp_path, 'rt', encoding='utf-8', newline='') as f:
+            written = sum(1 for _ in csv.reader(f)) - 1
+        if written != count:
+            os.remove(tmp_path)
+            raise CommandError(f"{label}: 파일 행 수({written})가 읽은 행 수({count})와 다릅니다.")
+        os.replace(tmp_path, path)
+        manifest = {'month': label, 'file': os.path.basename(path), 'rows': count,
+                    'min_id': bounds['pk__min'], 'max_id': last_id, 'sha256': file_sha256(path),
+                    'archived_at': timezone.now().isoformat()}
+        with open(os.path.join(archive_dir, f"{name}.json"), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        deleted = self.delete_rows(rows.filter(pk__lte=last_id))
+        self.stdout.write(f"{label}: {count}건을 {path} 로 옮기고 {deleted}건 삭제")
+
+    @staticmethod
+    def load_manifests(archive_dir: str, label: str) -> list[dict]:
+        pattern = re.compile(rf"location_usage_log-{label}(\.\d+)?\.json$")
+        manifests = []
+        for path in glob.glob(os.path.join(archive_dir, f"location_usage_log-{label}*.json")):
+            if pattern.search(os.path.basename(path)):
+                with open(path, encoding='utf-8') as f:
+                    manifests.append(json.load(f))
+        return manifests
+
+    @staticmethod
+    def delete_rows(queryset) -> int:
+        """
+        한 번에 CHUNK_SIZE건씩 지워 긴 잠금과 큰 트랜잭션을 피합니다.
+        """
+        total = 0
+        while True:
+            ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:CHUNK_SIZE])
+            if not ids:
+                return total
+            total += LocationUsageLog.objects.filter(pk__in=ids).delete()[0]
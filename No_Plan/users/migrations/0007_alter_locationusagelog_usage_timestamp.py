@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-17 13:19
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_locationusagelog'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='locationusagelog',
+            name='usage_timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='이용일시'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-17 13:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_alter_locationusagelog_usage_timestamp'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='locationusagelog',
+            index=models.Index(fields=['-usage_timestamp'], name='usage_log_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='locationusagelog',
+            index=models.Index(fields=['provided_service', '-usage_timestamp'], name='usage_log_service_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='locationusagelog',
+            index=models.Index(fields=['user', '-usage_timestamp'], name='usage_log_user_ts_idx'),
+        ),
+    ]
@@ -3,6 +3,7 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -297,8 +298,10 @@ class LocationUsageLog(models.Model):
     )
 
     # 이용일시: 로그가 생성된 시점을 자동으로 기록합니다.
+    # (기록은 모아서 나중에 쓰므로 auto_now_add 대신 기록 객체를 만든 시점의 값을 기본값으로 사용)
     usage_timestamp = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         verbose_name='이용일시'
     )
 
@@ -311,3 +314,9 @@ class LocationUsageLog(models.Model):
         verbose_name = '위치정보 이용·제공 기록'
         verbose_name_plural = '위치정보 이용·제공 기록 (취급대장)'
         ordering = ['-usage_timestamp'] # 최신순으로 정렬
+        # 관리자 목록(최신순 정렬, 서비스 필터, 사용자 검색)이 전체 테이블을 읽지 않도록 정렬 컬럼을 뒤에 붙인 복합 인덱스
+        indexes = [
+            models.Index(fields=['-usage_timestamp'], name='usage_log_ts_idx'),
+            models.Index(fields=['provided_service', '-usage_timestamp'], name='usage_log_service_ts_idx'),
+            models.Index(fields=['user', '-usage_timestamp'], name='usage_log_user_ts_idx'),
+        ]
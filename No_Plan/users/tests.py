@@ -1,3 +1,188 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import io
+import os
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import CommandError, call_command
+from django.db import OperationalError
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .authentication import AsyncJWTAuthentication, user_cache
+from .management.commands.archive_usage_logs import Command as ArchiveCommand, month_start
+from .models import LocationUsageLog, User
+from .usage_log import LocationUsageWriter
+
+
+class LocationUsageWriterTests(TransactionTestCase):
+    # 쓰기 스레드와 같이 _write가 직접 close_old_connections를 호출하므로 테스트 트랜잭션으로 감싸지 않습니다.
+    def setUp(self):
+        self.user = User.objects.create_user(username='kept', email='kept@example.com')
+        self.writer = LocationUsageWriter(batch_size=2, flush_interval=1, max_delay=10, max_pending=100)
+
+    def enqueue(self, user, *services):
+        for service in services:
+            self.writer._pending.append((time.monotonic(), LocationUsageLog(user=user, provided_service=service)))
+
+    def test_flush_writes_pending_records_in_batches(self):
+        self.enqueue(self.user, 'a', 'b', 'c', 'd', 'e')
+        self.writer._flush()
+        self.assertEqual(LocationUsageLog.objects.count(), 5)
+        self.assertEqual(self.writer.stats()['pending'], 0)
+        self.assertEqual((self.writer.counters['written'], self.writer.counters['flushes']), (5, 3))
+
+    def test_failed_write_keeps_records_for_retry(self):
+        self.enqueue(self.user, 'a', 'b', 'c')
+        with mock.patch.object(LocationUsageWriter, '_write', side_effect=OperationalError('db down')):
+            with self.assertRaises(OperationalError):
+                self.writer._flush()
+        self.assertEqual(self.writer.stats()['pending'], 3)
+        self.assertEqual(LocationUsageLog.objects.count(), 0)
+
+        self.writer._flush()
+        self.assertEqual(LocationUsageLog.objects.count(), 3)
+
+    def deleted_user(self) -> User:
+        gone = User.objects.create_user(username='gone', email='gone@example.com')
+        # 기록을 버퍼에 둔 사이 다른 요청에서 탈퇴 (버퍼의 인스턴스는 pk를 그대로 가짐)
+        User.objects.filter(pk=gone.pk).delete()
+        return gone
+
+    def test_records_of_deleted_user_are_written_without_user(self):
+        self.enqueue(self.user, 'kept')
+        self.enqueue(self.deleted_user(), 'gone')
+        self.writer._flush()
+        self.assertEqual(dict(LocationUsageLog.objects.values_list('provided_service', 'user')),
+                         {'kept': self.user.pk, 'gone': None})
+
+    def test_retry_after_failed_fallback_does_not_duplicate(self):
+        self.enqueue(self.user, 'kept')
+        self.enqueue(self.deleted_user(), 'gone')
+        bulk_create = LocationUsageLog.objects.bulk_create
+        calls = []
+
+        def fail_on_fallback(records):
+            calls.append(records)
+            if len(calls) > 1:
+                raise OperationalError('connection lost')
+            return bulk_create(records)
+
+        with mock.patch.object(LocationUsageLog.objects, 'bulk_create', side_effect=fail_on_fallback):
+            with self.assertRaises(OperationalError):
+                self.writer._flush()
+        self.assertEqual(LocationUsageLog.objects.count(), 0)
+
+        self.writer._flush()
+        self.assertEqual(sorted(LocationUsageLog.objects.values_list('provided_service', flat=True)), ['gone', 'kept'])
+
+
+class ArchiveUsageLogsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='u1', email='u1@example.com')
+        self.month = month_start(timezone.now() - timedelta(days=730))
+        self.archive_dir = self.enterContext(tempfile.TemporaryDirectory())
+
+    def add_logs(self, count: int) -> list[int]:
+        ids = [LocationUsageLog.objects.create(user=self.user, provided_service=f'svc{i}').pk for i in range(count)]
+        # usage_timestamp는 editable=False라 생성 후 보존 기간이 지난 달로 옮깁니다.
+        LocationUsageLog.objects.filter(pk__in=ids).update(usage_timestamp=self.month + timedelta(days=3))
+        return ids
+
+    def archive(self, **options):
+        call_command('archive_usage_logs', keep_months=6, archive_dir=self.archive_dir, stdout=io.StringIO(), **options)
+
+    def archived_ids(self) -> list[int]:
+        ids = []
+        for name in sorted(os.listdir(self.archive_dir)):
+            if name.endswith('.csv.gz'):
+                with gzip.open(os.path.join(self.archive_dir, name), 'rt', encoding='utf-8', newline='') as f:
+                    ids += [int(row['id']) for row in csv.DictReader(f)]
+        return ids
+
+    def test_resume_after_crash_deletes_archived_rows_without_duplicates(self):
+        first = self.add_logs(3)
+        # 매니페스트를 쓴 뒤 DB에서 지우기 전에 멈춘 경우
+        with mock.patch.object(ArchiveCommand, 'delete_rows', side_effect=RuntimeError('crash')):
+            with self.assertRaises(RuntimeError):
+                self.archive()
+        self.assertEqual(LocationUsageLog.objects.count(), 3)
+
+        second = self.add_logs(2)
+        self.archive()
+
+        label = f"{self.month:%Y-%m}"
+        manifests = ArchiveCommand.load_manifests(self.archive_dir, label)
+        self.assertEqual(sorted(m['file'] for m in manifests),
+                         [f'location_usage_log-{label}.2.csv.gz', f'location_usage_log-{label}.csv.gz'])
+        self.assertEqual(sum(m['rows'] for m in manifests), 5)
+        self.assertEqual(sorted(self.archived_ids()), sorted(first + second))
+        self.assertFalse(LocationUsageLog.objects.exists())
+
+    def test_dry_run_keeps_rows(self):
+        self.add_logs(2)
+        self.archive(dry_run=True)
+        self.assertEqual(LocationUsageLog.objects.count(), 2)
+        self.assertEqual(os.listdir(self.archive_dir), [])
+
+    def test_rejects_retention_below_legal_minimum(self):
+        with self.assertRaises(CommandError):
+            call_command('archive_usage_logs', keep_months=3, archive_dir=self.archive_dir, stdout=io.StringIO())
+
+
+class AsyncJWTAuthenticationTests(TransactionTestCase):
+    # 사용자 조회는 스레드 풀의 별도 연결에서 실행되므로 커밋된 데이터가 필요합니다.
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user(username='member', email='member@example.com')
+        self.authenticator = AsyncJWTAuthentication()
+
+    def authenticate(self, user: User = None, **headers):
+        if user is not None:
+            headers['HTTP_AUTHORIZATION'] = f"Bearer {AccessToken.for_user(user)}"
+        request = APIRequestFactory().get('/', **headers)
+        return asyncio.run(self.authenticator.authenticate_async(request))
+
+    def test_request_without_token_is_anonymous(self):
+        self.assertIsNone(self.authenticate())
+
+    def test_user_is_cached_and_returned_as_copies(self):
+        first, _ = self.authenticate(self.user)
+        with mock.patch.object(AsyncJWTAuthentication, '_get_user_sync') as get_user_sync:
+            second, _ = self.authenticate(self.user)
+        get_user_sync.assert_not_called()
+        self.assertEqual((first.pk, second.pk), (self.user.pk, self.user.pk))
+        self.assertIsNot(first, second)
+
+    def test_inactive_user_is_rejected(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        with self.assertRaises(AuthenticationFailed) as raised:
+            self.authenticate(self.user)
+        self.assertEqual(raised.exception.detail['code'], 'user_inactive')
+
+    def test_deleted_user_is_rejected(self):
+        User.objects.filter(pk=self.user.pk).delete()
+        with self.assertRaises(AuthenticationFailed) as raised:
+            self.authenticate(self.user)
+        self.assertEqual(raised.exception.detail['code'], 'user_not_found')
+
+    def test_saving_or_deleting_user_forgets_cached_copy(self):
+        self.authenticate(self.user)
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(user_cache.get(str(self.user.pk)))
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.user)
+
+        self.user.is_active = True
+        self.user.save()
+        self.authenticate(self.user)
+        self.user.delete()
+        self.assertIsNone(user_cache.get(str(self.user.pk)))
@@ -0,0 +1,197 @@
+# users/usage_log.py
+
+import asyncio
+import atexit
+import threading
+import time
+from collections import deque
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+from .models import LocationUsageLog
+
+
+# ===================================================================
+# 위치정보 이용·제공 사실 기록 (취급대장) - 쓰기 지연(write-behind) 버퍼
+# ===================================================================
+# 목록 API가 요청마다 INSERT를 기다리지 않도록 기록을 메모리에 모아 전용 스레드에서 bulk_create로 씁니다.
+#  - USAGE_LOG_BATCH_SIZE개가 모이거나 USAGE_LOG_FLUSH_MS가 지나면 씁니다.
+#  - 이용일시는 요청 시점으로 기록합니다. (쓰는 시점이 아님)
+#  - 법정 기록이므로 쓰기에 실패한 기록은 버리지 않고 재시도합니다.
+#  - 쓰지 못한 기록이 USAGE_LOG_MAX_PENDING개를 넘거나, 가장 오래된 기록이 USAGE_LOG_MAX_DELAY_MS보다 오래되면
+#    (DB가 느리거나 장애) 새 기록을 남기려는 요청이 자리가 날 때까지 기다립니다. (배압)
+#    따라서 프로세스가 비정상 종료되어도 잃을 수 있는 기록은 최대 MAX_DELAY 구간으로 제한됩니다.
+#  - 정상 종료(ASGI lifespan 종료, 인터프리터 종료) 시에는 남은 기록을 모두 씁니다.
+BACKPRESSURE_POLL = 0.01  # 배압 중 자리 확인 간격 (초)
+RETRY_BACKOFF_MAX = 5.0   # 쓰기 실패 후 재시도 간격 상한 (초)
+CLOSE_TIMEOUT = 30.0      # 종료 시 남은 기록을 쓰는 데 기다리는 최대 시간 (초)
+
+
+class LocationUsageWriter:
+    def __init__(self, batch_size: int = None, flush_interval: float = None, max_delay: float = None,
+                 max_pending: int = None):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self._pending = deque()  # (enqueue 시각(monotonic), LocationUsageLog)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._closed = False
+        self.counters = {'logged': 0, 'written': 0, 'flushes': 0, 'failures': 0, 'blocked': 0, 'direct': 0}
+        self.last_flush_ms = None
+
+    def _configure(self):
+        from django.conf import settings
+        if self.batch_size is None:
+            self.batch_size = settings.USAGE_LOG_BATCH_SIZE
+        if self.flush_interval is None:
+            self.flush_interval = settings.USAGE_LOG_FLUSH_MS / 1000
+        if self.max_delay is None:
+            self.max_delay = settings.USAGE_LOG_MAX_DELAY_MS / 1000
+        if self.max_pending is None:
+            self.max_pending = settings.USAGE_LOG_MAX_PENDING
+        # 정상 상태에서는 MAX_DELAY 안에 최소 두 번 쓰도록 합니다.
+        self.flush_interval = min(self.flush_interval, self.max_delay / 2)
+
+    def _ensure_started(self):
+        if self._thread is not None or self._closed:
+            return
+        with self._lock:
+            if self._thread is None and not self._closed:
+                self._configure()
+                self._thread = threading.Thread(target=self._run, name='location-usage-writer', daemon=True)
+                self._thread.start()
+                atexit.register(self.close_sync)
+
+    # ---------------------------------------------------------------
+    # 기록 추가
+    # ---------------------------------------------------------------
+    def _has_room(self) -> bool:
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                return False
+            return not self._pending or time.monotonic() - self._pending[0][0] < self.max_delay
+
+    async def log(self, user, *services: str):
+        """
+        기록을 버퍼에 넣고 바로 반환합니다. (DB가 밀려 있을 때만 자리가 날 때까지 기다림)
+        """
+        usage_timestamp = timezone.now()
+        records = [LocationUsageLog(user=user, provided_service=service, usage_timestamp=usage_timestamp)
+                   for service in services]
+        self._ensure_started()
+        if not self._has_room():
+            self.counters['blocked'] += 1
+            self._wakeup.set()
+            while not self._has_room() and not self._closed:
+                await asyncio.sleep(BACKPRESSURE_POLL)
+        with self._lock:
+            if not self._closed:
+                self._pending.extend((time.monotonic(), record) for record in records)
+                self.counters['logged'] += len(records)
+                if len(self._pending) >= self.batch_size:
+                    self._wakeup.set()
+                return
+        # 종료 중에는 버퍼를 거치지 않고 바로 씁니다.
+        await sync_to_async(self._write, thread_sensitive=False)(records)
+        self.counters['direct'] += len(records)
+
+    # ---------------------------------------------------------------
+    # 쓰기 스레드
+    # ---------------------------------------------------------------
+    def _run(self):
+        backoff = self.flush_interval
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self._flush()
+                backoff = self.flush_interval
+            except Exception as e:
+                self.counters['failures'] += 1
+                print(f"[취급대장] 기록 {len(self._pending)}건 쓰기 실패, {backoff:.1f}초 후 재시도: {e!r}")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, RETRY_BACKOFF_MAX)
+                continue
+            if self._closed and not self._pending:
+                return
+
+    def _flush(self):
+        """
+        버퍼의 기록을 batch_size개씩 씁니다. 쓰기에 성공한 기록만 버퍼에서 뺍니다.
+        """
+        while self._pending:
+            with self._lock:
+                batch = [record for _, record in islice(self._pending, self.batch_size)]
+            t = time.perf_counter()
+            self._write(batch)
+            self.last_flush_ms = round((time.perf_counter() - t) * 1000, 1)
+            with self._lock:
+                for _ in batch:
+                    self._pending.popleft()
+                self.counters['written'] += len(batch)
+                self.counters['flushes'] += 1
+
+    @staticmethod
+    def _write(records: list[LocationUsageLog]):
+        # 전용 스레드의 DB 연결도 요청 처리와 같은 규칙(CONN_MAX_AGE)으로 열고 닫습니다.
+        close_old_connections()
+        try:
+            try:
+                with transaction.atomic():
+                    LocationUsageLog.objects.bulk_create(records)
+            except IntegrityError:
+                # 기록을 버퍼에 둔 사이 탈퇴한 사용자: 탈퇴 시와 같이(on_delete=SET_NULL) 사용자 없이 남깁니다.
+                # 다시 쓸 때도 배치 전체를 한 트랜잭션으로 쓰므로, 실패하면 아무것도 남지 않아 배치째 재시도해도 중복되지 않습니다.
+                user_ids = {record.user_id for record in records if record.user_id is not None}
+                existing = set(get_user_model().objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+                for record in records:
+                    if record.user_id is not None and record.user_id not in existing:
+                        record.user = None
+                with transaction.atomic():
+                    LocationUsageLog.objects.bulk_create(records)
+        finally:
+            close_old_connections()
+
+    # ---------------------------------------------------------------
+    # 종료
+    # ---------------------------------------------------------------
+    def close_sync(self, timeout: float = CLOSE_TIMEOUT):
+        """
+        남은 기록을 모두 쓰고 쓰기 스레드를 끝냅니다. (인터프리터 종료 시 atexit)
+        """
+        with self._lock:
+            self._closed = True
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._wakeup.set()
+        thread.join(timeout)
+        if self._pending:
+            print(f"[취급대장] 종료 시 기록 {len(self._pending)}건을 쓰지 못했습니다.")
+
+    async def close(self):
+        await asyncio.to_thread(self.close_sync)
+
+    def stats(self) -> dict:
+        with self._lock:
+            oldest = self._pending[0][0] if self._pending else None
+        return {
+            "pending": len(self._pending),
+            "oldest_ms": None if oldest is None else round((time.monotonic() - oldest) * 1000),
+            "last_flush_ms": self.last_flush_ms,
+            **self.counters,
+        }
+
+
+location_usage_writer = LocationUsageWriter()
+
+
+async def log_location_usage(user, *services: str):
+    await location_usage_writer.log(user, *services)